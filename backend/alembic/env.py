@@ -20,6 +20,16 @@ from app.models.student import Student # pyright: ignore[reportUnusedImport]
 from app.models.class_model import ClassModel # pyright: ignore[reportUnusedImport]
 from app.models.class_registration import ClassRegistration # pyright: ignore[reportUnusedImport]
 from app.models.subscription import Subscription # pyright: ignore[reportUnusedImport]
+from app.models.session_usage import SessionUsage # pyright: ignore[reportUnusedImport]
+from app.models.report_snapshot import ReportSnapshot # pyright: ignore[reportUnusedImport]
+from app.models.idempotency_key import IdempotencyKey # pyright: ignore[reportUnusedImport]
+from app.models.login_attempt import LoginAttempt # pyright: ignore[reportUnusedImport]
+from app.models.refresh_token import RefreshToken # pyright: ignore[reportUnusedImport]
+from app.models.token_revocation import TokenRevocation # pyright: ignore[reportUnusedImport]
+from app.models.subscription_archive import ArchivedSubscription # pyright: ignore[reportUnusedImport]
+from app.models.session_usage_archive import ArchivedSessionUsage # pyright: ignore[reportUnusedImport]
+from app.models.outbox_message import OutboxMessage # pyright: ignore[reportUnusedImport]
+from app.models.calendar_feed import CalendarFeed # pyright: ignore[reportUnusedImport]
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,104 @@
+"""
+Ownership authorization for student and parent resources.
+
+Staff can access every student and parent, a student their own record
+and a parent their own record and their children's. Each check is a
+single query returning whether the resource exists and whether the
+caller owns it, so routes answer 404 or 403 without loading the
+caller's profile or the resource itself.
+"""
+
+from typing import Annotated, Any
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import ColumnElement, exists, false, select, true
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.parent import Parent
+from app.models.student import Student
+
+
+def _forbidden() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+
+def _student_owned_by(current_user: dict[str, Any]) -> ColumnElement[bool]:
+    """Condition on Student rows the current user may read."""
+    role = current_user["role"]
+    if role == "staff":
+        return true()
+    if role == "student":
+        return Student.user_id == current_user["user_id"]
+    if role == "parent":
+        return exists().where(Parent.id == Student.parent_id, Parent.user_id == current_user["user_id"])
+    return false()
+
+
+def check_student_access(db: Session, current_user: dict[str, Any], student_id: int) -> None:
+    """
+    Check that the current user may read a student.
+
+    Args:
+        db: Database session
+        current_user: Authenticated user (user_id and role)
+        student_id: Student ID
+
+    Raises:
+        HTTPException: 404 if the student does not exist, 403 if the user may not read it
+    """
+    allowed = db.execute(
+        select(_student_owned_by(current_user)).where(Student.id == student_id)
+    ).scalar_one_or_none()
+    if allowed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    if not allowed:
+        raise _forbidden()
+
+
+def check_parent_access(db: Session, current_user: dict[str, Any], parent_id: int) -> None:
+    """
+    Check that the current user may read a parent.
+
+    Args:
+        db: Database session
+        current_user: Authenticated user (user_id and role)
+        parent_id: Parent ID
+
+    Raises:
+        HTTPException: 404 if the parent does not exist, 403 if the user may not read it
+    """
+    role = current_user["role"]
+    if role == "staff":
+        owned = true()
+    elif role == "parent":
+        owned = Parent.user_id == current_user["user_id"]
+    else:
+        raise _forbidden()
+
+    allowed = db.execute(select(owned).where(Parent.id == parent_id)).scalar_one_or_none()
+    if allowed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parent not found")
+    if not allowed:
+        raise _forbidden()
+
+
+def readable_student(
+    student_id: int,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db, scope="function")]
+) -> int:
+    """Dependency resolving the {student_id} path parameter once access is checked."""
+    check_student_access(db, current_user, student_id)
+    return student_id
+
+
+def readable_parent(
+    parent_id: int,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db, scope="function")]
+) -> int:
+    """Dependency resolving the {parent_id} path parameter once access is checked."""
+    check_parent_access(db, current_user, parent_id)
+    return parent_id
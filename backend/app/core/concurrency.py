@@ -0,0 +1,224 @@
+"""
+Adaptive concurrency limits and load shedding.
+
+Each API request is assigned a route class (auth, reads, writes,
+exports) with its own cap on in-flight requests. Requests over the cap
+wait in a bounded FIFO queue for at most CONCURRENCY_QUEUE_TIMEOUT_SECONDS;
+when the queue is full or the wait times out the request is rejected
+immediately with 503 and Retry-After, instead of piling up in the
+threadpool and slowing down everyone (including health checks, which
+are never limited).
+
+With CONCURRENCY_ADAPTIVE, limits follow observed latency (AIMD): each
+request finishing under CONCURRENCY_LATENCY_TARGET_SECONDS while the
+class is saturated raises the limit by 1/limit (about one per round of
+requests); a slower request lowers it by 10%, at most once per target
+interval. Limits stay between CONCURRENCY_MIN_LIMIT and the configured
+value for the class.
+
+State is per process and lives on the event loop, so no locking is needed.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+
+DECREASE_FACTOR = 0.9
+
+CONCURRENCY_LIMIT = metrics.Gauge(
+    "concurrency_limit",
+    "Current in-flight request limit by route class",
+    ["route_class"],
+)
+CONCURRENCY_IN_FLIGHT = metrics.Gauge(
+    "concurrency_in_flight",
+    "Requests holding a concurrency slot by route class",
+    ["route_class"],
+)
+CONCURRENCY_QUEUED = metrics.Gauge(
+    "concurrency_queued",
+    "Requests waiting for a concurrency slot by route class",
+    ["route_class"],
+)
+CONCURRENCY_QUEUE_WAIT = metrics.Histogram(
+    "concurrency_queue_wait_seconds",
+    "Time requests waited for a concurrency slot by route class",
+    ["route_class"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOAD_SHED = metrics.Counter(
+    "load_shed_total",
+    "Requests rejected with 503 by route class and reason",
+    ["route_class", "reason"],
+)
+
+
+class Rejected(Exception):
+    """Raised when a request cannot get a concurrency slot."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass
+class Limiter:
+    """In-flight limit with a bounded FIFO wait queue for one route class."""
+    name: str
+    max_limit: int
+    limit: float = 0.0
+    in_flight: int = 0
+    last_decrease: float = 0.0
+    waiters: deque[asyncio.Future[None]] = field(default_factory=deque)
+
+    def __post_init__(self):
+        self.limit = float(self.max_limit)
+        self._publish()
+
+    def _publish(self) -> None:
+        CONCURRENCY_LIMIT.labels(self.name).set(math.floor(self.limit))
+        CONCURRENCY_IN_FLIGHT.labels(self.name).set(self.in_flight)
+        CONCURRENCY_QUEUED.labels(self.name).set(len(self.waiters))
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < math.floor(self.limit)
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if necessary.
+
+        Raises:
+            Rejected: If the queue is full or the wait exceeds the deadline
+        """
+        if self._has_capacity() and not self.waiters:
+            self.in_flight += 1
+            self._publish()
+            return
+
+        if len(self.waiters) >= settings.CONCURRENCY_QUEUE_SIZE:
+            raise Rejected("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self._publish()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, settings.CONCURRENCY_QUEUE_TIMEOUT_SECONDS)
+        except TimeoutError:
+            # Slot handed over in the same loop iteration as the deadline: it is ours
+            if waiter.done() and not waiter.cancelled():
+                return
+            raise Rejected("queue_timeout")
+        except asyncio.CancelledError:
+            # Slot handed over just as the client went away: give it back
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            self._publish()
+            CONCURRENCY_QUEUE_WAIT.labels(self.name).observe(time.perf_counter() - started)
+
+    def release(self, latency: float | None) -> None:
+        """Free a slot, adapt the limit to the request latency and wake waiters."""
+        saturated = not self._has_capacity()
+        self.in_flight -= 1
+        if latency is not None and settings.CONCURRENCY_ADAPTIVE:
+            self._adapt(latency, saturated)
+
+        while self.waiters and self._has_capacity():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._publish()
+
+    def _adapt(self, latency: float, saturated: bool) -> None:
+        target = settings.CONCURRENCY_LATENCY_TARGET_SECONDS
+        now = time.monotonic()
+        if latency > target:
+            if now - self.last_decrease >= target:
+                self.limit = max(settings.CONCURRENCY_MIN_LIMIT, self.limit * DECREASE_FACTOR)
+                self.last_decrease = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+def route_class(scope: Scope) -> str | None:
+    """Route class a request is limited under, or None if it is never limited."""
+    path: str = scope["path"]
+    if not path.startswith("/api/") or path.startswith("/api/admin/"):
+        return None  # Health checks, metrics, docs and diagnostics
+    if path.startswith("/api/events/"):
+        return None  # Long-lived streams, capped by EVENTS_MAX_SUBSCRIBERS instead
+    if path.startswith("/api/auth/"):
+        return "auth"
+    if path.startswith("/api/reports/"):
+        return "exports"
+    if scope["method"] in ("GET", "HEAD"):
+        return "reads"
+    return "writes"
+
+
+def _configured_limits() -> dict[str, int]:
+    return {
+        "auth": settings.CONCURRENCY_LIMIT_AUTH,
+        "reads": settings.CONCURRENCY_LIMIT_READS,
+        "writes": settings.CONCURRENCY_LIMIT_WRITES,
+        "exports": settings.CONCURRENCY_LIMIT_EXPORTS,
+    }
+
+
+class ConcurrencyLimitMiddleware:
+    """ASGI middleware enforcing per-route-class concurrency limits."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiters = {
+            name: Limiter(name, limit) for name, limit in _configured_limits().items()
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class(scope) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[name]
+        try:
+            await limiter.acquire()
+        except Rejected as e:
+            LOAD_SHED.labels(name, e.reason).inc()
+            await self._reject(send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        except BaseException:
+            limiter.release(None)
+            raise
+        limiter.release(time.perf_counter() - started)
+
+    async def _reject(self, send: Send) -> None:
+        retry_after = max(1, math.ceil(settings.CONCURRENCY_QUEUE_TIMEOUT_SECONDS))
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": b'{"detail":"Server is overloaded, please retry later"}',
+        })
@@ -15,15 +15,118 @@ class Settings(BaseSettings):
     APP_NAME: str = "Mini LMS API"
     APP_VERSION: str = "0.1.0"
     DEBUG: bool = False
-    ENVIRONMENT: str = "development"
+    ENVIRONMENT: str = "development"  # "production" verifies the schema instead of creating it
+    LOG_LEVEL: str = "INFO"
 
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5  # Per worker process
+    DB_MAX_OVERFLOW: int = 10  # Per worker process
+    DB_CONNECTION_BUDGET: int = 0  # Total for all workers of app.server; 0 = use the per-worker sizes
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before failing the request
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this; -1 disables
+    DB_POOL_PING_IDLE_SECONDS: float = 30.0  # Ping connections idle longer than this on checkout; -1 disables
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000  # PostgreSQL statement_timeout per connection; 0 disables
+    DATABASE_REPLICA_URLS: list[str] = []  # Read replicas for GET requests (JSON list)
+    DB_REPLICA_STICKY_SECONDS: float = 5.0  # Read from the primary this long after a client's write
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Replicas lagging more are taken out of rotation
+    DB_REPLICA_RETRY_SECONDS: float = 30.0  # How long a failed replica stays out of rotation
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    # Server (python -m app.server)
+    WEB_CONCURRENCY: int = 0  # Worker processes; 0 = one per available CPU
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
     
     # JWT Authentication
     SECRET_KEY: str  # Used for signing JWT tokens
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: float = 10.0  # A just-rotated token still refreshes (tabs racing); 0 disables
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 2.0  # Delay for revocations to reach other processes (needs the scheduler)
+    TOKEN_REVOCATION_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # Login throttling (failed attempts per sliding window)
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # "memory" (per process) or "database" (shared)
+    LOGIN_MAX_FAILURES_PER_EMAIL: int = 5
+    LOGIN_EMAIL_WINDOW_SECONDS: int = 900
+    LOGIN_MAX_FAILURES_PER_IP: int = 50
+    LOGIN_IP_WINDOW_SECONDS: int = 900
+    LOGIN_THROTTLE_MAX_KEYS: int = 100_000  # Memory backend bound
+    LOGIN_ATTEMPT_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # Concurrency limits per route class (per process; the default threadpool has 40 threads)
+    CONCURRENCY_LIMITS_ENABLED: bool = True
+    CONCURRENCY_LIMIT_AUTH: int = 4  # Logins are bcrypt-bound
+    CONCURRENCY_LIMIT_READS: int = 24
+    CONCURRENCY_LIMIT_WRITES: int = 8
+    CONCURRENCY_LIMIT_EXPORTS: int = 2  # Reports and exports
+    CONCURRENCY_QUEUE_SIZE: int = 50  # Waiting requests per route class before shedding
+    CONCURRENCY_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    CONCURRENCY_ADAPTIVE: bool = True  # Adjust limits from observed latency (AIMD)
+    CONCURRENCY_LATENCY_TARGET_SECONDS: float = 0.5
+    CONCURRENCY_MIN_LIMIT: int = 1
+
+    # Idempotency-Key handling for POST/PATCH requests
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86_400
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60  # A reservation older than this is assumed abandoned
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # Observability
+    METRICS_ENABLED: bool = True
+    PROFILING_ENABLED: bool = True  # Staff can profile requests with X-Profile: 1
+    PROFILE_SAMPLE_INTERVAL_SECONDS: float = 0.005
+    PROFILE_HISTORY_SIZE: int = 50
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # 0 disables the slow-query log
+    SLOW_QUERY_LOG_PARAMETERS: bool = False  # Log parameter values, not just names (they include personal data)
+    SLOW_QUERY_EXPLAIN: bool = True  # Capture EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 10_000
+    SLOW_QUERY_HISTORY_SIZE: int = 100
+
+    # Background jobs
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LOCK_KEY: int = 724_100_001  # Advisory lock id for leader election
+    SUBSCRIPTION_SWEEP_INTERVAL_SECONDS: int = 300
+    SESSION_USAGE_RECONCILE_INTERVAL_SECONDS: int = 3600
+    SUBSCRIPTION_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    SUBSCRIPTION_ARCHIVE_AFTER_DAYS: int = 365  # Archive subscriptions ended this long ago; 0 disables
+    SUBSCRIPTION_ARCHIVE_BATCH_SIZE: int = 500
+    SUBSCRIPTION_ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.5  # Between batches, to spare the primary and replicas
+
+    # Reports
+    REPORT_REFRESH_INTERVAL_SECONDS: int = 600
+    REPORT_SESSION_BURN_WEEKS: int = 26
+    FORECAST_HORIZON_DAYS: int = 14
+
+    # Parent notifications (transactional outbox)
+    NOTIFY_LOW_BALANCE_BELOW: int = 3  # Notify when remaining sessions drop below this; 0 disables
+    NOTIFY_ENDING_WITHIN_DAYS: int = 7  # Notify when an active package ends within this many days; 0 disables
+    NOTIFICATION_SINK: str = "log"  # "log" or "smtp"
+    NOTIFICATION_LOG_PATH: str | None = None  # JSON lines file for the log sink (application log if unset)
+    NOTIFICATION_SMTP_HOST: str = "localhost"
+    NOTIFICATION_SMTP_PORT: int = 1025
+    NOTIFICATION_SMTP_TIMEOUT_SECONDS: float = 10.0
+    NOTIFICATION_SENDER: str = "Mini LMS <no-reply@minilms.local>"
+    OUTBOX_DISPATCH_INTERVAL_SECONDS: float = 5.0
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE_SECONDS: float = 30.0  # Doubles with each failed attempt
+    OUTBOX_RETRY_MAX_SECONDS: float = 3600.0
+    OUTBOX_RETENTION_DAYS: int = 7  # Delivered and abandoned messages are kept this long
+    OUTBOX_PURGE_INTERVAL_SECONDS: int = 3600
+    ENDING_SOON_SCAN_INTERVAL_SECONDS: int = 3600
+
+    # Live class events (GET /api/events/classes)
+    EVENTS_QUEUE_SIZE: int = 100  # Events buffered per stream before it is told to resync
+    EVENTS_MAX_SUBSCRIBERS: int = 200  # Open streams per process
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_LISTENER_RETRY_SECONDS: float = 5.0
+
+    # Calendar feeds (GET /api/calendar/...)
+    CALENDAR_TIMEZONE: str = "UTC"  # IANA time zone of class time slots
+    CALENDAR_CACHE_MAX_ENTRIES: int = 10_000  # Rendered feeds kept per process
+    CALENDAR_CACHE_TTL_SECONDS: int = 3600  # Bounds staleness from subscription changes made by other processes
 
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = [
@@ -2,22 +2,237 @@
 Database connection and session management.
 
 Provides SQLAlchemy engine, session factory, and declarative base.
+Sessions read from a replica during GET requests when
+DATABASE_REPLICA_URLS is configured (see app.core.replicas).
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import time
+from typing import override
 
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import GenerativeSelect
+
+from app.core import metrics
 from app.core.config import settings
+from app.core.replicas import ReplicaSet, mark_write
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using them
-    echo=settings.DEBUG,  # Log SQL statements in debug mode
+POOL_CHECKOUT_WAIT = metrics.Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = metrics.Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after waiting DB_POOL_TIMEOUT_SECONDS",
+)
+POOL_CONNECTIONS_OPENED = metrics.Counter(
+    "db_pool_connections_opened_total",
+    "New database connections opened by the pool",
+)
+POOL_LIVENESS_PINGS = metrics.Counter(
+    "db_pool_liveness_pings_total",
+    "Pings of connections that had been idle longer than DB_POOL_PING_IDLE_SECONDS",
+)
+POOL_STALE_CONNECTIONS = metrics.Counter(
+    "db_pool_stale_connections_total",
+    "Idle connections found dead by a liveness ping and replaced",
+)
+POOL_CONNECTION_HOLD = metrics.Histogram(
+    "db_pool_connection_hold_seconds",
+    "Time connections stay checked out of the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_STATEMENTS = metrics.Counter(
+    "db_statements_total",
+    "SQL statements executed",
 )
 
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def _connect_args(url: str) -> dict[str, str]:
+    """Driver arguments applied when each connection is opened."""
+    if make_url(url).get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        # Sent as a startup parameter, so it costs no extra round trip
+        return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
+
+
+def _create_engine(url: str) -> Engine:
+    """Create an engine with the configured pool and its instrumentation."""
+    new_engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        connect_args=_connect_args(url),
+        echo=settings.DEBUG,  # Log SQL statements in debug mode
+    )
+
+    @event.listens_for(new_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_OPENED.inc()
+        if new_engine.dialect.name == "sqlite":
+            # Deletes rely on ON DELETE foreign key actions, which SQLite enforces only on request
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    @event.listens_for(new_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            POOL_CONNECTION_HOLD.observe(time.perf_counter() - checked_out_at)
+
+    @event.listens_for(new_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(new_engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        """
+        Verify connections that sat idle in the pool before handing them out.
+
+        Connections returned recently are very unlikely to have been dropped,
+        so unlike pool_pre_ping this skips the extra round trip for the busy
+        connections that serve most requests. A dead connection is replaced
+        transparently by raising DisconnectionError, which makes the pool
+        retry with a fresh one.
+        """
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if (
+            settings.DB_POOL_PING_IDLE_SECONDS < 0
+            or checked_in_at is None
+            or time.monotonic() - checked_in_at < settings.DB_POOL_PING_IDLE_SECONDS
+        ):
+            return
+
+        POOL_LIVENESS_PINGS.inc()
+        try:
+            new_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            POOL_STALE_CONNECTIONS.inc()
+            raise exc.DisconnectionError("Idle connection failed liveness ping") from e
+
+    @event.listens_for(new_engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        DB_STATEMENTS.inc()
+
+    return new_engine
+
+
+# Create database engines (the primary, plus optional read replicas)
+engine = _create_engine(settings.DATABASE_URL)
+replica_set = ReplicaSet([_create_engine(url) for url in settings.DATABASE_REPLICA_URLS])
+
+metrics.Gauge(
+    "db_pool_size",
+    "Configured number of persistent pool connections",
+    function=lambda: engine.pool.size(),
+)
+metrics.Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    function=lambda: engine.pool.checkedout(),
+)
+metrics.Gauge(
+    "db_pool_max_overflow",
+    "Configured number of connections allowed beyond the pool size",
+    function=lambda: settings.DB_MAX_OVERFLOW,
+)
+metrics.Gauge(
+    "db_pool_checked_in",
+    "Idle connections available in the pool",
+    function=lambda: engine.pool.checkedin(),
+)
+metrics.Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size (negative while the pool is filling)",
+    function=lambda: engine.pool.overflow(),
+)
+
+metrics.Gauge(
+    "db_replicas_healthy",
+    "Read replicas currently in rotation",
+    function=lambda: replica_set.healthy_count(),
+)
+
+
+class RoutingSession(Session):
+    """
+    Session sending reads to a replica when the request allows it.
+
+    The replica is chosen once, when the session is created, so all reads
+    of a request see the same database; if it cannot be reached, the
+    session reads from the primary instead. Flushes, INSERT/UPDATE/DELETE,
+    SELECT ... FOR UPDATE and text() statements (which may write, and
+    cannot be told apart) always go to the primary, and once a session
+    has written its remaining reads do too.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.info["replica"] = replica_set.choose_for_request()
+        self.info["replica_connected"] = False
+        self.info["wrote"] = False
+
+    @override
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or _needs_primary(clause):
+            self.info["wrote"] = True
+        replica = None if self.info["wrote"] else self._connected_replica()
+        if replica is None:
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica
+
+    def _connected_replica(self) -> Engine | None:
+        """The session's replica, falling back to the primary if it cannot connect."""
+        replica = self.info["replica"]
+        if replica is not None and not self.info["replica_connected"]:
+            try:
+                self.connection(bind_arguments={"bind": replica})
+                self.info["replica_connected"] = True
+            except exc.DBAPIError:
+                # The replica set took it out of rotation; this request reads from the primary
+                self.info["replica"] = replica = None
+        return replica
+
+
+def _needs_primary(clause) -> bool:
+    """Whether a statement writes, locks rows or is raw SQL that might do either."""
+    if isinstance(clause, (UpdateBase, TextClause)):
+        return True
+    return isinstance(clause, GenerativeSelect) and clause._for_update_arg is not None
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session):
+    if session.info.get("wrote") and replica_set.replicas:
+        mark_write()
+
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 # Base class for all models
 Base = declarative_base()
@@ -35,3 +250,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def warm_pool(connections: int | None = None) -> int:
+    """
+    Open pool connections ahead of the first requests.
+
+    Args:
+        connections: Number of connections to open (defaults to the pool size)
+
+    Returns:
+        Number of connections opened
+    """
+    count = connections if connections is not None else engine.pool.size()
+    opened = []
+    try:
+        for _ in range(count):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
@@ -10,12 +10,18 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
+from app.core.authorization import readable_parent, readable_student
 from app.core.database import get_db
 from app.core.security import get_current_user, require_role
 
 # Type aliases for cleaner dependency injection
-DatabaseSession = Annotated[Session, Depends(get_db)]
+# The session closes when the handler returns, so its connection is back in
+# the pool after the response model is serialized, before the body is sent
+DatabaseSession = Annotated[Session, Depends(get_db, scope="function")]
 CurrentUser = Annotated[dict, Depends(get_current_user)]
 StaffUser = Annotated[dict, Depends(require_role(["staff"]))]
 ParentUser = Annotated[dict, Depends(require_role(["parent"]))]
 StudentUser = Annotated[dict, Depends(require_role(["student"]))]
+# Path IDs checked with app.core.authorization (404 if missing, 403 if not the caller's)
+ReadableStudentId = Annotated[int, Depends(readable_student)]
+ReadableParentId = Annotated[int, Depends(readable_parent)]
@@ -0,0 +1,276 @@
+"""
+Class roster events for live dashboards.
+
+Services describe roster and seat changes with publish_class_changes();
+the events are delivered to every subscriber of GET /api/events/classes
+once the transaction commits (and never if it rolls back):
+
+- on PostgreSQL, through NOTIFY on the class_events channel, sent inside
+  the transaction; each process LISTENs on a dedicated connection and
+  forwards notifications to its own subscribers, so every worker and
+  instance sees every change
+- on other databases, directly to the subscribers of the local process
+
+Each subscriber has a bounded queue. A consumer that falls
+EVENTS_QUEUE_SIZE events behind has its backlog replaced by a single
+"resync" event, telling it to refetch the classes, so a slow client
+costs constant memory and never slows down publishers. Subscribers also
+receive "resync" when the listener reconnects, as notifications may
+have been missed in between. Other modules can follow the same events
+with broker.add_listener(), e.g. to invalidate caches in every process.
+"""
+
+import asyncio
+import json
+import logging
+import select as select_module
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import engine
+from app.models.class_model import ClassModel
+from app.models.class_registration import ClassRegistration
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "class_events"
+
+# Change kinds
+REGISTRATION_ADDED = "registration_added"
+REGISTRATION_REMOVED = "registration_removed"
+CLASS_UPDATED = "class_updated"
+CLASS_DELETED = "class_deleted"
+
+RESYNC: dict[str, Any] = {"change": "resync"}
+
+EVENTS_PUBLISHED = metrics.Counter(
+    "class_events_published_total",
+    "Class events delivered to this process's subscribers",
+)
+EVENTS_RESYNCS = metrics.Counter(
+    "class_events_resyncs_total",
+    "Subscriber backlogs replaced by a resync event because the consumer fell behind",
+)
+
+
+class Subscriber:
+    """One event stream: a bounded queue owned by the event loop serving it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+
+    def offer(self, item: dict[str, Any] | None) -> None:
+        """Queue an event (None ends the stream); runs on the subscriber's loop."""
+        if item is not None and self.queue.full():
+            # Too far behind: whatever it missed, the client must refetch anyway
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            EVENTS_RESYNCS.inc()
+            item = RESYNC
+        if item is None and self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+
+class EventBroker:
+    """In-process fan-out of class events, fed locally or by a LISTEN connection."""
+
+    def __init__(self):
+        self._subscribers: set[Subscriber] = set()
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber | None:
+        """
+        Register a subscriber on the running event loop.
+
+        Returns:
+            The subscriber, or None if EVENTS_MAX_SUBSCRIBERS are already connected
+        """
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            if len(self._subscribers) >= settings.EVENTS_MAX_SUBSCRIBERS:
+                return None
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def add_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        """
+        Call listener with every event (including resyncs) this process receives.
+
+        Listeners run synchronously on the dispatching thread, so they
+        must be quick and thread-safe (e.g. invalidating a cache).
+        """
+        self._listeners.append(listener)
+
+    def dispatch(self, item: dict[str, Any] | None) -> None:
+        """Deliver an event to every local subscriber; safe to call from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if item is not None:
+            if item is not RESYNC:
+                EVENTS_PUBLISHED.inc()
+            for listener in self._listeners:
+                try:
+                    listener(item)
+                except Exception:
+                    logger.exception("Class event listener %r failed", listener)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, item)
+            except RuntimeError:
+                self.unsubscribe(subscriber)  # Its loop has closed
+
+    def start(self) -> None:
+        """Start listening for notifications from other processes (PostgreSQL only)."""
+        if engine.dialect.name != "postgresql" or self._listener is not None:
+            return
+        self._stopping.clear()
+        self._listener = threading.Thread(target=self._listen, name="class-events-listener", daemon=True)
+        self._listener.start()
+
+    def close_streams(self) -> None:
+        """End every open stream (clients reconnect to another process)."""
+        self.dispatch(None)
+
+    def stop(self) -> None:
+        """Stop the listener and end every open stream."""
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+            self._listener = None
+        self.close_streams()
+
+    def _listen(self) -> None:
+        connected_before = False
+        while not self._stopping.is_set():
+            try:
+                connection = engine.raw_connection()
+                # Held for the life of the process: keep it out of the pool's accounting
+                connection.detach()
+                dbapi_connection = connection.driver_connection
+                try:
+                    dbapi_connection.autocommit = True
+                    with dbapi_connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {CHANNEL}")
+                    if connected_before:
+                        self.dispatch(RESYNC)
+                    connected_before = True
+                    self._receive(dbapi_connection)
+                finally:
+                    connection.close()
+            except Exception:
+                logger.exception("Class event listener failed; reconnecting")
+                self._stopping.wait(settings.EVENTS_LISTENER_RETRY_SECONDS)
+
+    def _receive(self, dbapi_connection: Any) -> None:
+        while not self._stopping.is_set():
+            readable, _, _ = select_module.select([dbapi_connection], [], [], 1.0)
+            if not readable:
+                continue
+            dbapi_connection.poll()
+            while dbapi_connection.notifies:
+                notification = dbapi_connection.notifies.pop(0)
+                self.dispatch(json.loads(notification.payload))
+
+
+broker = EventBroker()
+
+metrics.Gauge(
+    "class_event_subscribers",
+    "Open class event streams in this process",
+    function=lambda: len(broker),
+)
+
+
+def publish_class_changes(
+    db: Session,
+    class_ids: list[int],
+    change: str,
+    student_id: int | None = None
+) -> None:
+    """
+    Announce roster changes once the caller's transaction commits.
+
+    Events carry the current registration count and capacity, read in
+    one query within the transaction.
+
+    Args:
+        db: Database session (changes must be flushed)
+        class_ids: Classes that changed
+        change: Change kind (e.g. REGISTRATION_ADDED)
+        student_id: Student added or removed, for registration changes
+    """
+    if not class_ids:
+        return
+    if change == CLASS_DELETED:
+        rows = [(class_id, 0, None) for class_id in class_ids]
+    else:
+        registered = (
+            select(func.count())
+            .where(ClassRegistration.class_id == ClassModel.id)
+            .scalar_subquery()
+        )
+        rows = db.execute(
+            select(ClassModel.id, registered, ClassModel.max_students).where(ClassModel.id.in_(class_ids))
+        ).all()
+
+    pending = db.info.setdefault("pending_class_events", [])
+    for class_id, count, max_students in rows:
+        item: dict[str, Any] = {"class_id": class_id, "change": change, "registered": count}
+        if max_students is not None:
+            item["max_students"] = max_students
+        if student_id is not None:
+            item["student_id"] = student_id
+        pending.append(item)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_in_transaction(session: Session) -> None:
+    if engine.dialect.name != "postgresql" or not session.info.get("pending_class_events"):
+        return
+    for item in session.info.pop("pending_class_events"):
+        session.execute(
+            select(func.pg_notify(CHANNEL, json.dumps(item, separators=(",", ":")))),
+            bind_arguments={"bind": engine},
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed(session: Session) -> None:
+    pending = session.info.pop("pending_class_events", None)
+    for item in pending or ():
+        broker.dispatch(item)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("pending_class_events", None)
+
+
+def format_event(item: dict[str, Any]) -> str:
+    """Encode an event in the text/event-stream format."""
+    name = "resync" if item is RESYNC or item.get("change") == "resync" else "class"
+    return f"event: {name}\ndata: {json.dumps(item, separators=(',', ':'))}\n\n"
+
+
+def heartbeat() -> str:
+    """An SSE comment line, keeping idle streams open through proxies."""
+    return f": {int(time.time())}\n\n"
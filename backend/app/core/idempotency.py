@@ -0,0 +1,227 @@
+"""
+Idempotency-Key support for unsafe requests.
+
+Routers created with `route_class=IdempotentRoute` accept an
+`Idempotency-Key` header on POST and PATCH requests. The first request
+with a key reserves it and runs normally; its successful response is
+stored. A retry with the same key and the same request is answered with
+the stored response (marked `Idempotent-Replayed: true`) without running
+the endpoint again. Otherwise:
+
+- same key with a different method, path or body: 422
+- same key while the first request is still running: 409 with Retry-After
+- failed requests (error responses or exceptions) release the key, so the
+  request can be retried
+
+Keys are scoped to the authenticated user and kept for
+IDEMPOTENCY_KEY_TTL_SECONDS. A reservation left behind by a crashed
+process expires after IDEMPOTENCY_LOCK_TIMEOUT_SECONDS.
+"""
+
+import hashlib
+from collections.abc import Callable, Coroutine
+from datetime import datetime, timedelta, timezone
+from typing import Any, override
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import decode_access_token
+from app.models.idempotency_key import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENT_METHODS = {"POST", "PATCH"}
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_REQUESTS = metrics.Counter(
+    "idempotency_requests_total",
+    "Requests sent with an Idempotency-Key by outcome",
+    labelnames=("outcome",),
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _owner(request: Request) -> str | None:
+    """User the key belongs to, from the bearer token (None if unauthenticated)."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = decode_access_token(token)
+    except HTTPException:
+        return None
+    return f"{payload.get('role')}:{payload.get('sub')}"
+
+
+async def _fingerprint(request: Request) -> str:
+    """Hash identifying the request a key was first used for."""
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b"\0" + request.url.path.encode())
+    digest.update(b"\0" + request.url.query.encode())
+    digest.update(b"\0" + await request.body())
+    return digest.hexdigest()
+
+
+def _error(status_code: int, detail: str, headers: dict[str, str] | None = None) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+
+
+def _reserve(owner: str, key: str, fingerprint: str) -> Response | None:
+    """
+    Reserve a key for a new request.
+
+    Returns:
+        None if the request should run, otherwise the response to send
+        (a replay or an error)
+    """
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        record = db.get(IdempotencyKey, (owner, key))
+        if record is not None and (
+            _as_utc(record.created_at) < now - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+            or (
+                record.status_code is None
+                and _as_utc(record.created_at)
+                < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+            )
+        ):
+            db.delete(record)
+            db.flush()
+            record = None
+
+        if record is None:
+            db.add(IdempotencyKey(owner=owner, key=key, fingerprint=fingerprint, created_at=now))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                # A concurrent request reserved the key first
+                db.rollback()
+                record = db.get(IdempotencyKey, (owner, key))
+                if record is None:
+                    return _error(
+                        status.HTTP_409_CONFLICT,
+                        "A request with this Idempotency-Key just finished; retry",
+                        headers={"Retry-After": "1"},
+                    )
+
+        if record.fingerprint != fingerprint:
+            IDEMPOTENCY_REQUESTS.labels("mismatch").inc()
+            return _error(
+                status.HTTP_422_UNPROCESSABLE_CONTENT,
+                "Idempotency-Key was already used for a different request",
+            )
+        if record.status_code is None:
+            IDEMPOTENCY_REQUESTS.labels("in_progress").inc()
+            return _error(
+                status.HTTP_409_CONFLICT,
+                "A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": "1"},
+            )
+
+        IDEMPOTENCY_REQUESTS.labels("replayed").inc()
+        return Response(
+            content=record.body,
+            status_code=record.status_code,
+            media_type=record.content_type,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+
+def _complete(owner: str, key: str, response: Response) -> None:
+    """Store the response of a successful request."""
+    with SessionLocal() as db:
+        record = db.get(IdempotencyKey, (owner, key))
+        if record is None:
+            return
+        record.status_code = response.status_code
+        record.content_type = response.headers.get("content-type")
+        record.body = bytes(response.body)
+        db.commit()
+
+
+def _release(owner: str, key: str) -> None:
+    """Forget the reservation of a failed request so it can be retried."""
+    with SessionLocal() as db:
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.owner == owner,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        db.commit()
+
+
+class IdempotentRoute(APIRoute):
+    """Route class honouring the Idempotency-Key header on POST and PATCH."""
+
+    @override
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        if not self.methods & IDEMPOTENT_METHODS:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(HEADER)
+            if key is None:
+                return await handler(request)
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return _error(
+                    status.HTTP_400_BAD_REQUEST,
+                    f"{HEADER} must be between 1 and {MAX_KEY_LENGTH} characters",
+                )
+            owner = _owner(request)
+            if owner is None:
+                # Unauthenticated; the endpoint rejects the request itself
+                return await handler(request)
+
+            early = await run_in_threadpool(_reserve, owner, key, await _fingerprint(request))
+            if early is not None:
+                return early
+
+            try:
+                response = await handler(request)
+            except BaseException:
+                await run_in_threadpool(_release, owner, key)
+                raise
+
+            if 200 <= response.status_code < 300:
+                IDEMPOTENCY_REQUESTS.labels("stored").inc()
+                await run_in_threadpool(_complete, owner, key, response)
+            else:
+                await run_in_threadpool(_release, owner, key)
+            return response
+
+        return idempotent_handler
+
+
+def purge_expired_keys(db: Session) -> int:
+    """
+    Delete idempotency keys older than IDEMPOTENCY_KEY_TTL_SECONDS.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of keys deleted
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff))
+    db.commit()
+    return result.rowcount
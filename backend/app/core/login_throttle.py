@@ -0,0 +1,166 @@
+"""
+Sliding-window throttling of failed logins.
+
+Failed logins are counted per email address and per client IP. Once a
+key reaches its limit within the window, further attempts are rejected
+before the user lookup and the bcrypt verification, so a
+credential-stuffing burst cannot monopolise the CPU.
+
+Two backends are available (LOGIN_THROTTLE_BACKEND):
+
+- "memory": per-process windows; cheap, but each worker and instance
+  counts separately, so the effective limit is multiplied by their number
+- "database": windows shared by all processes through the login_attempts
+  table (the deployment's shared store), at the cost of one query per
+  key and login
+
+The client IP is the one uvicorn reports; behind a reverse proxy, set
+FORWARDED_ALLOW_IPS so it is taken from X-Forwarded-For.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.login_attempt import LoginAttempt
+
+LOGIN_THROTTLED = metrics.Counter(
+    "login_throttled_total",
+    "Login attempts rejected before password verification by throttle scope",
+    ["scope"],
+)
+
+
+def throttle_keys(email: str, client_ip: str | None) -> dict[str, str]:
+    """
+    Throttle keys of a login attempt.
+
+    Args:
+        email: Email address the attempt is for
+        client_ip: Address of the client, if known
+
+    Returns:
+        Mapping of scope ("email" or "ip") to key
+    """
+    keys = {"email": f"email:{email.strip().lower()}"}
+    if client_ip:
+        keys["ip"] = f"ip:{client_ip}"
+    return keys
+
+
+def _limits() -> dict[str, tuple[int, int]]:
+    """Scope -> (max failed attempts, window seconds)."""
+    return {
+        "email": (settings.LOGIN_MAX_FAILURES_PER_EMAIL, settings.LOGIN_EMAIL_WINDOW_SECONDS),
+        "ip": (settings.LOGIN_MAX_FAILURES_PER_IP, settings.LOGIN_IP_WINDOW_SECONDS),
+    }
+
+
+class MemoryLoginThrottle:
+    """Per-process sliding windows of failure timestamps."""
+
+    def __init__(self):
+        self._attempts: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, keys: dict[str, str]) -> float | None:
+        """Seconds until an attempt is allowed, or None if it is allowed now."""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for scope, key in keys.items():
+                limit, window = _limits()[scope]
+                attempts = self._attempts.get(key)
+                if not attempts:
+                    continue
+                while attempts and attempts[0] <= now - window:
+                    attempts.popleft()
+                if len(attempts) >= limit:
+                    LOGIN_THROTTLED.labels(scope).inc()
+                    wait = max(wait, attempts[0] + window - now)
+        return wait or None
+
+    def record_failure(self, keys: dict[str, str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._attempts) >= settings.LOGIN_THROTTLE_MAX_KEYS:
+                self._prune(now)
+            for key in keys.values():
+                self._attempts.setdefault(key, deque()).append(now)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def _prune(self, now: float) -> None:
+        window = max(settings.LOGIN_EMAIL_WINDOW_SECONDS, settings.LOGIN_IP_WINDOW_SECONDS)
+        for key in [k for k, attempts in self._attempts.items() if not attempts or attempts[-1] <= now - window]:
+            del self._attempts[key]
+        # Still full (e.g. a spray of random emails): drop the oldest keys
+        excess = len(self._attempts) - settings.LOGIN_THROTTLE_MAX_KEYS // 2
+        for key in list(self._attempts)[:max(excess, 0)]:
+            del self._attempts[key]
+
+
+class DatabaseLoginThrottle:
+    """Sliding windows shared by all processes through the login_attempts table."""
+
+    def retry_after(self, keys: dict[str, str]) -> float | None:
+        """Seconds until an attempt is allowed, or None if it is allowed now."""
+        now = datetime.now(timezone.utc)
+        wait = 0.0
+        with SessionLocal() as db:
+            for scope, key in keys.items():
+                limit, window = _limits()[scope]
+                count, oldest = db.execute(
+                    select(func.count(), func.min(LoginAttempt.attempted_at)).where(
+                        LoginAttempt.key == key,
+                        LoginAttempt.attempted_at > now - timedelta(seconds=window),
+                    )
+                ).one()
+                if count >= limit:
+                    LOGIN_THROTTLED.labels(scope).inc()
+                    if oldest.tzinfo is None:
+                        oldest = oldest.replace(tzinfo=timezone.utc)  # SQLite
+                    wait = max(wait, (oldest + timedelta(seconds=window) - now).total_seconds())
+        return max(wait, 1.0) if wait else None
+
+    def record_failure(self, keys: dict[str, str]) -> None:
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as db:
+            db.add_all(LoginAttempt(key=key, attempted_at=now) for key in keys.values())
+            db.commit()
+
+    def reset(self, key: str) -> None:
+        with SessionLocal() as db:
+            db.execute(delete(LoginAttempt).where(LoginAttempt.key == key))
+            db.commit()
+
+
+def purge_login_attempts(db: Session) -> int:
+    """
+    Delete recorded login failures older than every throttle window.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of attempts deleted
+    """
+    window = max(settings.LOGIN_EMAIL_WINDOW_SECONDS, settings.LOGIN_IP_WINDOW_SECONDS)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=window)
+    result = db.execute(delete(LoginAttempt).where(LoginAttempt.attempted_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+login_throttle: MemoryLoginThrottle | DatabaseLoginThrottle = (
+    DatabaseLoginThrottle() if settings.LOGIN_THROTTLE_BACKEND == "database" else MemoryLoginThrottle()
+)
@@ -0,0 +1,353 @@
+"""
+Dependency-free Prometheus metrics.
+
+Provides counters, gauges and histograms rendered in the Prometheus text
+exposition format, plus ASGI middleware recording per-route request
+metrics. Labelled children are cached, so recording a sample on the hot
+path is a dictionary lookup and a locked increment.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import AsyncIterator, Callable, Iterable
+from typing import Any
+
+import anyio.to_thread
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: list["Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "Metric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines: list[str] = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric(ABC):
+    """Base class for labelled metrics."""
+    type_name = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: Registry | None = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values: str) -> Any:
+        """Get the child metric for a combination of label values."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Create the value tracked for one combination of label values."""
+
+    def _default(self) -> Any:
+        return self.labels()
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Exposition lines for every child, without HELP and TYPE."""
+
+
+class _Value:
+    """A single numeric value shared by counters and gauges."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+    type_name = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+
+    A gauge may be backed by a function evaluated at scrape time instead
+    of being set explicitly.
+    """
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: Registry | None = REGISTRY,
+        function: Callable[[], float] | None = None,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self._function = function
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def samples(self) -> list[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception:
+                return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count of one labelled histogram."""
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> "_Timer":
+        """Context manager observing the elapsed time of its block."""
+        return _Timer(self)
+
+
+class _Timer:
+    def __init__(self, histogram: _HistogramValue):
+        self._histogram = histogram
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._histogram.observe(time.perf_counter() - self._started)
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: Registry | None = REGISTRY,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+    def samples(self) -> list[str]:
+        lines: list[str] = []
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# HTTP metrics
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template",
+    ["method", "route"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served by method and route template",
+    ["method", "route"],
+)
+
+# Cache metrics
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss)",
+    ["cache", "result"],
+)
+
+# Threadpool metrics (evaluated on the event loop when /metrics is scraped)
+THREADPOOL_CAPACITY = Gauge(
+    "threadpool_tokens_total",
+    "Worker threads available for sync endpoints and dependencies",
+    function=lambda: anyio.to_thread.current_default_thread_limiter().total_tokens,
+)
+THREADPOOL_IN_USE = Gauge(
+    "threadpool_tokens_in_use",
+    "Worker threads currently running sync endpoints and dependencies",
+    function=lambda: anyio.to_thread.current_default_thread_limiter().borrowed_tokens,
+)
+THREADPOOL_WAITING = Gauge(
+    "threadpool_tasks_waiting",
+    "Tasks queued for a free worker thread",
+    function=lambda: anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting,
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _route_template(scope: Scope) -> str:
+    """Route template (e.g. /api/students/{student_id}) selected by the router."""
+    return getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+async def track_in_flight(request: Request) -> AsyncIterator[None]:
+    """
+    Application-wide dependency counting in-flight requests per route.
+
+    Runs right after routing, when the route template is known.
+    """
+    gauge = HTTP_IN_FLIGHT.labels(request.method, _route_template(request.scope))
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts and latency.
+
+    Requests are labelled with their route template rather than the raw
+    path to keep label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            method = scope["method"]
+            route = _route_template(scope)
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
@@ -0,0 +1,80 @@
+"""
+Notification delivery sinks.
+
+The outbox dispatcher hands rendered notifications to the sink selected
+by NOTIFICATION_SINK:
+
+- "log": appends one JSON line per notification to NOTIFICATION_LOG_PATH
+  (or logs it when no path is set); for development and tests
+- "smtp": sends an email through NOTIFICATION_SMTP_HOST/PORT, e.g. a
+  local relay or a stand-in such as `python -m aiosmtpd -n`
+
+A sink raises on failure; the dispatcher then retries the messages with
+backoff.
+"""
+
+import json
+import logging
+import smtplib
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from typing import Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Notification:
+    """A message to one recipient."""
+    recipient: str
+    subject: str
+    body: str
+
+
+class NotificationSink(Protocol):
+    def send(self, notification: Notification) -> None: ...
+
+
+class LogSink:
+    """Writes notifications as JSON lines."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, notification: Notification) -> None:
+        line = json.dumps({"sent_at": datetime.now(timezone.utc).isoformat(), **asdict(notification)})
+        if not self.path:
+            logger.info("Notification: %s", line)
+            return
+        with self._lock, open(self.path, "a", encoding="utf-8") as log_file:
+            log_file.write(line + "\n")
+
+
+class SmtpSink:
+    """Sends notifications as plain-text emails."""
+
+    def __init__(self, host: str, port: int, sender: str):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send(self, notification: Notification) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = notification.recipient
+        message["Subject"] = notification.subject
+        message.set_content(notification.body)
+        with smtplib.SMTP(self.host, self.port, timeout=settings.NOTIFICATION_SMTP_TIMEOUT_SECONDS) as smtp:
+            smtp.send_message(message)
+
+
+def create_sink() -> NotificationSink:
+    """The sink configured by NOTIFICATION_SINK."""
+    if settings.NOTIFICATION_SINK == "smtp":
+        return SmtpSink(settings.NOTIFICATION_SMTP_HOST, settings.NOTIFICATION_SMTP_PORT, settings.NOTIFICATION_SENDER)
+    return LogSink(settings.NOTIFICATION_LOG_PATH)
@@ -0,0 +1,277 @@
+"""
+On-demand per-request profiling.
+
+A staff user can send `X-Profile: 1` with any request to run it under a
+sampling profiler. Stacks of threads executing application code are
+sampled at a fixed interval and stored as collapsed stacks (the input
+format of flamegraph.pl and speedscope). SQL statements executed by the
+request are timed, and samples taken while a statement is running get
+the statement appended as a leaf frame, so database time shows up in
+place in the flame graph.
+
+Requests without the header only pay for a scan of the request headers:
+the SQL hooks are attached to the engine only while a profile is running.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import app as app_package
+from app.core.config import settings
+from app.core.database import engine
+from app.core.security import decode_access_token
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+_APP_DIR = os.path.dirname(app_package.__file__)
+_SQL_FRAME_LENGTH = 120
+
+
+@dataclass
+class RequestProfile:
+    """Samples and SQL timings collected for one profiled request."""
+    id: str
+    method: str
+    path: str
+    user_id: int
+    started_at: datetime
+    sample_interval: float
+    duration_ms: float | None = None
+    status_code: int | None = None
+    samples: Counter[str] = field(default_factory=Counter)
+    sql: list[dict[str, Any]] = field(default_factory=list)
+    # Thread id -> statement currently executing on it
+    running_sql: dict[int, str] = field(default_factory=dict)
+    _started: float = field(default_factory=time.perf_counter)
+
+    def collapsed(self) -> str:
+        """Render samples as collapsed stacks ("frame;frame;frame count")."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "user_id": self.user_id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "status_code": self.status_code,
+            "sample_count": sum(self.samples.values()),
+            "sql_count": len(self.sql),
+            "sql_ms": round(sum(entry["duration_ms"] for entry in self.sql), 3),
+        }
+
+
+# Most recent profiles, oldest first
+_profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+_profiles_lock = threading.Lock()
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+
+# Number of running profiles; SQL hooks are attached while it is non-zero
+_active_count = 0
+_active_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    conn.info.setdefault("profile_started", []).append(time.perf_counter())
+    profile.running_sql[threading.get_ident()] = statement
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None or not conn.info.get("profile_started"):
+        return
+    started = conn.info["profile_started"].pop()
+    profile.running_sql.pop(threading.get_ident(), None)
+    profile.sql.append({
+        "offset_ms": round((started - profile._started) * 1000, 3),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        "statement": statement,
+    })
+
+
+def _attach_sql_hooks() -> None:
+    global _active_count
+    with _active_lock:
+        _active_count += 1
+        if _active_count == 1:
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _detach_sql_hooks() -> None:
+    global _active_count
+    with _active_lock:
+        _active_count -= 1
+        if _active_count == 0:
+            event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+            event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_qualname}"
+
+
+def _sql_frame(statement: str) -> str:
+    text = " ".join(statement.split())
+    if len(text) > _SQL_FRAME_LENGTH:
+        text = text[:_SQL_FRAME_LENGTH - 3] + "..."
+    return f"[sql] {text}".replace(";", ",")
+
+
+class _Sampler(threading.Thread):
+    """
+    Background thread sampling stacks of threads running application code.
+
+    Sampling is per process, so stacks of other requests running
+    application code at the same time are included as well. The sampler
+    needs the GIL to take a sample, so CPU-bound code is sampled at most
+    once per interpreter switch interval (5ms by default).
+    """
+
+    def __init__(self, profile: RequestProfile):
+        super().__init__(name=f"profiler-{profile.id[:8]}", daemon=True)
+        self.profile = profile
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.profile.sample_interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack: list[str] = []
+                in_app = False
+                while frame is not None:
+                    filename = frame.f_code.co_filename
+                    if filename.startswith(_APP_DIR) and filename != __file__:
+                        in_app = True
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                if not in_app:
+                    continue
+                stack.reverse()
+                statement = self.profile.running_sql.get(thread_id)
+                if statement is not None:
+                    stack.append(_sql_frame(statement))
+                self.profile.samples[";".join(stack)] += 1
+
+    def stop(self) -> None:
+        """Ask the thread to stop; it exits within one sample interval (join it off the event loop)."""
+        self._stop_event.set()
+
+
+def _staff_user_id(scope: Scope) -> int | None:
+    """User id from the bearer token if it belongs to a staff user."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                payload = decode_access_token(token)
+            except HTTPException:
+                return None
+            if payload.get("role") != "staff" or payload.get("sub") is None:
+                return None
+            return int(payload["sub"])
+    return None
+
+
+def _store(profile: RequestProfile) -> None:
+    with _profiles_lock:
+        _profiles[profile.id] = profile
+        while len(_profiles) > settings.PROFILE_HISTORY_SIZE:
+            _profiles.popitem(last=False)
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    """Summaries of stored profiles, newest first."""
+    with _profiles_lock:
+        profiles = list(_profiles.values())
+    return [profile.summary() for profile in reversed(profiles)]
+
+
+def get_profile(profile_id: str) -> RequestProfile | None:
+    """Get a stored profile by id."""
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that ask for it.
+
+    Profiles are only taken for staff users; the header is ignored for
+    everyone else. The profile id is returned in the X-Profile-Id
+    response header and the profile can be fetched from
+    /api/admin/profiles/{profile_id}.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (PROFILE_HEADER, b"1") not in scope["headers"]:
+            await self.app(scope, receive, send)
+            return
+
+        user_id = _staff_user_id(scope)
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            id=uuid.uuid4().hex,
+            method=scope["method"],
+            path=scope["path"],
+            user_id=user_id,
+            started_at=datetime.now(timezone.utc),
+            sample_interval=settings.PROFILE_SAMPLE_INTERVAL_SECONDS,
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PROFILE_ID_HEADER, profile.id.encode("latin-1")),
+                ]
+            await send(message)
+
+        _attach_sql_hooks()
+        token = _current_profile.set(profile)
+        sampler = _Sampler(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            # Waits up to one sample interval, so not on the event loop
+            await run_in_threadpool(sampler.join)
+            _current_profile.reset(token)
+            _detach_sql_hooks()
+            profile.duration_ms = round((time.perf_counter() - profile._started) * 1000, 3)
+            profile.running_sql.clear()
+            _store(profile)
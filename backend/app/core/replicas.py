@@ -0,0 +1,216 @@
+"""
+Read-replica routing.
+
+When DATABASE_REPLICA_URLS is set, sessions created while serving a GET
+or HEAD request read from a replica (round robin), and everything else
+uses the primary. Two rules keep reads consistent:
+
+- Read-your-writes: after a client's request commits a write, that
+  client's reads stay on the primary for DB_REPLICA_STICKY_SECONDS, long
+  enough for the replicas to catch up. The response to the write carries
+  the deadline in a cookie, so the follow-up read is routed correctly by
+  whichever worker or instance serves it (ReadYourWritesMiddleware).
+- Fallback: a replica that fails a query, becomes unreachable or lags
+  more than DB_REPLICA_MAX_LAG_SECONDS is taken out of rotation for
+  DB_REPLICA_RETRY_SECONDS. With no healthy replica, reads use the primary.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.request_context import current_header, current_method
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ("GET", "HEAD")
+STICKY_COOKIE = "lms_primary_reads_until"  # Epoch seconds
+
+READ_SESSIONS = metrics.Counter(
+    "db_read_sessions_total",
+    "Sessions of read-only requests by the database they read from",
+    labelnames=("target",),
+)
+
+# Seconds since the last replayed transaction, or 0 when fully caught up
+_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass
+class Replica:
+    """A read replica and its health."""
+    name: str
+    engine: Engine
+    down_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class ReplicaSet:
+    """Healthy-replica selection for read-only sessions."""
+
+    def __init__(self, engines: list[Engine]):
+        self.replicas = [
+            Replica(name=engine.url.render_as_string(hide_password=True), engine=engine)
+            for engine in engines
+        ]
+        self._next = 0
+        self._lock = threading.Lock()
+        for replica in self.replicas:
+            self._watch_errors(replica)
+
+    def _watch_errors(self, replica: Replica) -> None:
+        @event.listens_for(replica.engine, "handle_error")
+        def _on_error(context):
+            # Query errors (bad SQL, constraint violations) are not the replica's fault
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(replica, f"connection error: {context.original_exception}")
+
+    def engines(self) -> list[Engine]:
+        return [replica.engine for replica in self.replicas]
+
+    def healthy_count(self) -> int:
+        return sum(replica.healthy for replica in self.replicas)
+
+    def mark_down(self, replica: Replica, reason: str) -> None:
+        """Take a replica out of rotation for DB_REPLICA_RETRY_SECONDS."""
+        if replica.healthy:
+            logger.warning("Replica %s marked down: %s", replica.name, reason)
+        replica.down_until = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+
+    def choose(self) -> Engine | None:
+        """Next healthy replica (round robin), or None if there is none."""
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+                if replica.healthy:
+                    return replica.engine
+        return None
+
+    def choose_for_request(self) -> Engine | None:
+        """
+        Replica to read from in the current context.
+
+        Returns:
+            A replica engine, or None when the session must use the primary
+            (no replicas, not a read-only request, recent write, or no
+            healthy replica)
+        """
+        if not self.replicas or current_method() not in READ_METHODS:
+            return None
+        if is_sticky():
+            READ_SESSIONS.labels("primary_sticky").inc()
+            return None
+
+        replica = self.choose()
+        READ_SESSIONS.labels("replica" if replica is not None else "primary_fallback").inc()
+        return replica
+
+    def check(self) -> str | None:
+        """
+        Probe every replica and update its health.
+
+        Replicas that are unreachable or lag more than
+        DB_REPLICA_MAX_LAG_SECONDS are marked down; the others return to
+        rotation.
+
+        Returns:
+            Summary of unhealthy replicas, if any
+        """
+        problems = []
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    if connection.dialect.name == "postgresql":
+                        lag = float(connection.execute(_LAG_QUERY).scalar() or 0)
+                    else:
+                        connection.exec_driver_sql("SELECT 1")
+                        lag = 0.0
+            except Exception as e:
+                problems.append(f"{replica.name} unreachable")
+                self.mark_down(replica, f"health check failed: {e}")
+                continue
+
+            if lag > settings.DB_REPLICA_MAX_LAG_SECONDS:
+                problems.append(f"{replica.name} lagging {lag:.1f}s")
+                self.mark_down(replica, f"replication lag {lag:.1f}s")
+            elif not replica.healthy:
+                logger.info("Replica %s back in rotation", replica.name)
+                replica.down_until = 0.0
+
+        return "; ".join(problems) or None
+
+
+# Set by ReadYourWritesMiddleware for each request; holds the sticky deadline once it writes
+_sticky_deadline: ContextVar[list[float] | None] = ContextVar("sticky_deadline", default=None)
+
+
+def mark_write() -> None:
+    """Keep the current client's reads on the primary for the sticky window."""
+    deadline = _sticky_deadline.get()
+    if deadline is None or settings.DB_REPLICA_STICKY_SECONDS <= 0:
+        return
+    # A list shared with the middleware (worker threads get a copy of the context, not of the list)
+    deadline[:] = [time.time() + settings.DB_REPLICA_STICKY_SECONDS]
+
+
+def is_sticky() -> bool:
+    """Whether the current client wrote recently and must read from the primary."""
+    cookies = current_header(b"cookie")
+    if not cookies:
+        return False
+    for cookie in cookies.split(";"):
+        name, _, value = cookie.strip().partition("=")
+        if name == STICKY_COOKIE:
+            try:
+                until = float(value)
+            except ValueError:
+                return False
+            now = time.time()
+            # A deadline further away than the window was not set by us
+            return now < until <= now + settings.DB_REPLICA_STICKY_SECONDS
+    return False
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware sending the sticky-read deadline of a writing request to the client as a cookie."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline: list[float] = []
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and deadline:
+                cookie = (
+                    f"{STICKY_COOKIE}={deadline[0]:.3f}; Max-Age={math.ceil(settings.DB_REPLICA_STICKY_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        token = _sticky_deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _sticky_deadline.reset(token)
@@ -0,0 +1,72 @@
+"""
+Per-request context shared with code outside the request handlers.
+
+The ASGI scope of the request being served is kept in a context variable,
+so engine event listeners and other low-level hooks can tell which
+request (and route) they are running for. Context variables are copied
+into the worker threads running sync endpoints and dependencies.
+"""
+
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+_current_scope: ContextVar[Scope | None] = ContextVar("current_scope", default=None)
+
+
+def current_method() -> str | None:
+    """HTTP method of the request being served, if any."""
+    scope = _current_scope.get()
+    return scope["method"] if scope is not None else None
+
+
+def current_header(name: bytes) -> str | None:
+    """
+    Value of a header of the request being served, if any.
+
+    Args:
+        name: Lower-case header name
+
+    Returns:
+        The first matching header value
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def current_route() -> str | None:
+    """
+    Route template of the request being served, if any.
+
+    The router stores the matched route in the scope, so this is only
+    known once routing has happened (i.e. inside dependencies and
+    endpoints); the raw path is returned before that.
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+
+class RequestContextMiddleware:
+    """ASGI middleware exposing the current request scope to context-aware hooks."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
@@ -0,0 +1,224 @@
+"""
+Access token revocation.
+
+Access tokens are stateless JWTs, so revoking one (logout everywhere,
+deleted user) is recorded in the token_revocations table and enforced
+from an in-memory copy held by every process:
+
+- a set of revoked token ids (jti)
+- per user, the time up to which all of the user's tokens are revoked
+
+Checking a token is a set and a dict lookup, with no database access.
+Each process refreshes its copy incrementally (rows added since the last
+refresh) every TOKEN_REVOCATION_REFRESH_SECONDS, so a
+revocation takes effect everywhere within that interval, and immediately
+in the process that made it. Entries are dropped once every token they
+cover has expired, which keeps the list as small as the number of
+revocations per ACCESS_TOKEN_EXPIRE_MINUTES.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, event, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.token_revocation import TokenRevocation
+
+# Rows are re-read for this long after their creation: ids are assigned
+# when inserted but become visible at commit, possibly out of order
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+REVOCATION_REFRESH_DURATION = metrics.Histogram(
+    "token_revocation_refresh_seconds",
+    "Time spent loading new token revocations",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+
+
+# (id, jti, user id, revoked at, expires at) with timestamps as epoch seconds
+_Entry = tuple[int, str | None, int | None, float, float]
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite returns naive datetimes
+    return (value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _entry(row: Any) -> _Entry:
+    return (row.id, row.jti, row.user_id, _timestamp(row.revoked_at), _timestamp(row.expires_at))
+
+
+class RevocationList:
+    """In-memory, incrementally refreshed copy of the token_revocations table."""
+
+    def __init__(self):
+        self._jtis: dict[str, float] = {}  # jti -> expiry
+        self._users: dict[int, tuple[float, float]] = {}  # user id -> (revoked up to, expiry)
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jtis) + len(self._users)
+
+    def is_revoked(self, payload: dict[str, Any]) -> bool:
+        """
+        Whether a decoded access token has been revoked.
+
+        Args:
+            payload: Verified JWT claims
+
+        Returns:
+            True if the token id or the token's user was revoked
+        """
+        jti = payload.get("jti")
+        if jti is not None and jti in self._jtis:
+            return True
+
+        user = self._users.get(int(payload.get("sub", 0)))
+        # iat has one-second resolution: tokens issued in the second of the revocation count as revoked
+        return user is not None and payload.get("iat", 0) <= int(user[0])
+
+    def refresh(self, db: Session) -> None:
+        """
+        Load revocations added since the last refresh and drop expired ones.
+
+        Args:
+            db: Database session
+        """
+        now = datetime.now(timezone.utc)
+        rows = db.execute(
+            select(TokenRevocation)
+            .where(
+                or_(TokenRevocation.id > self._last_id, TokenRevocation.revoked_at > now - REFRESH_OVERLAP),
+                TokenRevocation.expires_at > now,
+            )
+            .order_by(TokenRevocation.id)
+        ).scalars().all()
+
+        self.apply([_entry(row) for row in rows])
+        with self._lock:
+            self._prune(now.timestamp())
+
+    def apply(self, entries: list[_Entry]) -> None:
+        """Add revocations to the in-memory list."""
+        with self._lock:
+            for row_id, jti, user_id, revoked_at, expires in entries:
+                if jti is not None:
+                    self._jtis[jti] = expires
+                if user_id is not None:
+                    revoked_up_to, previous_expiry = self._users.get(user_id, (0.0, 0.0))
+                    self._users[user_id] = (max(revoked_up_to, revoked_at), max(previous_expiry, expires))
+                self._last_id = max(self._last_id, row_id)
+
+    def _prune(self, now: float) -> None:
+        for jti in [jti for jti, expires in self._jtis.items() if expires <= now]:
+            del self._jtis[jti]
+        for user_id in [user_id for user_id, (_, expires) in self._users.items() if expires <= now]:
+            del self._users[user_id]
+
+
+revocation_list = RevocationList()
+
+metrics.Gauge(
+    "token_revocations_loaded",
+    "Revoked tokens and users held in this process's revocation list",
+    function=lambda: len(revocation_list),
+)
+
+
+def _record(db: Session, revocations: list[dict[str, Any]]) -> None:
+    """
+    Add revocations to the caller's transaction in one multi-row INSERT;
+    they apply locally once committed.
+    """
+    rows = db.execute(
+        insert(TokenRevocation).values(revocations).returning(
+            TokenRevocation.id, TokenRevocation.jti, TokenRevocation.user_id,
+            TokenRevocation.revoked_at, TokenRevocation.expires_at,
+        )
+    ).all()
+    db.info.setdefault("pending_revocations", []).extend(_entry(row) for row in rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    pending = session.info.pop("pending_revocations", None)
+    if pending:
+        revocation_list.apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("pending_revocations", None)
+
+
+def revoke_token(db: Session, jti: str, expires_at: datetime) -> None:
+    """
+    Revoke one access token when the caller's transaction commits.
+
+    Args:
+        db: Database session
+        jti: Token id claim
+        expires_at: Token expiry (the revocation is kept until then)
+    """
+    _record(db, [{"jti": jti, "revoked_at": datetime.now(timezone.utc), "expires_at": expires_at}])
+
+
+def revoke_user(db: Session, user_id: int) -> None:
+    """
+    Revoke every access token issued to a user so far, when the caller's
+    transaction commits.
+
+    Args:
+        db: Database session
+        user_id: User whose tokens are revoked
+    """
+    revoke_users(db, [user_id])
+
+
+def revoke_users(db: Session, user_ids: list[int]) -> None:
+    """
+    Revoke every access token issued to several users so far, when the
+    caller's transaction commits (one batched INSERT for all of them).
+
+    Args:
+        db: Database session
+        user_ids: Users whose tokens are revoked
+    """
+    if not user_ids:
+        return
+    now = datetime.now(timezone.utc)
+    # One extra second covers tokens issued within the revocation's second
+    expires_at = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES, seconds=1)
+    _record(db, [
+        {"user_id": user_id, "revoked_at": now, "expires_at": expires_at} for user_id in user_ids
+    ])
+
+
+def purge_expired_revocations(db: Session) -> int:
+    """
+    Delete revocations whose tokens have all expired.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of revocations deleted
+    """
+    result = db.execute(
+        delete(TokenRevocation).where(TokenRevocation.expires_at <= datetime.now(timezone.utc))
+    )
+    db.commit()
+    return result.rowcount
+
+
+def refresh_revocations(db: Session) -> None:
+    """Scheduler job keeping this process's revocation list current."""
+    started = time.perf_counter()
+    revocation_list.refresh(db)
+    REVOCATION_REFRESH_DURATION.observe(time.perf_counter() - started)
@@ -0,0 +1,173 @@
+"""
+In-process background job scheduler.
+
+Runs periodic maintenance jobs (e.g. subscription sweeps) on the event loop,
+executing each job in a worker thread with its own database session.
+Jobs marked as leader-only run on a single process across the deployment,
+elected through a Postgres session-level advisory lock.
+"""
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[Session], Any]
+
+
+@dataclass
+class Job:
+    """A periodic job registered with the scheduler."""
+    name: str
+    func: JobFunc
+    interval_seconds: float
+    leader_only: bool = True
+
+
+class LeaderLock:
+    """
+    Leader election through a Postgres advisory lock.
+
+    The lock is held on a dedicated connection for as long as this process
+    stays leader. Other dialects have no cross-process coordination, so the
+    local process is always considered the leader.
+    """
+
+    def __init__(self, key: int):
+        self.key = key
+        self._connection: Connection | None = None
+        self._mutex = threading.Lock()
+
+    def acquire(self) -> bool:
+        """
+        Try to become (or confirm we still are) the leader.
+
+        Returns:
+            True if this process holds the lock
+        """
+        if engine.dialect.name != "postgresql":
+            return True
+
+        with self._mutex:
+            if self._connection is not None:
+                try:
+                    self._connection.exec_driver_sql("SELECT 1")
+                    return True
+                except Exception:
+                    # Connection lost; the server has released the lock
+                    self._discard()
+
+            connection = engine.connect()
+            try:
+                acquired = connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+                ).scalar()
+                connection.commit()
+            except Exception:
+                connection.close()
+                raise
+
+            if acquired:
+                self._connection = connection
+                logger.info("Acquired scheduler leadership (lock %s)", self.key)
+                return True
+
+            connection.close()
+            return False
+
+    def release(self) -> None:
+        """Release the lock if held."""
+        with self._mutex:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+                )
+                self._connection.commit()
+            except Exception:
+                logger.warning("Failed to release scheduler lock cleanly", exc_info=True)
+            self._discard()
+
+    def _discard(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.invalidate()
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+class Scheduler:
+    """
+    Runs registered jobs periodically until stopped.
+
+    Each job gets its own asyncio task; the job body runs in a thread so
+    blocking database work never stalls the event loop.
+    """
+
+    def __init__(self):
+        self._jobs: list[Job] = []
+        self._tasks: list[asyncio.Task[None]] = []
+        self._leader = LeaderLock(settings.SCHEDULER_LOCK_KEY)
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        interval_seconds: float,
+        leader_only: bool = True,
+    ) -> None:
+        """
+        Register a periodic job.
+
+        Args:
+            name: Job name used in logs
+            func: Callable receiving a database session
+            interval_seconds: Delay between runs
+            leader_only: Run on the elected leader process only
+        """
+        self._jobs.append(Job(name, func, interval_seconds, leader_only))
+
+    async def start(self) -> None:
+        """Start all registered jobs."""
+        if not settings.SCHEDULER_ENABLED:
+            return
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._run(job), name=f"job:{job.name}"))
+
+    async def stop(self) -> None:
+        """Cancel running jobs and give up leadership."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await asyncio.to_thread(self._leader.release)
+
+    async def _run(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(job.interval_seconds)
+            try:
+                await asyncio.to_thread(self._execute, job)
+            except Exception:
+                logger.exception("Scheduled job %s failed", job.name)
+
+    def _execute(self, job: Job) -> None:
+        if job.leader_only and not self._leader.acquire():
+            return
+        with SessionLocal() as db:
+            result = job.func(db)
+        if result:
+            logger.info("Scheduled job %s: %s", job.name, result)
@@ -0,0 +1,178 @@
+"""
+Database schema management.
+
+Schema changes are applied by a one-shot migrate command
+(`python -m app.migrate`) rather than by every worker at boot. Workers
+started in production only verify that the database is at the expected
+Alembic revision, which is a single cheap query.
+
+Until Alembic revisions are added, the schema is created from the model
+metadata, and verification checks that every mapped table and index
+exists. As create_all() only creates missing tables, indexes added to
+existing tables are created separately.
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Index, exists, insert, inspect, literal, select
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class SchemaMismatchError(RuntimeError):
+    """Raised when the database schema does not match the application."""
+
+
+def alembic_config() -> Config:
+    """Alembic configuration with paths resolved independently of the working directory."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def expected_heads() -> set[str]:
+    """Head revisions shipped with the application."""
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def _import_models() -> None:
+    """Register every model on Base.metadata (as alembic/env.py does)."""
+    from app.models.user import User # pyright: ignore[reportUnusedImport]
+    from app.models.parent import Parent # pyright: ignore[reportUnusedImport]
+    from app.models.student import Student # pyright: ignore[reportUnusedImport]
+    from app.models.class_model import ClassModel # pyright: ignore[reportUnusedImport]
+    from app.models.class_registration import ClassRegistration # pyright: ignore[reportUnusedImport]
+    from app.models.subscription import Subscription # pyright: ignore[reportUnusedImport]
+    from app.models.session_usage import SessionUsage # pyright: ignore[reportUnusedImport]
+    from app.models.report_snapshot import ReportSnapshot # pyright: ignore[reportUnusedImport]
+    from app.models.idempotency_key import IdempotencyKey # pyright: ignore[reportUnusedImport]
+    from app.models.login_attempt import LoginAttempt # pyright: ignore[reportUnusedImport]
+    from app.models.refresh_token import RefreshToken # pyright: ignore[reportUnusedImport]
+    from app.models.token_revocation import TokenRevocation # pyright: ignore[reportUnusedImport]
+    from app.models.subscription_archive import ArchivedSubscription # pyright: ignore[reportUnusedImport]
+    from app.models.session_usage_archive import ArchivedSessionUsage # pyright: ignore[reportUnusedImport]
+    from app.models.outbox_message import OutboxMessage # pyright: ignore[reportUnusedImport]
+    from app.models.calendar_feed import CalendarFeed # pyright: ignore[reportUnusedImport]
+
+
+def _missing_indexes(engine: Engine) -> list[Index]:
+    """Mapped indexes absent from tables that already exist."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def _open_session_ledgers(engine: Engine) -> int:
+    """
+    Record the used sessions of subscriptions predating the session ledger as opening adjustments.
+
+    used_sessions is rebuilt from the ledger by the reconcile job, so these
+    balances would otherwise be reset to zero.
+    """
+    from app.models.session_usage import SessionUsage, USAGE_REASON_ADJUSTMENT
+    from app.models.subscription import Subscription
+
+    has_ledger = exists().where(SessionUsage.subscription_id == Subscription.id)
+    with engine.begin() as connection:
+        result = connection.execute(
+            insert(SessionUsage).from_select(
+                ["subscription_id", "sessions", "reason"],
+                select(Subscription.id, Subscription.used_sessions, literal(USAGE_REASON_ADJUSTMENT))
+                .where(Subscription.used_sessions > 0, ~has_ledger),
+            )
+        )
+    return result.rowcount
+
+
+def verify_schema(engine: Engine) -> str:
+    """
+    Check that the database schema matches this version of the application.
+
+    Args:
+        engine: Engine connected to the application database
+
+    Returns:
+        Short description of the verified schema state
+
+    Raises:
+        SchemaMismatchError: If migrations are pending or tables or indexes are missing
+    """
+    heads = expected_heads()
+    if heads:
+        with engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+        if current != heads:
+            raise SchemaMismatchError(
+                f"Database is at revision {sorted(current) or 'none'}, expected {sorted(heads)}; "
+                "run `python -m app.migrate` first"
+            )
+        return f"revision {', '.join(sorted(heads))}"
+
+    _import_models()
+    existing = set(inspect(engine).get_table_names())
+    missing = sorted(set(Base.metadata.tables) - existing)
+    if missing:
+        raise SchemaMismatchError(
+            f"Missing tables: {', '.join(missing)}; run `python -m app.migrate` first"
+        )
+    missing_indexes = _missing_indexes(engine)
+    if missing_indexes:
+        raise SchemaMismatchError(
+            f"Missing indexes: {', '.join(sorted(str(index.name) for index in missing_indexes))}; "
+            "run `python -m app.migrate` first"
+        )
+    return f"{len(Base.metadata.tables)} tables present"
+
+
+def create_schema(engine: Engine) -> None:
+    """
+    Create missing tables, and indexes missing from existing tables, from the model metadata.
+
+    Also opens the session ledger of subscriptions created before it existed.
+    """
+    _import_models()
+    Base.metadata.create_all(bind=engine)
+    for index in _missing_indexes(engine):
+        index.create(bind=engine)
+    _open_session_ledgers(engine)
+
+
+def reset_schema(engine: Engine) -> None:
+    """Drop and recreate all tables from the model metadata (destroys all data)."""
+    _import_models()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def migrate(engine: Engine) -> str:
+    """
+    Bring the database schema up to date.
+
+    Runs `alembic upgrade head` when the application ships revisions,
+    otherwise creates missing tables and indexes from the model metadata.
+
+    Args:
+        engine: Engine connected to the application database
+
+    Returns:
+        Short description of what was applied
+    """
+    if expected_heads():
+        command.upgrade(alembic_config(), "head")
+        return "upgraded to head"
+
+    create_schema(engine)
+    return "created missing tables and indexes from model metadata"
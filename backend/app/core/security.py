@@ -6,20 +6,32 @@ and current user dependency injection.
 """
 
 import bcrypt
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
 
+from app.core import metrics
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.revocation import revocation_list
 
 # HTTP Bearer token security
 security = HTTPBearer()
 
+PASSWORD_HASH_DURATION = metrics.Histogram(
+    "password_hash_duration_seconds",
+    "Time spent in bcrypt by operation (hash or verify)",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+
+# bcrypt hash (same cost as real ones) of a random password, verified for
+# unknown emails so their logins take as long as those of existing users
+DUMMY_PASSWORD_HASH = "$2b$12$OVPnK3Eh4vBV55OnpbuaZ.Qjmpqp8HJ.ry52kWY7dc6XoCJnq8rEe"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -32,10 +44,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    with PASSWORD_HASH_DURATION.labels("verify").time():
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
 
 
 def get_password_hash(password: str) -> str:
@@ -48,8 +61,9 @@ def get_password_hash(password: str) -> str:
     Returns:
         Bcrypt hashed password as a string
     """
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    with PASSWORD_HASH_DURATION.labels("hash").time():
+        salt = bcrypt.gensalt()
+        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
@@ -71,7 +85,8 @@ def create_access_token(data: dict[str, Any], expires_delta: timedelta | None =
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation; iat lets a user's older tokens be revoked at once
+    to_encode.update({"exp": expire, "iat": datetime.now(timezone.utc), "jti": secrets.token_hex(16)})
     
     # Sign the token with SECRET_KEY
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -105,16 +120,15 @@ def decode_access_token(token: str) -> dict[str, Any]:
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[Session, Depends(get_db)] # pyright: ignore[reportUnusedParameter]
 ) -> dict[str, Any]: 
     """
     Dependency to get current authenticated user from JWT token.
     
-    Extracts user information from the Authorization header and verifies the token.
+    Extracts user information from the Authorization header and verifies the token,
+    rejecting revoked tokens.
     
     Args:
         credentials: HTTP Authorization credentials containing the Bearer token
-        db: Database session
         
     Returns:
         Dictionary containing user_id and role
@@ -123,6 +137,14 @@ async def get_current_user(
         HTTPException: If token is invalid or user not found
     """
     payload = decode_access_token(credentials.credentials)
+
+    # In-memory check, no database query (see app.core.revocation)
+    if revocation_list.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     user_id: int | None = payload.get("sub")
     role: str | None = payload.get("role")
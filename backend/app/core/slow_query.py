@@ -0,0 +1,182 @@
+"""
+Slow-query log with automatic EXPLAIN capture.
+
+Statements executed by the engine that take longer than
+SLOW_QUERY_THRESHOLD_MS are logged with the route that issued them and
+the names of their parameters (values only with SLOW_QUERY_LOG_PARAMETERS,
+as they include emails and token hashes), and kept in a bounded in-memory ring buffer for staff
+to inspect. On PostgreSQL, an `EXPLAIN (ANALYZE, BUFFERS)` plan of slow
+SELECT statements is captured in a background thread on a separate,
+unpooled connection, so neither the request nor the pool is held up.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.request_context import current_method, current_route
+
+logger = logging.getLogger(__name__)
+
+# Plan capture states
+PLAN_PENDING = "pending"
+PLAN_CAPTURED = "captured"
+PLAN_UNSUPPORTED = "unsupported"
+PLAN_SKIPPED = "skipped"
+PLAN_FAILED = "failed"
+
+_MAX_PARAMETERS_LENGTH = 2000
+_MAX_PENDING_EXPLAINS = 4
+
+_entries: deque[dict[str, Any]] = deque(maxlen=settings.SLOW_QUERY_HISTORY_SIZE)
+_entries_lock = threading.Lock()
+_ids = itertools.count(1)
+
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+# Database URL -> unpooled engine, so plans come from the database the statement ran on
+_explain_engines: dict[str, Engine] = {}
+_pending_explains = 0
+_pending_lock = threading.Lock()
+
+
+def _format_parameters(parameters: Any) -> str:
+    """Render statement parameters for the log: their names only, unless SLOW_QUERY_LOG_PARAMETERS."""
+    if not settings.SLOW_QUERY_LOG_PARAMETERS:
+        if isinstance(parameters, dict):
+            return repr(sorted(str(key) for key in parameters))
+        if isinstance(parameters, (list, tuple)):
+            return f"<{len(parameters)} values hidden>"
+        return "<hidden>"
+    if isinstance(parameters, dict):
+        parameters = {
+            key: "***" if "password" in str(key).lower() else value
+            for key, value in parameters.items()
+        }
+    text = repr(parameters)
+    if len(text) > _MAX_PARAMETERS_LENGTH:
+        text = text[:_MAX_PARAMETERS_LENGTH] + "..."
+    return text
+
+
+def _get_explain_engine(url: URL) -> Engine:
+    # Only called from the single explain thread, so no lock is needed
+    key = url.render_as_string(hide_password=False)
+    explain_engine = _explain_engines.get(key)
+    if explain_engine is None:
+        explain_engine = _explain_engines[key] = create_engine(url, poolclass=NullPool)
+    return explain_engine
+
+
+def _capture_plan(entry: dict[str, Any], url: URL, statement: str, parameters: Any) -> None:
+    """Run EXPLAIN ANALYZE for a slow statement and store the plan on its entry."""
+    global _pending_explains
+    try:
+        connection = _get_explain_engine(url).raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SET LOCAL statement_timeout = %s",
+                (settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,)
+            )
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            connection.rollback()
+        finally:
+            connection.close()
+        entry["plan"] = plan
+        entry["plan_status"] = PLAN_CAPTURED
+    except Exception as exc:
+        logger.warning("Could not capture plan for slow query %s: %s", entry["id"], exc)
+        entry["plan_status"] = PLAN_FAILED
+    finally:
+        with _pending_lock:
+            _pending_explains -= 1
+
+
+def _schedule_plan(entry: dict[str, Any], conn, statement: str, parameters: Any, executemany: bool) -> None:
+    """Queue plan capture for explainable statements."""
+    global _pending_explains
+    explainable = (
+        conn.dialect.name == "postgresql"
+        and not executemany
+        and statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    )
+    if not explainable:
+        entry["plan_status"] = PLAN_UNSUPPORTED
+        return
+
+    with _pending_lock:
+        if _pending_explains >= _MAX_PENDING_EXPLAINS:
+            entry["plan_status"] = PLAN_SKIPPED
+            return
+        _pending_explains += 1
+
+    _explain_executor.submit(_capture_plan, entry, conn.engine.url, statement, parameters)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_stack = conn.info.get("slow_query_started")
+    if not started_stack:
+        return
+    duration_ms = (time.perf_counter() - started_stack.pop()) * 1000
+    if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    entry: dict[str, Any] = {
+        "id": next(_ids),
+        "recorded_at": datetime.now(timezone.utc),
+        "duration_ms": round(duration_ms, 3),
+        "statement": statement,
+        "parameters": _format_parameters(parameters),
+        "method": current_method(),
+        "route": current_route(),
+        "plan": None,
+        "plan_status": PLAN_PENDING,
+    }
+    logger.warning(
+        "Slow query (%.1f ms) on %s %s: %s parameters=%s",
+        duration_ms, entry["method"] or "-", entry["route"] or "-", statement, entry["parameters"]
+    )
+
+    if settings.SLOW_QUERY_EXPLAIN:
+        _schedule_plan(entry, conn, statement, parameters, executemany)
+    else:
+        entry["plan_status"] = PLAN_SKIPPED
+
+    with _entries_lock:
+        _entries.append(entry)
+
+
+def install(engine: Engine) -> None:
+    """Start timing statements executed by an engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def get_slow_queries(limit: int | None = None) -> list[dict[str, Any]]:
+    """
+    Get recorded slow queries, newest first.
+
+    Args:
+        limit: Maximum number of entries to return
+
+    Returns:
+        List of slow query entries
+    """
+    with _entries_lock:
+        entries = list(reversed(_entries))
+    return entries[:limit] if limit is not None else entries
@@ -5,14 +5,34 @@ Main entry point for the Learning Management System API.
 Handles CORS, routing, and application lifecycle.
 """
 
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import configure_mappers
 
+from app.core import concurrency, events, idempotency, login_throttle, metrics, profiling, revocation, slow_query
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.routers import auth, parents, students, classes, subscriptions
+from app.core.database import SessionLocal, engine, replica_set, warm_pool
+from app.core.replicas import ReadYourWritesMiddleware
+from app.core.request_context import RequestContextMiddleware
+from app.core.scheduler import Scheduler
+from app.core.schema import create_schema, verify_schema
+from app.routers import auth, parents, students, classes, subscriptions, reports, admin, calendar, events as events_router
+from app.services import archive_service, notification_service, subscription_service, report_service, token_service
+
+logging.basicConfig(format="%(levelname)s:     %(name)s - %(message)s")
+logging.getLogger("app").setLevel(settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+import_seconds = time.perf_counter() - _import_started
 
 
 @asynccontextmanager
@@ -21,12 +41,130 @@ async def lifespan(app: FastAPI):
     Application lifespan handler.
     
     Handles startup and shutdown events.
-    Creates database tables if they don't exist.
+    In production, only verifies the schema (migrations run separately via
+    `python -m app.migrate`); elsewhere creates missing tables. Warms the
+    connection pool and schema caches, then runs background jobs.
     """
-    # Startup: Create tables
-    Base.metadata.create_all(bind=engine)
+    timings = {"imports": import_seconds}
+
+    # Startup: Check (production) or create (development) the schema
+    started = time.perf_counter()
+    if settings.ENVIRONMENT == "production":
+        schema_state = verify_schema(engine)
+    else:
+        create_schema(engine)
+        schema_state = "created missing tables and indexes"
+    timings["schema"] = time.perf_counter() - started
+
+    # Startup: Open pool connections and build mapper/OpenAPI schemas before the first request
+    started = time.perf_counter()
+    warmed = warm_pool()
+    timings["pool"] = time.perf_counter() - started
+
+    # Startup: Load token revocations (kept current by a job on every process)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        revocation.revocation_list.refresh(db)
+    timings["revocations"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    configure_mappers()
+    app.openapi()
+    timings["schemas"] = time.perf_counter() - started
+    
+    # Startup: Start background jobs
+    scheduler = Scheduler()
+    scheduler.add_job(
+        "deactivate_lapsed_subscriptions",
+        subscription_service.deactivate_lapsed_subscriptions,
+        settings.SUBSCRIPTION_SWEEP_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "reconcile_used_sessions",
+        subscription_service.reconcile_used_sessions,
+        settings.SESSION_USAGE_RECONCILE_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "archive_ended_subscriptions",
+        archive_service.archive_ended_subscriptions,
+        settings.SUBSCRIPTION_ARCHIVE_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "enqueue_ending_soon_notifications",
+        notification_service.enqueue_ending_soon,
+        settings.ENDING_SOON_SCAN_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "dispatch_outbox",
+        notification_service.dispatch_outbox,
+        settings.OUTBOX_DISPATCH_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "purge_outbox",
+        notification_service.purge_outbox,
+        settings.OUTBOX_PURGE_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "refresh_reports",
+        report_service.refresh_reports,
+        settings.REPORT_REFRESH_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "purge_expired_idempotency_keys",
+        idempotency.purge_expired_keys,
+        settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "purge_expired_refresh_tokens",
+        token_service.purge_expired_refresh_tokens,
+        settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "refresh_token_revocations",
+        revocation.refresh_revocations,
+        settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+        leader_only=False,
+    )
+    scheduler.add_job(
+        "purge_expired_revocations",
+        revocation.purge_expired_revocations,
+        settings.TOKEN_REVOCATION_PURGE_INTERVAL_SECONDS,
+    )
+    if settings.LOGIN_THROTTLE_BACKEND == "database":
+        scheduler.add_job(
+            "purge_login_attempts",
+            login_throttle.purge_login_attempts,
+            settings.LOGIN_ATTEMPT_PURGE_INTERVAL_SECONDS,
+        )
+    if replica_set.replicas:
+        # Every process routes reads, so every process checks replica health
+        scheduler.add_job(
+            "check_replicas",
+            lambda db: replica_set.check(),
+            settings.DB_REPLICA_CHECK_INTERVAL_SECONDS,
+            leader_only=False,
+        )
+    app.state.scheduler = scheduler
+    started = time.perf_counter()
+    await scheduler.start()
+    timings["scheduler"] = time.perf_counter() - started
+
+    logger.info(
+        "Booted in %.0f ms (%s); schema: %s, %d pool connections warmed",
+        sum(timings.values()) * 1000,
+        ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in timings.items()),
+        schema_state,
+        warmed,
+    )
+    
+    # Startup: Receive class events published by other processes
+    events.broker.start()
+
     yield
-    # Shutdown: Clean up resources if needed
+    
+    # Shutdown: Stop background jobs and end event streams
+    await scheduler.stop()
+    await asyncio.to_thread(events.broker.stop)
 
 
 # Create FastAPI application
@@ -35,8 +173,13 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="A Learning Management System API for managing students, classes, and subscriptions",
     lifespan=lifespan,
+    dependencies=[Depends(metrics.track_in_flight)] if settings.METRICS_ENABLED else [],
 )
 
+# Shed load beyond the per-route-class concurrency limits (inside CORS, so 503s carry CORS headers)
+if settings.CONCURRENCY_LIMITS_ENABLED:
+    app.add_middleware(concurrency.ConcurrencyLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -46,12 +189,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tell clients that wrote to keep reading from the primary, whichever worker serves them
+if replica_set.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Expose the current request to engine hooks (slow-query log, replica routing)
+app.add_middleware(RequestContextMiddleware)
+
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    for slow_query_engine in [engine, *replica_set.engines()]:
+        slow_query.install(slow_query_engine)
+
+# Profile requests sent by staff with X-Profile: 1
+if settings.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# Record request metrics (outermost, so latency covers all other middleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(parents.router)
 app.include_router(students.router)
 app.include_router(classes.router)
 app.include_router(subscriptions.router)
+app.include_router(reports.router)
+app.include_router(admin.router)
+app.include_router(events_router.router)
+app.include_router(calendar.router)
 
 
 # Root endpoint
@@ -80,6 +246,21 @@ async def health_check():
     return {"status": "healthy"}
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        """
+        Prometheus metrics endpoint.
+        
+        Exposes request, database pool, threadpool, password hashing
+        and cache metrics in the Prometheus text format.
+        """
+        return PlainTextResponse(
+            metrics.REGISTRY.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
 # TODO: Include routers
 # from app.routers import auth, parents, students, classes, registrations, subscriptions
 # app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
@@ -0,0 +1,24 @@
+"""
+One-shot database migration command.
+
+Applies schema changes once per deployment, before (not while) API
+workers start:
+
+    python -m app.migrate
+"""
+
+import time
+
+from app.core.database import engine
+from app.core.schema import migrate, verify_schema
+
+
+def main() -> None:
+    started = time.perf_counter()
+    print("📦 Migrating database schema...")
+    result = migrate(engine)
+    print(f"✓ {result}; verified {verify_schema(engine)} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
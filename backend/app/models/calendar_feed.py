@@ -0,0 +1,56 @@
+"""
+CalendarFeed model for subscribable iCalendar schedule feeds.
+
+Calendar apps cannot send an Authorization header, so a feed URL carries
+its own unguessable token. Tokens are opaque random strings; only their
+SHA-256 digest is stored. Each student and each parent has at most one
+feed; creating a new one replaces the old URL.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import override
+
+from sqlalchemy import String, ForeignKey, DateTime, CheckConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CalendarFeed(Base):
+    """
+    CalendarFeed model for one student's or one family's feed token.
+
+    Exactly one of student_id (the student's classes) and parent_id (the
+    classes of all the parent's children) is set.
+    """
+    __tablename__ = "calendar_feeds"
+    __table_args__ = (
+        CheckConstraint(
+            "(student_id IS NULL) <> (parent_id IS NULL)",
+            name="ck_calendar_feeds_one_owner"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    student_id: Mapped[int | None] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=True
+    )
+    parent_id: Mapped[int | None] = mapped_column(
+        ForeignKey("parents.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    @override
+    def __repr__(self) -> str:
+        return f"<CalendarFeed(id={self.id}, student_id={self.student_id}, parent_id={self.parent_id})>"
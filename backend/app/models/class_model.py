@@ -37,7 +37,8 @@ class ClassModel(Base):
     # Relationships
     class_registrations: Mapped[list["ClassRegistration"]] = relationship(
         back_populates="class_model",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True  # Rows are removed by the ON DELETE CASCADE foreign key
     )
 
     @override
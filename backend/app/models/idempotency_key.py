@@ -0,0 +1,38 @@
+"""
+IdempotencyKey model storing responses of requests sent with an Idempotency-Key.
+
+A row is reserved before the request runs and completed with its
+response, so retries of the same request are answered from here.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import override
+
+from sqlalchemy import String, Integer, LargeBinary, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    IdempotencyKey model for replaying responses to retried requests.
+
+    Keys are scoped to the authenticated user. A row without a status
+    code belongs to a request that is still being processed.
+    """
+    __tablename__ = "idempotency_keys"
+
+    owner: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    content_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey(owner={self.owner}, key={self.key}, status_code={self.status_code})>"
@@ -0,0 +1,37 @@
+"""
+LoginAttempt model for the shared login throttle.
+
+Each failed login is recorded once per throttle key (email and client
+IP), so all workers and instances see the same sliding windows.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import override
+
+from sqlalchemy import String, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class LoginAttempt(Base):
+    """
+    LoginAttempt model recording a failed login for one throttle key.
+
+    Rows older than the longest throttle window are purged periodically.
+    """
+    __tablename__ = "login_attempts"
+    __table_args__ = (
+        # Serves "attempts for a key within the window" lookups
+        Index("ix_login_attempts_key_attempted_at", "key", "attempted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    key: Mapped[str] = mapped_column(String(320), nullable=False)
+    attempted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<LoginAttempt(key={self.key}, attempted_at={self.attempted_at})>"
@@ -0,0 +1,80 @@
+"""
+OutboxMessage model for the transactional notification outbox.
+
+Messages are inserted in the same transaction as the change they report
+(e.g. a session use), so they are recorded if and only if the change is
+committed. A background dispatcher delivers them afterwards and retries
+failures with backoff (see app.services.notification_service).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, override
+
+from sqlalchemy import String, ForeignKey, Integer, DateTime, JSON, Text, Index, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# Message statuses
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"  # Gave up after OUTBOX_MAX_ATTEMPTS
+OUTBOX_DISCARDED = "discarded"  # Nobody to notify (e.g. student without a parent)
+
+# Message kinds
+NOTIFICATION_LOW_BALANCE = "low_balance"
+NOTIFICATION_ENDING_SOON = "ending_soon"
+
+
+class OutboxMessage(Base):
+    """
+    OutboxMessage model for one notification waiting to be delivered.
+
+    The recipient is resolved at delivery time from the student, so
+    messages for the same parent can be coalesced into one notification.
+    """
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # Serves the dispatcher's "due pending messages" scan only
+        Index(
+            "ix_outbox_messages_pending_available_at",
+            "available_at",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    # Kept (unlinked) when the subscription is archived, so pending notices are still delivered
+    subscription_id: Mapped[int | None] = mapped_column(
+        ForeignKey("subscriptions.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default=OUTBOX_PENDING, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<OutboxMessage(id={self.id}, kind={self.kind}, status={self.status})>"
@@ -39,9 +39,10 @@ class Parent(Base):
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="parent")
+    # Children outlive their parent: the ON DELETE SET NULL foreign key unlinks them
     students: Mapped[list["Student"]] = relationship(
-        back_populates="parent", 
-        cascade="all, delete-orphan"
+        back_populates="parent",
+        passive_deletes=True
     )
 
     @override
@@ -0,0 +1,51 @@
+"""
+RefreshToken model for renewing access tokens without a password login.
+
+Tokens are opaque random strings; only their SHA-256 digest is stored.
+Every refresh rotates the token: the presented one is revoked and a new
+one in the same family is issued, so presenting a revoked token means it
+was stolen or replayed and the whole family is revoked. The exception is
+a token rotated within REFRESH_TOKEN_REUSE_GRACE_SECONDS, which browser
+tabs sharing one stored token present together when their access token
+expires.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import override
+
+from sqlalchemy import String, ForeignKey, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class RefreshToken(Base):
+    """
+    RefreshToken model for one link of a rotating refresh token chain.
+
+    A family groups all tokens descending from one login. A token is
+    usable while it is neither revoked nor expired.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id={self.family_id})>"
@@ -0,0 +1,34 @@
+"""
+ReportSnapshot model holding precomputed staff analytics.
+
+Each row is a summary table entry for one report, rebuilt by a background
+job so report endpoints never aggregate over the live tables.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, override
+
+from sqlalchemy import String, DateTime, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ReportSnapshot(Base):
+    """
+    ReportSnapshot model for cached report results.
+    
+    Stores the rows of a report as JSON together with the time they
+    were computed, which is reported to clients as data freshness.
+    """
+    __tablename__ = "report_snapshots"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    payload: Mapped[list[dict[str, Any]]] = mapped_column(JSON, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<ReportSnapshot(name={self.name}, refreshed_at={self.refreshed_at})>"
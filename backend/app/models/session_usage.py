@@ -0,0 +1,63 @@
+"""
+SessionUsage model for the append-only session consumption ledger.
+
+Every change to a subscription's used session count is recorded here,
+so Subscription.used_sessions is a materialized aggregate of this table.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import override
+
+from sqlalchemy import String, ForeignKey, Integer, DateTime, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# Ledger entry reasons
+USAGE_REASON_USE = "use"
+USAGE_REASON_ADJUSTMENT = "adjustment"
+
+
+class SessionUsage(Base):
+    """
+    SessionUsage model recording consumed (or corrected) sessions.
+
+    Rows are only ever inserted. Staff corrections to used_sessions are
+    stored as adjustment entries carrying the signed difference.
+    """
+    __tablename__ = "session_usage"
+    __table_args__ = (
+        # Serves "usage of a subscription in a date range" lookups
+        Index("ix_session_usage_subscription_used_at", "subscription_id", "used_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    subscription_id: Mapped[int] = mapped_column(
+        ForeignKey("subscriptions.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    class_id: Mapped[int | None] = mapped_column(
+        ForeignKey("classes.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    actor_user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    sessions: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    reason: Mapped[str] = mapped_column(String(20), default=USAGE_REASON_USE, nullable=False)
+    used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True
+    )
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"<SessionUsage(id={self.id}, subscription_id={self.subscription_id}, "
+            f"sessions={self.sessions}, reason={self.reason})>"
+        )
@@ -0,0 +1,48 @@
+"""
+ArchivedSessionUsage model for the ledger of archived subscriptions.
+
+Ledger entries move to this table together with their subscription, so
+the usage history of an archived package is kept.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import override
+
+from sqlalchemy import String, ForeignKey, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ArchivedSessionUsage(Base):
+    """
+    ArchivedSessionUsage model, a copy of a SessionUsage row of an archived subscription.
+    """
+    __tablename__ = "session_usage_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    subscription_id: Mapped[int] = mapped_column(
+        ForeignKey("subscriptions_archive.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    class_id: Mapped[int | None] = mapped_column(
+        ForeignKey("classes.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    actor_user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    sessions: Mapped[int] = mapped_column(Integer, nullable=False)
+    reason: Mapped[str] = mapped_column(String(20), nullable=False)
+    used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"<ArchivedSessionUsage(id={self.id}, subscription_id={self.subscription_id}, "
+            f"sessions={self.sessions}, reason={self.reason})>"
+        )
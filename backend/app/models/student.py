@@ -53,11 +53,13 @@ class Student(Base):
     parent: Mapped["Parent | None"] = relationship(back_populates="students")
     subscriptions: Mapped[list["Subscription"]] = relationship(
         back_populates="student",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True  # Rows are removed by the ON DELETE CASCADE foreign key
     )
     class_registrations: Mapped[list["ClassRegistration"]] = relationship(
         back_populates="student",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True  # Rows are removed by the ON DELETE CASCADE foreign key
     )
 
     @override
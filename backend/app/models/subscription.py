@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, override
 
-from sqlalchemy import String, ForeignKey, Integer, Date
+from sqlalchemy import String, ForeignKey, Integer, Date, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -28,6 +28,22 @@ class Subscription(Base):
     - Sessions already used
     """
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        # Partial indexes over active rows only: expired/exhausted packages
+        # are excluded so eligibility checks and the sweeper stay cheap.
+        Index(
+            "ix_subscriptions_active_student_id",
+            "student_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+        Index(
+            "ix_subscriptions_active_end_date",
+            "end_date",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     student_id: Mapped[int] = mapped_column(
@@ -0,0 +1,60 @@
+"""
+ArchivedSubscription model for subscriptions moved out of the hot table.
+
+Subscriptions that ended long ago are moved here in batches by the
+archival job (see app.services.archive_service), keeping their IDs, so
+per-student listings and eligibility checks on `subscriptions` only scan
+current packages.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, override
+
+from sqlalchemy import String, ForeignKey, Integer, Date, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+if TYPE_CHECKING:
+    from app.models.student import Student
+
+
+class ArchivedSubscription(Base):
+    """
+    ArchivedSubscription model, a read-only copy of an ended subscription.
+
+    Has the columns of Subscription plus the time it was archived.
+    """
+    __tablename__ = "subscriptions_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    package_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    start_date: Mapped[str | None] = mapped_column(Date, nullable=True)
+    end_date: Mapped[str | None] = mapped_column(Date, nullable=True, index=True)
+    total_sessions: Mapped[int] = mapped_column(Integer, nullable=False)
+    used_sessions: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    # Relationships
+    student: Mapped["Student"] = relationship(viewonly=True)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<ArchivedSubscription(id={self.id}, student_id={self.student_id}, package={self.package_name})>"
+
+    @property
+    def remaining_sessions(self) -> int:
+        """Calculate remaining sessions."""
+        return self.total_sessions - self.used_sessions
@@ -0,0 +1,39 @@
+"""
+TokenRevocation model listing access tokens that must no longer be accepted.
+
+Rows are append-only with increasing ids, so every process can keep an
+in-memory copy up to date by reading only the rows added since its last
+refresh.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import override
+
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class TokenRevocation(Base):
+    """
+    TokenRevocation model for one revoked access token or user.
+
+    A row revokes either a single token (by jti) or every token of a
+    user issued up to revoked_at. It is only needed until expires_at,
+    when all tokens it covers have expired anyway. user_id has no foreign
+    key because revoked users are often deleted ones.
+    """
+    __tablename__ = "token_revocations"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    jti: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<TokenRevocation(id={self.id}, jti={self.jti}, user_id={self.user_id})>"
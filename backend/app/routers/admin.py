@@ -0,0 +1,84 @@
+"""
+Operational admin API endpoints.
+
+Exposes request profiles captured with the X-Profile header and the
+slow-query log.
+"""
+
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core import profiling, slow_query
+from app.core.dependencies import StaffUser
+from app.schemas.profile import ProfileSummary, ProfileResponse, SlowQueryResponse
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def _get_profile_or_404(profile_id: str) -> profiling.RequestProfile:
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return profile
+
+
+@router.get("/profiles", response_model=list[ProfileSummary])
+def list_profiles(staff_user: StaffUser):
+    """
+    List recently captured request profiles, newest first.
+    
+    Send `X-Profile: 1` with a staff token on any request to profile it;
+    the profile id is returned in the `X-Profile-Id` response header.
+    
+    Requires: Staff role
+    """
+    return profiling.list_profiles()
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileResponse)
+def get_profile(profile_id: str, staff_user: StaffUser):
+    """
+    Get a request profile with SQL timings and sampled stacks.
+    
+    Requires: Staff role
+    """
+    profile = _get_profile_or_404(profile_id)
+    return {
+        **profile.summary(),
+        "sample_interval_ms": profile.sample_interval * 1000,
+        "sql": profile.sql,
+        "stacks": dict(profile.samples.most_common()),
+    }
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def get_profile_collapsed(profile_id: str, staff_user: StaffUser):
+    """
+    Get a request profile as collapsed stacks.
+    
+    The output can be loaded into speedscope or rendered with flamegraph.pl.
+    
+    Requires: Staff role
+    """
+    return _get_profile_or_404(profile_id).collapsed()
+
+
+@router.get("/slow-queries", response_model=list[SlowQueryResponse])
+def list_slow_queries(
+    staff_user: StaffUser,
+    limit: Annotated[int | None, Query(ge=1, description="Maximum number of entries to return")] = None
+):
+    """
+    List statements slower than the configured threshold, newest first.
+    
+    On PostgreSQL, SELECT statements carry an `EXPLAIN (ANALYZE, BUFFERS)`
+    plan once it has been captured in the background.
+    
+    Requires: Staff role
+    """
+    return slow_query.get_slow_queries(limit)
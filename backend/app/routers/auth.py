@@ -4,57 +4,81 @@ Authentication router for user login and token management.
 Handles user authentication, JWT token generation, and login operations.
 """
 
+import math
+from datetime import datetime, timezone
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.dependencies import CurrentUser
+from app.core.login_throttle import login_throttle, throttle_keys
+from app.core.revocation import revoke_token, revoke_user
+from app.core.security import DUMMY_PASSWORD_HASH, decode_access_token, verify_password, create_access_token
 from app.models.user import User
-from app.schemas.user import LoginRequest, LoginResponse, UserResponse
+from app.schemas.user import LoginRequest, LoginResponse, RefreshRequest, TokenResponse, UserResponse
+from app.services import token_service
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(
+def login(
     login_data: LoginRequest,
-    db: Annotated[Session, Depends(get_db)]
+    request: Request,
+    db: Annotated[Session, Depends(get_db, scope="function")]
 ):
     """
     Authenticate user and return access token.
+
+    Failed attempts are throttled per email and per client IP; over the
+    limit, requests are rejected before any password hashing.
     
     Args:
         login_data: Login credentials (email and password)
+        request: Incoming request (for the client address)
         db: Database session
         
     Returns:
-        LoginResponse containing access token and user information
+        LoginResponse containing access and refresh tokens and user information
         
     Raises:
-        HTTPException: If credentials are invalid
+        HTTPException: If credentials are invalid or too many attempts failed
     """
-    # Find user by email
-    user = db.query(User).filter(User.email == login_data.email).first()
-    
-    if not user:
+    keys = throttle_keys(login_data.email, request.client.host if request.client else None)
+    retry_after = login_throttle.retry_after(keys)
+    if retry_after is not None:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
         )
+
+    # Find user by email
+    user = db.query(User).filter(User.email == login_data.email).first()
     
-    # Verify password
-    if not verify_password(login_data.password, user.password_hash):
+    # Verify password (against a dummy hash for unknown emails, so both cases cost the same)
+    password_ok = verify_password(
+        login_data.password,
+        user.password_hash if user else DUMMY_PASSWORD_HASH
+    )
+    if not user or not password_ok:
+        login_throttle.record_failure(keys)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+
+    login_throttle.reset(keys["email"])
     
     # Create access token
     access_token = create_access_token(
         data={"sub": str(user.id), "role": user.role.value}
     )
+    refresh_token = token_service.issue_refresh_token(db, user.id)
+    db.commit()
     
     # Prepare user response
     user_response = UserResponse(
@@ -66,6 +90,74 @@ async def login(
     
     return LoginResponse(
         access_token=access_token,
+        refresh_token=refresh_token,
         token_type="bearer",
         user=user_response
     )
+
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(
+    refresh_data: RefreshRequest,
+    db: Annotated[Session, Depends(get_db, scope="function")]
+):
+    """
+    Exchange a refresh token for a new access token.
+
+    The refresh token is rotated: the response carries a new one and the
+    presented token stops working. Reusing a rotated token revokes every
+    token issued from the same login.
+
+    Args:
+        refresh_data: Refresh token from login or a previous refresh
+        db: Database session
+
+    Returns:
+        TokenResponse with the new access and refresh tokens
+
+    Raises:
+        HTTPException: If the refresh token is invalid, expired or revoked
+    """
+    access_token, refresh_token = token_service.rotate_refresh_token(db, refresh_data.refresh_token)
+    return TokenResponse(access_token=access_token, refresh_token=refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    refresh_data: RefreshRequest,
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(HTTPBearer(auto_error=False))],
+    db: Annotated[Session, Depends(get_db, scope="function")]
+):
+    """
+    Revoke the refresh tokens of this login, and the access token if sent.
+
+    Args:
+        refresh_data: Refresh token of the session to end
+        credentials: Optional bearer access token of the session
+        db: Database session
+    """
+    if credentials is not None:
+        try:
+            payload = decode_access_token(credentials.credentials)
+        except HTTPException:
+            payload = {}  # Invalid or expired already
+        if "jti" in payload:
+            revoke_token(db, payload["jti"], datetime.fromtimestamp(payload["exp"], timezone.utc))
+    token_service.revoke_token_family(db, refresh_data.refresh_token)
+    db.commit()
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    current_user: CurrentUser,
+    db: Annotated[Session, Depends(get_db, scope="function")]
+):
+    """
+    Revoke the current user's access and refresh tokens on every device.
+
+    Args:
+        current_user: Authenticated user
+        db: Database session
+    """
+    revoke_user(db, current_user["user_id"])
+    token_service.revoke_user_tokens(db, current_user["user_id"])
@@ -0,0 +1,97 @@
+"""
+Calendar feed API endpoints.
+
+Feeds are iCalendar (.ics) documents for calendar apps to subscribe to.
+Apps cannot log in, so feed URLs carry their own token instead; clients
+revalidate with If-None-Match and get 304 while the schedule is unchanged.
+"""
+
+from fastapi import APIRouter, Request, Response, status
+
+from app.core.dependencies import DatabaseSession, ReadableParentId, ReadableStudentId
+from app.schemas.calendar import CalendarFeedResponse
+from app.services import calendar_service
+from app.services.calendar_service import PARENT_FEED, STUDENT_FEED, RenderedFeed
+
+router = APIRouter(prefix="/api/calendar", tags=["calendar"])
+
+
+def _feed_response(request: Request, feed: RenderedFeed) -> Response:
+    """
+    Answer a feed request, with 304 Not Modified if the client's copy is current.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        feed: Feed from calendar_service.get_feed
+
+    Returns:
+        The feed, or an empty 304 response
+    """
+    headers = {"ETag": feed.etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if feed.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=feed.body, media_type="text/calendar; charset=utf-8", headers=headers)
+
+
+@router.post("/students/{student_id}/feed", response_model=CalendarFeedResponse, status_code=status.HTTP_201_CREATED)
+def create_student_feed(
+    request: Request,
+    student_id: ReadableStudentId,
+    db: DatabaseSession
+):
+    """
+    Create the calendar feed URL of a student's classes.
+
+    Requires: Staff role, or the student themselves, or their parent
+    Replaces the student's previous feed URL, if any.
+    """
+    token = calendar_service.create_feed(db, STUDENT_FEED, student_id)
+    return {"url": str(request.url_for("get_student_feed", token=token))}
+
+
+@router.post("/parents/{parent_id}/feed", response_model=CalendarFeedResponse, status_code=status.HTTP_201_CREATED)
+def create_parent_feed(
+    request: Request,
+    parent_id: ReadableParentId,
+    db: DatabaseSession
+):
+    """
+    Create the calendar feed URL of the classes of all of a parent's children.
+
+    Requires: Staff role, or the parent themselves
+    Replaces the parent's previous feed URL, if any.
+    """
+    token = calendar_service.create_feed(db, PARENT_FEED, parent_id)
+    return {"url": str(request.url_for("get_parent_feed", token=token))}
+
+
+@router.get("/students/{token}.ics", response_class=Response)
+def get_student_feed(
+    token: str,
+    request: Request,
+    db: DatabaseSession
+):
+    """
+    Get a student's classes as an iCalendar feed.
+
+    Authenticated by the token in the URL.
+    Each class is a weekly event between the student's first subscription
+    start date and last subscription end date.
+    """
+    return _feed_response(request, calendar_service.get_feed(db, STUDENT_FEED, token))
+
+
+@router.get("/parents/{token}.ics", response_class=Response)
+def get_parent_feed(
+    token: str,
+    request: Request,
+    db: DatabaseSession
+):
+    """
+    Get the classes of all of a parent's children as an iCalendar feed.
+
+    Authenticated by the token in the URL.
+    Events are titled with the child's name.
+    """
+    return _feed_response(request, calendar_service.get_feed(db, PARENT_FEED, token))
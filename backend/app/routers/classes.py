@@ -6,11 +6,13 @@ from typing import Annotated
 from fastapi import APIRouter, Query, status
 
 from app.core.dependencies import DatabaseSession, StaffUser, CurrentUser
+from app.core.idempotency import IdempotentRoute
+from app.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse
 from app.schemas.class_schema import ClassCreate, ClassResponse, ClassUpdate
 from app.schemas.registration import RegistrationCreate, RegistrationResponse
 from app.services import class_service
 
-router = APIRouter(prefix="/api/classes", tags=["classes"])
+router = APIRouter(prefix="/api/classes", tags=["classes"], route_class=IdempotentRoute)
 
 
 @router.post("", response_model=ClassResponse, status_code=status.HTTP_201_CREATED)
@@ -46,6 +48,23 @@ def get_classes(
     return classes
 
 
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+def bulk_delete_classes(
+    delete_data: BulkDeleteRequest,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Delete several classes at once.
+    
+    Requires: Staff role
+    Deletes the classes and all their registrations; recorded session usage is kept.
+    Unknown IDs are skipped; returns how many classes were deleted.
+    """
+    deleted = class_service.delete_classes(db, delete_data.ids)
+    return BulkDeleteResponse(deleted=deleted)
+
+
 @router.get("/{class_id}/registrations", response_model=list[RegistrationResponse])
 def get_class_registrations(
     class_id: int,
@@ -120,3 +139,19 @@ def unregister_student(
     """
     class_service.unregister_student_from_class(db, class_id, student_id)
     return None
+
+
+@router.delete("/{class_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_class(
+    class_id: int,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Delete a class.
+    
+    Requires: Staff role
+    Also removes all registrations for the class; recorded session usage is kept.
+    """
+    class_service.delete_class(db, class_id)
+    return None
@@ -0,0 +1,62 @@
+"""
+Live event stream API endpoints.
+
+Streams are Server-Sent Events (text/event-stream). They hold no
+database session, so an open dashboard costs no pool connection.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core import events
+from app.core.config import settings
+from app.core.dependencies import StaffUser
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+async def _stream(subscriber: events.Subscriber) -> AsyncIterator[str]:
+    try:
+        # Reconnect quickly after the stream ends (e.g. on deploys)
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                item = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except TimeoutError:
+                yield events.heartbeat()
+                continue
+            if item is None:
+                break
+            yield events.format_event(item)
+    finally:
+        events.broker.unsubscribe(subscriber)
+
+
+@router.get("/classes", response_class=StreamingResponse)
+async def stream_class_events(staff_user: StaffUser):
+    """
+    Stream roster and seat-availability changes of all classes.
+
+    Requires: Staff role
+    Sends a "class" event for each committed change, with data like
+    {"class_id": 3, "change": "registration_added", "registered": 12,
+    "max_students": 20, "student_id": 7}. Changes are registration_added,
+    registration_removed, class_updated and class_deleted. A "resync"
+    event means changes were missed (slow consumer or reconnect) and the
+    classes should be fetched again.
+    """
+    subscriber = events.broker.subscribe()
+    if subscriber is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open event streams",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        _stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,15 +3,17 @@ Parent management API endpoints.
 """
 
 from typing import Annotated
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import DatabaseSession, StaffUser, ParentUser, CurrentUser
+from app.core.dependencies import DatabaseSession, StaffUser, ParentUser, ReadableParentId
+from app.core.idempotency import IdempotentRoute
+from app.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse
 from app.schemas.parent import ParentCreate, ParentResponse, ParentWithChildren, ParentUpdate
 from app.schemas.student import StudentResponse
 from app.services import parent_service
 
-router = APIRouter(prefix="/api/parents", tags=["parents"])
+router = APIRouter(prefix="/api/parents", tags=["parents"], route_class=IdempotentRoute)
 
 
 # Parent dashboard endpoints (parent can access their own data)
@@ -62,10 +64,26 @@ def get_all_parents(
     return parents
 
 
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+def bulk_delete_parents(
+    delete_data: BulkDeleteRequest,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Delete several parents at once.
+    
+    Requires: Staff role
+    Deletes the parents with their user accounts; their children are kept, without a parent.
+    Unknown IDs are skipped; returns how many parents were deleted.
+    """
+    deleted = parent_service.delete_parents(db, delete_data.ids)
+    return BulkDeleteResponse(deleted=deleted)
+
+
 @router.get("/{parent_id}", response_model=ParentWithChildren)
 def get_parent(
-    parent_id: int,
-    current_user: CurrentUser,
+    parent_id: ReadableParentId,
     db: DatabaseSession
 ):
     """
@@ -75,17 +93,7 @@ def get_parent(
     Returns parent information including user details and children.
     """
     parent = parent_service.get_parent_by_id(db, parent_id)
-    
-    # Check authorization: staff or the parent themselves
-    if current_user["role"] == "staff":
-        return parent
-    elif current_user["role"] == "parent":
-        current_parent = parent_service.get_parent_by_user_id(db, current_user["user_id"])
-        if current_parent.id != parent_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-        return parent
-    else:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    return parent
 
 
 @router.delete("/{parent_id}", status_code=status.HTTP_204_NO_CONTENT)
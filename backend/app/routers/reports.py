@@ -0,0 +1,150 @@
+"""
+Staff analytics report API endpoints.
+
+Reports are served from precomputed snapshots; responses state when the
+data was computed and may be cached by clients until the next refresh.
+"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Query, Request, Response, status
+
+from app.core.config import settings
+
+from app.core.dependencies import DatabaseSession, StaffUser
+from app.schemas.report import (
+    ClassUtilizationReport,
+    SessionBurnReport,
+    PackageActivityReport,
+    TeacherLoadReport,
+    SubscriptionForecastReport,
+)
+from app.services import forecast_service, report_service
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+
+def _set_freshness_headers(response: Response, report: dict[str, Any]) -> None:
+    """Expose report freshness through HTTP caching headers."""
+    max_age = int((report["next_refresh_at"] - datetime.now(timezone.utc)).total_seconds())
+    response.headers["Cache-Control"] = f"private, max-age={max(max_age, 0)}"
+    response.headers["Last-Modified"] = report["refreshed_at"].strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+
+def _report_response(request: Request, response: Response, report: dict[str, Any]) -> dict[str, Any] | Response:
+    """
+    Answer a report request, with 304 Not Modified if the client's copy is current.
+
+    Args:
+        request: Incoming request (for If-Modified-Since)
+        response: Response whose headers are set
+        report: Report from report_service.get_report
+
+    Returns:
+        The report, or an empty 304 response
+    """
+    _set_freshness_headers(response, report)
+    since = request.headers.get("if-modified-since")
+    if since:
+        try:
+            client_copy = parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            client_copy = None
+        # Last-Modified has one-second resolution
+        if client_copy is not None and client_copy.tzinfo is not None \
+                and report["refreshed_at"].replace(microsecond=0) <= client_copy:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
+    return report
+
+
+@router.get("/class-utilization", response_model=ClassUtilizationReport)
+def get_class_utilization(
+    request: Request,
+    response: Response,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Get registrations compared to capacity for every class.
+    
+    Requires: Staff role
+    """
+    report = report_service.get_report(db, report_service.CLASS_UTILIZATION)
+    return _report_response(request, response, report)
+
+
+@router.get("/session-burn", response_model=SessionBurnReport)
+def get_session_burn(
+    request: Request,
+    response: Response,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Get the number of sessions used per week.
+    
+    Requires: Staff role
+    """
+    report = report_service.get_report(db, report_service.SESSION_BURN)
+    return _report_response(request, response, report)
+
+
+@router.get("/package-activity", response_model=PackageActivityReport)
+def get_package_activity(
+    request: Request,
+    response: Response,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Get active subscriptions and remaining sessions per package.
+    
+    Requires: Staff role
+    """
+    report = report_service.get_report(db, report_service.PACKAGE_ACTIVITY)
+    return _report_response(request, response, report)
+
+
+@router.get("/teacher-load", response_model=TeacherLoadReport)
+def get_teacher_load(
+    request: Request,
+    response: Response,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Get the number of classes and enrolled students per teacher.
+    
+    Requires: Staff role
+    """
+    report = report_service.get_report(db, report_service.TEACHER_LOAD)
+    return _report_response(request, response, report)
+
+
+@router.get("/subscription-forecast", response_model=SubscriptionForecastReport)
+def get_subscription_forecast(
+    staff_user: StaffUser,
+    db: DatabaseSession,
+    horizon_days: Annotated[int | None, Query(ge=1, le=365, description="Warn about packages running out within this many days")] = None,
+    at_risk_only: Annotated[bool, Query(description="Only return subscriptions at risk of running out")] = True,
+    limit: Annotated[int, Query(ge=1, le=1000, description="Maximum number of rows to return")] = 100,
+    offset: Annotated[int, Query(ge=0, description="Number of rows to skip")] = 0
+):
+    """
+    Forecast when active subscriptions will run out of sessions.
+    
+    Requires: Staff role
+    Projects each package's exhaustion date from its observed usage and the
+    student's weekly class schedule, flagging those running out soon.
+    Rows are paged with limit and offset; matching_rows gives the total.
+    """
+    forecast = forecast_service.get_subscription_forecast(
+        db,
+        horizon_days or settings.FORECAST_HORIZON_DAYS,
+        at_risk_only,
+        limit,
+        offset
+    )
+    return forecast
@@ -3,16 +3,18 @@ Student management API endpoints.
 """
 
 from typing import Annotated
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import DatabaseSession, StaffUser, StudentUser, CurrentUser
+from app.core.dependencies import DatabaseSession, StaffUser, StudentUser, CurrentUser, ReadableStudentId
+from app.core.idempotency import IdempotentRoute
+from app.schemas.bulk import BulkDeleteRequest, BulkDeleteResponse
 from app.schemas.student import StudentCreate, StudentResponse, StudentUpdate
 from app.schemas.class_schema import ClassResponse
 from app.schemas.subscription import SubscriptionResponse
 from app.services import student_service, subscription_service
 
-router = APIRouter(prefix="/api/students", tags=["students"])
+router = APIRouter(prefix="/api/students", tags=["students"], route_class=IdempotentRoute)
 
 
 # Student dashboard endpoints (student can access their own data)
@@ -50,7 +52,8 @@ def get_current_student_classes(
 @router.get("/me/subscriptions", response_model=list[SubscriptionResponse])
 def get_current_student_subscriptions(
     current_user: StudentUser,
-    db: DatabaseSession
+    db: DatabaseSession,
+    include_archived: Annotated[bool, Query(description="Also return subscriptions that ended long ago and were archived")] = False
 ):
     """
     Get current authenticated student's subscriptions.
@@ -59,7 +62,7 @@ def get_current_student_subscriptions(
     Returns list of all subscriptions for the student.
     """
     student = student_service.get_student_by_user_id(db, current_user["user_id"])
-    subscriptions = subscription_service.get_subscriptions_by_student_id(db, student.id)
+    subscriptions = subscription_service.get_subscriptions_by_student_id(db, student.id, include_archived)
     return subscriptions
 
 
@@ -96,10 +99,26 @@ def create_student(
     return student
 
 
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+def bulk_delete_students(
+    delete_data: BulkDeleteRequest,
+    staff_user: StaffUser,
+    db: DatabaseSession
+):
+    """
+    Delete several students at once.
+    
+    Requires: Staff role
+    Deletes the students with their user accounts, class registrations and subscriptions.
+    Unknown IDs are skipped; returns how many students were deleted.
+    """
+    deleted = student_service.delete_students(db, delete_data.ids)
+    return BulkDeleteResponse(deleted=deleted)
+
+
 @router.get("/{student_id}", response_model=StudentResponse)
 def get_student(
-    student_id: int,
-    current_user: CurrentUser,
+    student_id: ReadableStudentId,
     db: DatabaseSession
 ):
     """
@@ -109,32 +128,12 @@ def get_student(
     Returns student information including user details and parent information.
     """
     student = student_service.get_student_by_id(db, student_id)
-    
-    # Check authorization: staff, or student themselves, or their parent
-    if current_user["role"] == "staff":
-        return student
-    elif current_user["role"] == "student":
-        current_student = student_service.get_student_by_user_id(db, current_user["user_id"])
-        if current_student.id != student_id:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-        return student
-    elif current_user["role"] == "parent":
-        from app.services import parent_service
-        parent = parent_service.get_parent_by_user_id(db, current_user["user_id"])
-        if student.parent_id != parent.id:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-        return student
-    else:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    return student
 
 
 @router.get("/{student_id}/classes", response_model=list[ClassResponse])
 def get_student_classes(
-    student_id: int,
-    current_user: CurrentUser,
+    student_id: ReadableStudentId,
     db: DatabaseSession
 ):
     """
@@ -143,35 +142,15 @@ def get_student_classes(
     Requires: Staff role OR the student themselves OR parent of the student
     Returns a list of classes the student is enrolled in.
     """
-    student = student_service.get_student_by_id(db, student_id)
-    
-    # Check authorization
-    if current_user["role"] == "staff":
-        pass
-    elif current_user["role"] == "student":
-        current_student = student_service.get_student_by_user_id(db, current_user["user_id"])
-        if current_student.id != student_id:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    elif current_user["role"] == "parent":
-        from app.services import parent_service
-        parent = parent_service.get_parent_by_user_id(db, current_user["user_id"])
-        if student.parent_id != parent.id:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    else:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    
     classes = student_service.get_student_classes(db, student_id)
     return classes
 
 
 @router.get("/{student_id}/subscriptions", response_model=list[SubscriptionResponse])
 def get_student_subscriptions(
-    student_id: int,
-    current_user: CurrentUser,
-    db: DatabaseSession
+    student_id: ReadableStudentId,
+    db: DatabaseSession,
+    include_archived: Annotated[bool, Query(description="Also return subscriptions that ended long ago and were archived")] = False
 ):
     """
     Get all subscriptions for a student.
@@ -179,27 +158,7 @@ def get_student_subscriptions(
     Requires: Staff role OR the student themselves OR parent of the student
     Returns list of subscriptions for the student.
     """
-    student = student_service.get_student_by_id(db, student_id)
-    
-    # Check authorization
-    if current_user["role"] == "staff":
-        pass
-    elif current_user["role"] == "student":
-        current_student = student_service.get_student_by_user_id(db, current_user["user_id"])
-        if current_student.id != student_id:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    elif current_user["role"] == "parent":
-        from app.services import parent_service
-        parent = parent_service.get_parent_by_user_id(db, current_user["user_id"])
-        if student.parent_id != parent.id:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    else:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-    
-    subscriptions = subscription_service.get_subscriptions_by_student_id(db, student_id)
+    subscriptions = subscription_service.get_subscriptions_by_student_id(db, student_id, include_archived)
     return subscriptions
 
 
@@ -2,13 +2,17 @@
 Subscription management API endpoints.
 """
 
-from fastapi import APIRouter, status
+from datetime import date
+from typing import Annotated
+from fastapi import APIRouter, Query, status
 
 from app.core.dependencies import DatabaseSession, StaffUser
+from app.core.idempotency import IdempotentRoute
+from app.schemas.session_usage import SessionUsageResponse
 from app.schemas.subscription import SubscriptionCreate, SubscriptionResponse, SubscriptionUpdate
 from app.services import subscription_service
 
-router = APIRouter(prefix="/api/subscriptions", tags=["subscriptions"])
+router = APIRouter(prefix="/api/subscriptions", tags=["subscriptions"], route_class=IdempotentRoute)
 
 
 @router.get("", response_model=list[SubscriptionResponse])
@@ -49,23 +53,49 @@ def create_subscription(
 def use_session(
     subscription_id: int,
     staff_user: StaffUser,
-    db: DatabaseSession
+    db: DatabaseSession,
+    class_id: Annotated[int | None, Query(description="Class the session was attended in")] = None
 ):
     """
     Mark one session as used.
     
     Requires: Staff role
-    Increments used_sessions and deactivates subscription if all sessions are used.
+    Records the usage in the session ledger, increments used_sessions
+    and deactivates subscription if all sessions are used.
     
     Validates:
     - Subscription exists and is active
     - Subscription has remaining sessions
     - Subscription has not expired
     """
-    subscription = subscription_service.use_subscription_session(db, subscription_id)
+    subscription = subscription_service.use_subscription_session(
+        db,
+        subscription_id,
+        actor_user_id=staff_user["user_id"],
+        class_id=class_id
+    )
     return subscription
 
 
+@router.get("/{subscription_id}/usage", response_model=list[SessionUsageResponse])
+def get_subscription_usage(
+    subscription_id: int,
+    staff_user: StaffUser,
+    db: DatabaseSession,
+    start: Annotated[date | None, Query(description="First day to include (YYYY-MM-DD)")] = None,
+    end: Annotated[date | None, Query(description="Last day to include (YYYY-MM-DD)")] = None
+):
+    """
+    Get the session usage history of a subscription.
+    
+    Requires: Staff role
+    Returns ledger entries (uses and staff adjustments), optionally limited
+    to a date range.
+    """
+    usage = subscription_service.get_session_usage(db, subscription_id, start, end)
+    return usage
+
+
 @router.get("/{subscription_id}", response_model=SubscriptionResponse)
 def get_subscription(
     subscription_id: int,
@@ -111,6 +141,12 @@ def update_subscription(
     
     Requires: Staff role
     Updates subscription package name, dates, total sessions, and/or used sessions.
+    Changes to used sessions are recorded as ledger adjustments.
     """
-    subscription = subscription_service.update_subscription(db, subscription_id, subscription_data)
+    subscription = subscription_service.update_subscription(
+        db,
+        subscription_id,
+        subscription_data,
+        actor_user_id=staff_user["user_id"]
+    )
     return subscription
@@ -0,0 +1,21 @@
+"""
+Pydantic schemas for bulk operations.
+
+Defines request/response structures shared by the bulk delete endpoints.
+"""
+
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+
+# Schema for bulk delete requests
+class BulkDeleteRequest(BaseModel):
+    """Schema for deleting several records by ID in one request."""
+    ids: list[Annotated[int, Field(gt=0)]] = Field(..., min_length=1, max_length=1000)
+
+
+# Schema for bulk delete responses
+class BulkDeleteResponse(BaseModel):
+    """Schema for the outcome of a bulk delete (unknown IDs are skipped)."""
+    deleted: int
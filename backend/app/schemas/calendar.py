@@ -0,0 +1,13 @@
+"""
+Pydantic schemas for calendar feeds.
+
+Defines response structures for subscribable iCalendar feeds.
+"""
+
+from pydantic import BaseModel
+
+
+# Schema for a newly created feed
+class CalendarFeedResponse(BaseModel):
+    """Schema for a feed URL to add to a calendar app (shown once; creating a new feed revokes it)."""
+    url: str
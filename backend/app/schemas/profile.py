@@ -0,0 +1,55 @@
+"""
+Pydantic schemas for request profiles.
+
+Defines response structures for profiles taken with the X-Profile header
+and for the slow-query log.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+# Schema for profile summary
+class ProfileSummary(BaseModel):
+    """Schema for a stored request profile in list responses."""
+    id: str
+    method: str
+    path: str
+    user_id: int
+    started_at: datetime
+    duration_ms: float | None = None
+    status_code: int | None = None
+    sample_count: int
+    sql_count: int
+    sql_ms: float
+
+
+# Schema for a timed SQL statement
+class ProfileSqlStatement(BaseModel):
+    """Schema for a SQL statement executed during a profiled request."""
+    offset_ms: float
+    duration_ms: float
+    statement: str
+
+
+# Schema for full profile
+class ProfileResponse(ProfileSummary):
+    """Schema for a request profile with SQL timings and sampled stacks."""
+    sample_interval_ms: float
+    sql: list[ProfileSqlStatement]
+    stacks: dict[str, int]
+
+
+# Schema for slow query log entry
+class SlowQueryResponse(BaseModel):
+    """Schema for a statement recorded in the slow-query log."""
+    id: int
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: str
+    method: str | None = None
+    route: str | None = None
+    plan: str | None = None
+    plan_status: str
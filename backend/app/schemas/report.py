@@ -0,0 +1,95 @@
+"""
+Pydantic schemas for staff analytics reports.
+
+Every report response carries its rows plus freshness information.
+"""
+
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+
+# Base schema with freshness fields
+class ReportBase(BaseModel):
+    """Base report schema with data freshness information."""
+    report: str
+    refreshed_at: datetime
+    next_refresh_at: datetime
+
+
+# Class utilization
+class ClassUtilizationRow(BaseModel):
+    """Registrations compared to capacity for one class."""
+    class_id: int
+    name: str
+    teacher_name: str | None = None
+    day_of_week: str | None = None
+    time_slot: str | None = None
+    max_students: int | None = None
+    registrations: int
+    utilization: float | None = None
+
+
+class ClassUtilizationReport(ReportBase):
+    """Schema for the class utilization report."""
+    rows: list[ClassUtilizationRow]
+
+
+# Session burn
+class SessionBurnRow(BaseModel):
+    """Sessions consumed during one ISO week."""
+    week_start: date
+    sessions: int
+
+
+class SessionBurnReport(ReportBase):
+    """Schema for the weekly session burn report."""
+    rows: list[SessionBurnRow]
+
+
+# Package activity
+class PackageActivityRow(BaseModel):
+    """Active subscriptions and remaining sessions for one package."""
+    package_name: str
+    active_subscriptions: int
+    remaining_sessions: int
+
+
+class PackageActivityReport(ReportBase):
+    """Schema for the active subscriptions per package report."""
+    rows: list[PackageActivityRow]
+
+
+# Teacher load
+class TeacherLoadRow(BaseModel):
+    """Classes and enrolled students for one teacher."""
+    teacher_name: str | None = None
+    classes: int
+    registrations: int
+
+
+class TeacherLoadReport(ReportBase):
+    """Schema for the per-teacher load report."""
+    rows: list[TeacherLoadRow]
+
+
+# Subscription exhaustion forecast
+class SubscriptionForecastRow(BaseModel):
+    """Projected exhaustion of one active subscription."""
+    subscription_id: int
+    student_id: int
+    remaining_sessions: int
+    weekly_rate: float
+    projected_exhaustion_date: date | None = None
+    at_risk: bool
+
+
+class SubscriptionForecastReport(BaseModel):
+    """Schema for the subscription exhaustion forecast."""
+    generated_at: datetime
+    horizon_days: int
+    active_subscriptions: int
+    at_risk_subscriptions: int
+    matching_rows: int  # Rows available across all pages
+    offset: int
+    rows: list[SubscriptionForecastRow]
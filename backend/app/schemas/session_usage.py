@@ -0,0 +1,23 @@
+"""
+Pydantic schemas for SessionUsage model.
+
+Defines response structures for the session usage ledger.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+# Schema for session usage response
+class SessionUsageResponse(BaseModel):
+    """Schema for a session usage ledger entry in API responses."""
+    id: int
+    subscription_id: int
+    class_id: int | None = None
+    actor_user_id: int | None = None
+    sessions: int
+    reason: str
+    used_at: datetime
+
+    model_config = {"from_attributes": True}
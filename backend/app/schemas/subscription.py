@@ -4,7 +4,7 @@ Pydantic schemas for Subscription model.
 Defines request/response structures for subscription management operations.
 """
 
-from datetime import date
+from datetime import date, datetime
 from pydantic import BaseModel, Field, field_validator, ValidationInfo
 
 from app.schemas.student import StudentResponse
@@ -57,6 +57,7 @@ class SubscriptionResponse(SubscriptionBase):
     used_sessions: int
     remaining_sessions: int
     is_active: bool
+    archived_at: datetime | None = None  # Set for subscriptions served from the archive
     student: StudentResponse  # Include full student information
 
     model_config = {"from_attributes": True}
@@ -42,7 +42,22 @@ class LoginRequest(BaseModel):
 
 # Schema for login response
 class LoginResponse(BaseModel):
-    """Schema for login response with access token."""
+    """Schema for login response with access and refresh tokens."""
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
     user: UserResponse
+
+
+# Schema for refresh and logout requests
+class RefreshRequest(BaseModel):
+    """Schema carrying a refresh token."""
+    refresh_token: str = Field(..., min_length=1, max_length=100)
+
+
+# Schema for refresh response
+class TokenResponse(BaseModel):
+    """Schema for renewed tokens."""
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
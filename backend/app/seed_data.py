@@ -8,35 +8,52 @@ Seeds the database with realistic test data:
 - Random class registrations respecting constraints
 
 This file contains manual entries for each record to ensure data quality.
+
+For performance work, a synthetic dataset of any size can be generated
+instead (see generate_synthetic_data):
+
+    python -m app.seed_data --parents 100000 --classes 5000 --seed 42
 """
 
-from datetime import date, timedelta
-import os
+import argparse
+import csv
+import io
+import random
+import time as timer
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import Table, func, insert, select, text
 from sqlalchemy.orm import Session # pyright: ignore[reportUnusedImport]
 
-from app.core.database import SessionLocal, engine, Base
-from app.core.security import get_password_hash
+from app.core.database import SessionLocal, engine
+from app.core.schema import reset_schema
 from app.models.user import User, UserRole
 from app.models.parent import Parent
 from app.models.student import Student
 from app.models.class_model import ClassModel
 from app.models.class_registration import ClassRegistration
 from app.models.subscription import Subscription
+from app.models.session_usage import SessionUsage, USAGE_REASON_USE
 
+# Password of every seeded account, hashed once ahead of time so seeding
+# does not spend ~0.25s in bcrypt on every run
+DEFAULT_PASSWORD = "password123"
+DEFAULT_PASSWORD_HASH = "$2b$12$7Ka.85pvnMgia6u4D84nDuim8wQF/bm2bRgW3na7PSufYSjLW2xk6"
 
-def seed_database():
-    """Seed the database with test data."""
-    
-    # Get environment from environment variable
-    environment = os.getenv('ENVIRONMENT', 'development').lower()
+
+def seed_database(reset: bool = False):
+    """
+    Seed the database with test data.
     
-    # In development mode, drop all tables and recreate from scratch
-    if environment == 'development':
-        print("🔄 Development mode - resetting database...")
-        Base.metadata.drop_all(bind=engine)
-        print("✓ All tables dropped")
-        Base.metadata.create_all(bind=engine)
-        print("✓ Tables recreated")
+    Args:
+        reset: Drop and recreate all tables first (destroys existing data)
+    """
+    if reset:
+        print("🔄 Resetting database...")
+        reset_schema(engine)
+        print("✓ All tables dropped and recreated")
     
     db = SessionLocal()
     
@@ -51,7 +68,7 @@ def seed_database():
         print("🌱 Seeding database with test data...")
         
         # Default password for all test accounts
-        default_password = get_password_hash("password123")
+        default_password = DEFAULT_PASSWORD_HASH
         
         # ===== STAFF USER =====
         print("  → Creating staff user...")
@@ -258,6 +275,7 @@ def seed_database():
             {"student_idx": 9, "package": "Robotics Course", "start": today, "end": today + timedelta(days=90), "total": 24, "used": 0},
         ]
         
+        subscriptions = []
         for sub_data in subscriptions_data:
             subscription = Subscription(
                 student_id=students[sub_data["student_idx"]].id, # pyright: ignore[reportCallIssue, reportArgumentType]
@@ -268,9 +286,22 @@ def seed_database():
                 used_sessions=sub_data["used"]
             )
             db.add(subscription)
+            subscriptions.append(subscription)
         
         db.flush()
         
+        # Record used sessions in the usage ledger, spread over each package's active period
+        for subscription, sub_data in zip(subscriptions, subscriptions_data):
+            span_days = max((min(sub_data["end"], today) - sub_data["start"]).days, 1)
+            for i in range(sub_data["used"]):
+                used_day = sub_data["start"] + timedelta(days=span_days * i // sub_data["used"])
+                db.add(SessionUsage(
+                    subscription_id=subscription.id,
+                    sessions=1,
+                    reason=USAGE_REASON_USE,
+                    used_at=datetime.combine(used_day, time(hour=10))
+                ))
+        
         # ===== CLASS REGISTRATIONS (Random but respecting constraints) =====
         print("  → Creating class registrations...")
         
@@ -432,5 +463,325 @@ def seed_database():
         db.close()
 
 
+# ===== SYNTHETIC DATA GENERATOR =====
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+# Non-overlapping slots, so classes in different slots never conflict
+TIME_SLOTS = ["08:00-09:30", "09:45-11:15", "11:30-13:00", "14:00-15:30", "15:45-17:15", "17:30-19:00"]
+SUBJECTS = [
+    "Mathematics", "English", "Science", "Art", "History", "Computer Science", "Music",
+    "Physics", "Geography", "PE", "Chemistry", "Spanish", "Drama", "Biology", "Economics", "French",
+]
+LEVELS = ["Fundamentals", "Intermediate", "Advanced", "Workshop", "Club", "Lab"]
+FIRST_NAMES = [
+    "Emma", "Oliver", "Sophia", "Liam", "Ava", "Noah", "Isabella", "Ethan", "Mia", "Lucas",
+    "Amelia", "Mason", "Harper", "Logan", "Evelyn", "James", "Abigail", "Elijah", "Emily", "Aiden",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Davis", "Wilson", "Martinez", "Anderson", "Taylor", "Thomas",
+    "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Clark", "Lewis",
+]
+PACKAGES = [
+    ("Monthly Basic", 12, 30), ("Monthly Premium", 20, 30), ("Quarterly Plan", 30, 90),
+    ("Semester Plan", 45, 180), ("Annual Plan", 60, 365), ("Weekend Workshop", 10, 60),
+]
+
+
+class _IdSequence:
+    """Hands out primary keys after the current maximum of a table."""
+
+    def __init__(self, db: Session, table: Table):
+        self.next_id = (db.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def take(self) -> int:
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+
+def _chunks(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    chunk: list[dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy_value(value: Any) -> Any:
+    """Render a value as COPY csv input (enums are stored by name)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, UserRole):
+        return value.name
+    return value
+
+
+def _copy_chunk(db: Session, table: Table, chunk: list[dict[str, Any]]) -> None:
+    """Load a chunk with PostgreSQL COPY through the session's connection."""
+    columns = list(chunk[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chunk:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(
+        f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer
+    )
+
+
+def _bulk_insert(db: Session, table: Table, rows: Iterable[dict[str, Any]], chunk_size: int) -> int:
+    """Insert rows in chunks: COPY on PostgreSQL, multi-row INSERT elsewhere."""
+    use_copy = db.get_bind().dialect.name == "postgresql"
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        if use_copy:
+            _copy_chunk(db, table, chunk)
+        else:
+            db.execute(insert(table), chunk)
+        count += len(chunk)
+    return count
+
+
+def _reset_sequences(db: Session, tables: Iterable[Table]) -> None:
+    """Move PostgreSQL id sequences past the explicitly inserted ids."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+        ))
+
+
+def generate_synthetic_data(
+    db: Session,
+    parents: int,
+    classes: int,
+    max_children: int = 3,
+    max_subscriptions: int = 3,
+    max_registrations: int = 6,
+    seed: int = 42,
+    chunk_size: int = 5000
+) -> dict[str, int]:
+    """
+    Generate a deterministic synthetic dataset of the requested size.
+
+    Rows get explicit ids and are written in chunks with bulk INSERT (COPY
+    on PostgreSQL); every account shares DEFAULT_PASSWORD. Registrations
+    never exceed class capacity and a student only takes one class per
+    weekday and time slot, so the data passes the same rules as the API.
+    Used sessions are backed by usage ledger entries.
+
+    Args:
+        db: Database session
+        parents: Number of parent accounts
+        classes: Number of classes
+        max_children: Maximum students per parent (at least one each)
+        max_subscriptions: Maximum subscriptions per student (at least one each)
+        max_registrations: Maximum class registrations per student
+        seed: Random seed; the same seed always produces the same data
+        chunk_size: Rows per INSERT/COPY batch
+
+    Returns:
+        Number of rows created per table
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    users_table, parents_table, students_table = User.__table__, Parent.__table__, Student.__table__
+    classes_table, subscriptions_table = ClassModel.__table__, Subscription.__table__
+    registrations_table, usage_table = ClassRegistration.__table__, SessionUsage.__table__
+
+    user_ids = _IdSequence(db, users_table)
+    parent_ids = _IdSequence(db, parents_table)
+    student_ids = _IdSequence(db, students_table)
+    class_ids = _IdSequence(db, classes_table)
+    subscription_ids = _IdSequence(db, subscriptions_table)
+    counts: dict[str, int] = {}
+
+    # Staff account, unless the demo data already created it
+    staff_exists = db.execute(select(User.id).where(User.email == "staff@minilms.com")).first()
+    if not staff_exists:
+        counts["staff"] = _bulk_insert(db, users_table, [{
+            "id": user_ids.take(), "name": "Admin Staff", "email": "staff@minilms.com",
+            "password_hash": DEFAULT_PASSWORD_HASH, "role": UserRole.STAFF,
+        }], chunk_size)
+
+    # Classes spread over weekdays and slots; open seats tracked per slot
+    class_rows = []
+    open_seats: dict[tuple[int, int], list[list[int]]] = {}
+    for i in range(classes):
+        class_id = class_ids.take()
+        day, slot = rng.randrange(len(WEEKDAYS)), rng.randrange(len(TIME_SLOTS))
+        capacity = rng.randint(10, 30)
+        subject = rng.choice(SUBJECTS)
+        class_rows.append({
+            "id": class_id,
+            "name": f"{subject} {rng.choice(LEVELS)} {i + 1}",
+            "subject": subject,
+            "day_of_week": WEEKDAYS[day],
+            "time_slot": TIME_SLOTS[slot],
+            "teacher_name": f"{rng.choice(['Dr.', 'Mr.', 'Ms.', 'Prof.'])} {rng.choice(LAST_NAMES)}",
+            "max_students": capacity,
+        })
+        open_seats.setdefault((day, slot), []).append([class_id, capacity])
+    counts["classes"] = _bulk_insert(db, classes_table, class_rows, chunk_size)
+    slots = sorted(open_seats)
+
+    def take_seat(slot: tuple[int, int]) -> int | None:
+        """Pick a random class with a free seat in a slot."""
+        candidates = open_seats[slot]
+        if not candidates:
+            return None
+        index = rng.randrange(len(candidates))
+        seat = candidates[index]
+        seat[1] -= 1
+        if seat[1] == 0:
+            candidates[index] = candidates[-1]
+            candidates.pop()
+        return seat[0]
+
+    # Families: parent and student users, profiles, subscriptions, usage, registrations
+    families: list[list[int]] = []
+    user_rows: list[dict[str, Any]] = []
+    parent_rows: list[dict[str, Any]] = []
+    student_rows: list[dict[str, Any]] = []
+    for i in range(parents):
+        last_name = rng.choice(LAST_NAMES)
+        parent_user_id, parent_id = user_ids.take(), parent_ids.take()
+        user_rows.append({
+            "id": parent_user_id, "name": f"{rng.choice(FIRST_NAMES)} {last_name}",
+            "email": f"parent{i + 1}@seed.minilms.com", "password_hash": DEFAULT_PASSWORD_HASH,
+            "role": UserRole.PARENT,
+        })
+        parent_rows.append({"id": parent_id, "user_id": parent_user_id, "phone": f"555-{i % 10000:04d}"})
+
+        children = []
+        for _ in range(rng.randint(1, max_children)):
+            student_user_id, student_id = user_ids.take(), student_ids.take()
+            grade = rng.randint(1, 12)
+            user_rows.append({
+                "id": student_user_id, "name": f"{rng.choice(FIRST_NAMES)} {last_name}",
+                "email": f"student{student_id}@seed.minilms.com", "password_hash": DEFAULT_PASSWORD_HASH,
+                "role": UserRole.STUDENT,
+            })
+            student_rows.append({
+                "id": student_id, "user_id": student_user_id, "parent_id": parent_id,
+                "dob": today - timedelta(days=365 * (grade + 5) + rng.randrange(365)),
+                "gender": rng.choice(["Female", "Male"]), "current_grade": f"Grade {grade}",
+            })
+            children.append(student_id)
+        families.append(children)
+
+    counts["users"] = _bulk_insert(db, users_table, user_rows, chunk_size)
+    counts["parents"] = _bulk_insert(db, parents_table, parent_rows, chunk_size)
+    counts["students"] = _bulk_insert(db, students_table, student_rows, chunk_size)
+    del user_rows, parent_rows, student_rows
+
+    subscription_rows: list[dict[str, Any]] = []
+    usage_rows: list[dict[str, Any]] = []
+    registration_rows: list[dict[str, Any]] = []
+    for children in families:
+        for student_id in children:
+            for _ in range(rng.randint(1, max_subscriptions)):
+                package, total, days = rng.choice(PACKAGES)
+                start = today - timedelta(days=rng.randint(0, days + 60))
+                end = start + timedelta(days=days)
+                elapsed = min((today - start).days, days)
+                used = min(total, round(total * elapsed / days * rng.uniform(0.5, 1.1)))
+                subscription_id = subscription_ids.take()
+                subscription_rows.append({
+                    "id": subscription_id, "student_id": student_id, "package_name": package,
+                    "start_date": start, "end_date": end, "total_sessions": total,
+                    "used_sessions": used, "is_active": end >= today,
+                })
+                span = max(elapsed, 1)
+                for n in range(used):
+                    usage_rows.append({
+                        "subscription_id": subscription_id, "sessions": 1, "reason": USAGE_REASON_USE,
+                        "used_at": datetime.combine(start + timedelta(days=span * n // used), time(hour=10)),
+                    })
+
+            for slot in rng.sample(slots, min(rng.randint(0, max_registrations), len(slots))):
+                class_id = take_seat(slot)
+                if class_id is not None:
+                    registration_rows.append({"student_id": student_id, "class_id": class_id})
+
+        # Flush periodically to bound memory; subscriptions go first for the ledger FK
+        if len(usage_rows) >= chunk_size * 10:
+            counts["subscriptions"] = counts.get("subscriptions", 0) + _bulk_insert(
+                db, subscriptions_table, subscription_rows, chunk_size
+            )
+            counts["session_usage"] = counts.get("session_usage", 0) + _bulk_insert(
+                db, usage_table, usage_rows, chunk_size
+            )
+            subscription_rows, usage_rows = [], []
+
+    counts["subscriptions"] = counts.get("subscriptions", 0) + _bulk_insert(
+        db, subscriptions_table, subscription_rows, chunk_size
+    )
+    counts["session_usage"] = counts.get("session_usage", 0) + _bulk_insert(
+        db, usage_table, usage_rows, chunk_size
+    )
+    counts["class_registrations"] = _bulk_insert(db, registrations_table, registration_rows, chunk_size)
+
+    _reset_sequences(db, [users_table, parents_table, students_table, classes_table, subscriptions_table])
+    db.commit()
+
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Seed the database with the demo dataset, or a synthetic one when sizes are given."
+    )
+    parser.add_argument("--parents", type=int, help="Synthetic parent accounts to generate")
+    parser.add_argument("--classes", type=int, help="Synthetic classes to generate")
+    parser.add_argument("--max-children", type=int, default=3)
+    parser.add_argument("--max-subscriptions", type=int, default=3)
+    parser.add_argument("--max-registrations", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args()
+
+    if args.parents is None and args.classes is None:
+        seed_database(reset=args.reset)
+        return
+
+    if args.reset:
+        reset_schema(engine)
+
+    with SessionLocal() as db:
+        user_count = db.query(User).count()
+        if user_count > 0 and not args.reset:
+            print(f"✓ Database already contains {user_count} users. Use --reset to regenerate.")
+            return
+
+        print(f"🌱 Generating synthetic data (seed {args.seed})...")
+        started = timer.perf_counter()
+        counts = generate_synthetic_data(
+            db,
+            parents=args.parents or 0,
+            classes=args.classes or 0,
+            max_children=args.max_children,
+            max_subscriptions=args.max_subscriptions,
+            max_registrations=args.max_registrations,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+        )
+
+    print(f"✅ Generated in {timer.perf_counter() - started:.1f}s:")
+    for table, count in counts.items():
+        print(f"  • {count:,} {table}")
+    print(f"\n🔑 All accounts use the password {DEFAULT_PASSWORD!r}")
+    print("  Staff: staff@minilms.com, parents: parent<N>@seed.minilms.com, students: student<N>@seed.minilms.com")
+
+
 if __name__ == "__main__":
-    seed_database()
+    main()
@@ -0,0 +1,360 @@
+"""
+Production server entry point.
+
+Runs the API in several uvicorn worker processes sharing one listening
+socket, supervised by this process:
+
+    python -m app.server --host 0.0.0.0 --port 8000 [--workers N] [--no-preload]
+
+- Workers default to one per available CPU (respecting CPU affinity and
+  cgroup quotas); WEB_CONCURRENCY or --workers override it.
+- DB_CONNECTION_BUDGET, when set, is the total number of database
+  connections for the whole instance and is divided across the workers'
+  SQLAlchemy pools, after setting aside the connections each worker
+  holds outside its pool, so scaling workers never exceeds the server's
+  limit.
+- With preload (the default) the application is imported once in the
+  supervisor and workers are forked from it, so they start quickly and
+  share memory pages. Without preload each worker imports the code
+  itself, which lets a rolling restart pick up new code.
+- SIGHUP performs a rolling restart: workers are replaced one at a time,
+  and the old worker is only stopped once its replacement is serving.
+- SIGTERM/SIGINT stop all workers gracefully. Crashed workers are
+  replaced automatically, with an exponential backoff between repeated
+  crashes. If workers keep dying before they signal ready, the
+  supervisor gives up and exits with a non-zero status.
+"""
+
+import argparse
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+
+import uvicorn
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.server")
+
+APP_PATH = "app.main:app"
+READY_TIMEOUT_SECONDS = 60
+RESPAWN_BACKOFF_SECONDS = 0.5
+RESPAWN_BACKOFF_MAX_SECONDS = 30.0
+STABLE_WORKER_SECONDS = 60.0  # A worker up this long resets the backoff
+MAX_BOOT_FAILURES = 5
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity masks and cgroup v2 quotas."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cpus
+
+
+def dedicated_connections() -> int:
+    """
+    Connections a worker holds besides its request pool.
+
+    On PostgreSQL these are the scheduler's leader lock (checked out of
+    the pool for as long as the worker leads), the class event LISTEN
+    connection and the slow-query EXPLAIN connection.
+    """
+    if make_url(settings.DATABASE_URL).get_backend_name() != "postgresql":
+        return 0
+    return 1 + int(settings.SCHEDULER_ENABLED) + int(settings.SLOW_QUERY_EXPLAIN)
+
+
+def apply_connection_budget(workers: int) -> None:
+    """
+    Size each worker's pool from the instance-wide connection budget.
+
+    The connections a worker holds outside its pool are set aside first.
+    Half of the rest is kept open in the pool and the remainder may be
+    opened as overflow under load. Must run before the database module
+    is imported.
+
+    Raises:
+        SystemExit: If the budget cannot give every worker a pooled connection
+    """
+    if settings.DB_CONNECTION_BUDGET <= 0:
+        return
+
+    dedicated = dedicated_connections()
+    pooled = settings.DB_CONNECTION_BUDGET // workers - dedicated
+    if pooled < 1:
+        raise SystemExit(
+            f"DB_CONNECTION_BUDGET={settings.DB_CONNECTION_BUDGET} is too small for {workers} workers, "
+            f"which need {dedicated + 1} connections each"
+        )
+    settings.DB_POOL_SIZE = max(pooled // 2, 1)
+    settings.DB_MAX_OVERFLOW = pooled - settings.DB_POOL_SIZE
+
+
+class _WorkerServer(uvicorn.Server):
+    """uvicorn server reporting to the supervisor once it accepts requests."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        await super().startup(sockets)
+        if self.started:
+            os.write(self.ready_fd, b"1")
+            os.close(self.ready_fd)
+
+    async def shutdown(self, sockets: list[socket.socket] | None = None) -> None:
+        # Event streams never finish on their own and would hold up the graceful shutdown
+        from app.core.events import broker
+        broker.close_streams()
+        await super().shutdown(sockets)
+
+
+@dataclass
+class Worker:
+    """A forked worker process."""
+    pid: int
+    ready_fd: int
+    started: float = field(default_factory=time.monotonic)
+
+
+class Supervisor:
+    """Pre-forking process manager for uvicorn workers."""
+
+    def __init__(self, config: uvicorn.Config, workers: int, preload: bool):
+        self.config = config
+        self.worker_count = workers
+        self.preload = preload
+        self.socket: socket.socket | None = None
+        self.workers: dict[int, Worker] = {}
+        self.should_exit = False
+        self.should_restart = False
+        self.crashes = 0
+        self.boot_failures = 0
+        self.pending_respawns = 0
+        self.respawn_at = 0.0
+
+    def spawn(self) -> Worker:
+        """Fork one worker serving on the shared socket."""
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self._run_worker(write_fd)
+            os._exit(0)
+
+        os.close(write_fd)
+        worker = Worker(pid=pid, ready_fd=read_fd)
+        self.workers[pid] = worker
+        return worker
+
+    def _run_worker(self, ready_fd: int) -> None:
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+
+        if self.preload:
+            # Connections must never be shared with the supervisor or siblings
+            from app.core.database import engine, replica_set
+            for inherited in [engine, *replica_set.engines()]:
+                inherited.dispose(close=False)
+
+        server = _WorkerServer(self.config, ready_fd)
+        server.run(sockets=[self.socket])
+
+    def wait_ready(self, worker: Worker) -> bool:
+        """Wait until a worker has finished startup."""
+        readable, _, _ = select.select([worker.ready_fd], [], [], READY_TIMEOUT_SECONDS)
+        ready = bool(readable) and os.read(worker.ready_fd, 1) == b"1"
+        os.close(worker.ready_fd)
+        return ready
+
+    def check_boot(self, worker: Worker) -> None:
+        """
+        Wait for a new worker, replacing it if it fails to start.
+
+        Once MAX_BOOT_FAILURES workers in a row have died (or hung) before
+        signalling ready, the supervisor stops instead of respawning them
+        forever.
+        """
+        if self.wait_ready(worker):
+            self.boot_failures = 0
+            return
+
+        self.boot_failures += 1
+        logger.error("Worker %s failed to start (%d in a row)", worker.pid, self.boot_failures)
+        self.stop(worker)
+        if self.boot_failures >= MAX_BOOT_FAILURES:
+            logger.critical("Workers keep failing to start; shutting down")
+            self.should_exit = True
+        else:
+            self.schedule_respawn(worker)
+
+    def schedule_respawn(self, worker: Worker) -> None:
+        """
+        Schedule a replacement for a worker that exited.
+
+        The delay doubles with every consecutive crash, up to
+        RESPAWN_BACKOFF_MAX_SECONDS, and starts over once a worker has
+        stayed up for STABLE_WORKER_SECONDS.
+        """
+        now = time.monotonic()
+        if now - worker.started >= STABLE_WORKER_SECONDS:
+            self.crashes = 0
+        delay = min(RESPAWN_BACKOFF_SECONDS * 2 ** self.crashes, RESPAWN_BACKOFF_MAX_SECONDS)
+        self.crashes += 1
+        self.pending_respawns += 1
+        self.respawn_at = max(self.respawn_at, now + delay)
+        logger.info("Starting a replacement for worker %s in %.1fs", worker.pid, delay)
+
+    def stop(self, worker: Worker) -> None:
+        """Stop a worker gracefully, killing it after the graceful timeout."""
+        try:
+            os.kill(worker.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(worker.pid, os.WNOHANG)
+            except ChildProcessError:
+                break  # Already reaped
+            if pid:
+                break
+            time.sleep(0.1)
+        else:
+            logger.warning("Worker %s did not stop in time; killing it", worker.pid)
+            os.kill(worker.pid, signal.SIGKILL)
+            os.waitpid(worker.pid, 0)
+        self.workers.pop(worker.pid, None)
+
+    def rolling_restart(self) -> None:
+        """Replace every worker, one at a time, without dropping capacity."""
+        logger.info("Rolling restart of %d workers", len(self.workers))
+        for old in list(self.workers.values()):
+            new = self.spawn()
+            if not self.wait_ready(new):
+                logger.error("Replacement worker %s failed to start; keeping %s", new.pid, old.pid)
+                self.stop(new)
+                return
+            self.stop(old)
+            logger.info("Replaced worker %s with %s", old.pid, new.pid)
+
+    def reap(self) -> None:
+        """Schedule replacements for workers that exited unexpectedly."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is not None and not self.should_exit:
+                logger.warning("Worker %s exited (status %s)", pid, status)
+                self.schedule_respawn(worker)
+
+    def respawn(self) -> None:
+        """Start the replacements scheduled by reap() once their backoff has passed."""
+        while self.pending_respawns and not self.should_exit and time.monotonic() >= self.respawn_at:
+            self.pending_respawns -= 1
+            self.check_boot(self.spawn())
+
+    def _handle_exit(self, sig: int, frame: object) -> None:
+        self.should_exit = True
+
+    def _handle_hup(self, sig: int, frame: object) -> None:
+        self.should_restart = True
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        if self.preload:
+            import app.main # pyright: ignore[reportUnusedImport] (inherited by forked workers)
+        self.socket = self.config.bind_socket()
+
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGHUP, self._handle_hup)
+
+        for _ in range(self.worker_count):
+            self.spawn()
+        for worker in list(self.workers.values()):
+            self.check_boot(worker)
+        logger.info(
+            "Serving with %d workers (pool %d + %d overflow each, preload %s) in %.2fs",
+            len(self.workers), settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW,
+            "on" if self.preload else "off", time.perf_counter() - started,
+        )
+
+        while not self.should_exit:
+            if self.should_restart:
+                self.should_restart = False
+                self.rolling_restart()
+            self.reap()
+            self.respawn()
+            time.sleep(0.5)
+
+        logger.info("Shutting down %d workers", len(self.workers))
+        for worker in list(self.workers.values()):
+            os.kill(worker.pid, signal.SIGTERM)
+        for worker in list(self.workers.values()):
+            self.stop(worker)
+        self.socket.close()
+
+        if self.boot_failures >= MAX_BOOT_FAILURES:
+            raise SystemExit(f"{self.boot_failures} workers in a row exited before they were ready")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=settings.WEB_CONCURRENCY or None,
+        help="Worker processes (default: WEB_CONCURRENCY, else one per CPU)"
+    )
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="Import the app in each worker instead of once before forking")
+    parser.add_argument("--log-level", default=settings.LOG_LEVEL.lower())
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(levelname)s:     %(name)s - %(message)s")
+    logging.getLogger("app").setLevel(args.log_level.upper())
+
+    if sys.platform == "win32":
+        raise SystemExit("app.server needs fork(); run uvicorn directly on Windows")
+
+    workers = args.workers or available_cpus()
+    apply_connection_budget(workers)
+
+    config = uvicorn.Config(
+        APP_PATH,
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+        access_log=args.access_log,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    )
+    Supervisor(config, workers, args.preload).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Service layer for subscription archival.
+
+Moves subscriptions that ended more than SUBSCRIPTION_ARCHIVE_AFTER_DAYS
+ago, with their session ledger, from the hot tables to
+subscriptions_archive and session_usage_archive. Work is done in small
+batches, each in its own short transaction, with a pause in between so
+the job never holds long locks or floods replication.
+"""
+
+import logging
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.session_usage import SessionUsage
+from app.models.session_usage_archive import ArchivedSessionUsage
+from app.models.subscription import Subscription
+from app.models.subscription_archive import ArchivedSubscription
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTIONS_ARCHIVED = metrics.Counter(
+    "subscriptions_archived_total",
+    "Subscriptions moved to the archive table",
+)
+
+_SUBSCRIPTION_COLUMNS = (
+    "id", "student_id", "package_name", "start_date", "end_date",
+    "total_sessions", "used_sessions", "is_active",
+)
+_USAGE_COLUMNS = ("id", "subscription_id", "class_id", "actor_user_id", "sessions", "reason", "used_at")
+
+
+def _archive_batch(db: Session, subscription_ids: list[int]) -> None:
+    """Copy subscriptions and their ledger to the archive and delete the originals, in one transaction."""
+    db.execute(
+        insert(ArchivedSubscription).from_select(
+            _SUBSCRIPTION_COLUMNS,
+            select(*(getattr(Subscription, column) for column in _SUBSCRIPTION_COLUMNS))
+            .where(Subscription.id.in_(subscription_ids)),
+        )
+    )
+    db.execute(
+        insert(ArchivedSessionUsage).from_select(
+            _USAGE_COLUMNS,
+            select(*(getattr(SessionUsage, column) for column in _USAGE_COLUMNS))
+            .where(SessionUsage.subscription_id.in_(subscription_ids)),
+        )
+    )
+    # The ledger rows go with their subscription (ON DELETE CASCADE)
+    db.execute(
+        delete(Subscription)
+        .where(Subscription.id.in_(subscription_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def archive_ended_subscriptions(db: Session, today: date | None = None) -> int:
+    """
+    Move inactive subscriptions that ended before the retention period to the archive.
+
+    Args:
+        db: Database session
+        today: Reference date (defaults to the current date)
+
+    Returns:
+        Number of subscriptions archived
+    """
+    if settings.SUBSCRIPTION_ARCHIVE_AFTER_DAYS <= 0:
+        return 0
+
+    cutoff = (today or date.today()) - timedelta(days=settings.SUBSCRIPTION_ARCHIVE_AFTER_DAYS)
+    archived = 0
+    while True:
+        subscription_ids = list(db.execute(
+            select(Subscription.id)
+            .where(Subscription.is_active == False, Subscription.end_date < cutoff)
+            .order_by(Subscription.id)
+            .limit(settings.SUBSCRIPTION_ARCHIVE_BATCH_SIZE)
+        ).scalars())
+        if not subscription_ids:
+            break
+
+        _archive_batch(db, subscription_ids)
+        archived += len(subscription_ids)
+        SUBSCRIPTIONS_ARCHIVED.inc(len(subscription_ids))
+
+        if len(subscription_ids) < settings.SUBSCRIPTION_ARCHIVE_BATCH_SIZE:
+            break
+        time.sleep(settings.SUBSCRIPTION_ARCHIVE_BATCH_PAUSE_SECONDS)
+
+    if archived:
+        logger.info("Archived %d subscriptions ended before %s", archived, cutoff)
+    return archived
+
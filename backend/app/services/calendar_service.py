@@ -0,0 +1,360 @@
+"""
+Service layer for iCalendar schedule feeds.
+
+Students and parents subscribe their calendar apps to a feed URL that
+carries an unguessable token. Every registered class becomes a weekly
+recurring event, from the first to the last date covered by the
+student's subscriptions.
+
+Calendar apps poll feeds often, so rendered feeds are cached per process
+together with a strong ETag (a digest of the bytes). A cached feed is
+dropped only when a class event (see app.core.events) touches one of its
+students or classes, which reaches every process; subscription and
+parent changes drop it in the local process, and CALENDAR_CACHE_TTL_SECONDS
+bounds how long other processes keep serving the old date range.
+"""
+
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Mapped, Session
+
+from app.core import events, metrics
+from app.core.config import settings
+from app.core.database import engine
+from app.models.calendar_feed import CalendarFeed
+from app.models.class_model import ClassModel
+from app.models.class_registration import ClassRegistration
+from app.models.parent import Parent
+from app.models.student import Student
+from app.models.subscription import Subscription
+from app.models.user import User
+
+# Feed kinds
+STUDENT_FEED = "student"
+PARENT_FEED = "parent"
+
+UID_DOMAIN = "minilms.local"
+
+_WEEKDAYS = {
+    "monday": (0, "MO"),
+    "tuesday": (1, "TU"),
+    "wednesday": (2, "WE"),
+    "thursday": (3, "TH"),
+    "friday": (4, "FR"),
+    "saturday": (5, "SA"),
+    "sunday": (6, "SU"),
+}
+
+
+@dataclass(frozen=True)
+class RenderedFeed:
+    """A rendered feed and what it depends on."""
+    body: bytes
+    etag: str
+    student_ids: frozenset[int]
+    class_ids: frozenset[int]
+    expires_at: float
+
+
+# Per-process cache: (feed kind, owner ID) -> rendered feed, least recently used first
+_cache: OrderedDict[tuple[str, int], RenderedFeed] = OrderedDict()
+_cache_lock = threading.Lock()
+# Bumped by every invalidation, so a render racing one is served but not cached
+_generation = 0
+
+
+def _hash_token(token: str) -> str:
+    """Digest stored instead of the token (tokens are random, so no salt or slow hash is needed)."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _owner_column(kind: str) -> Mapped[int | None]:
+    return CalendarFeed.student_id if kind == STUDENT_FEED else CalendarFeed.parent_id
+
+
+def create_feed(db: Session, kind: str, owner_id: int) -> str:
+    """
+    Create a feed token for a student or parent, replacing any previous one.
+
+    Args:
+        db: Database session
+        kind: STUDENT_FEED or PARENT_FEED
+        owner_id: Student or parent ID (access must be checked by the caller)
+
+    Returns:
+        The token to put in the feed URL
+    """
+    token = secrets.token_urlsafe(32)
+    db.execute(delete(CalendarFeed).where(_owner_column(kind) == owner_id))
+    db.add(CalendarFeed(
+        token_hash=_hash_token(token),
+        student_id=owner_id if kind == STUDENT_FEED else None,
+        parent_id=owner_id if kind == PARENT_FEED else None,
+    ))
+    db.commit()
+    return token
+
+
+def _resolve_feed(db: Session, kind: str, token: str) -> int:
+    """Owner of a feed token, raising 404 for unknown tokens and tokens of the other kind."""
+    owner_id = db.execute(
+        select(_owner_column(kind)).where(CalendarFeed.token_hash == _hash_token(token))
+    ).scalar_one_or_none()
+    if owner_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calendar feed not found"
+        )
+    return owner_id
+
+
+def _escape(value: str) -> str:
+    """Escape a TEXT value (RFC 5545 section 3.3.11)."""
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Fold a content line into chunks of at most 75 octets (RFC 5545 section 3.1)."""
+    if len(line.encode()) <= 75:
+        return line
+    chunks = []
+    chunk, size = "", 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            chunks.append(chunk)
+            chunk, size = " ", 1
+        chunk += char
+        size += width
+    chunks.append(chunk)
+    return "\r\n".join(chunks)
+
+
+def _weekly_slot(day_of_week: str | None, time_slot: str | None) -> tuple[int, str, str, str] | None:
+    """(weekday, BYDAY code, start HHMMSS, end HHMMSS) of a class, or None if it has no usable schedule."""
+    weekday = _WEEKDAYS.get((day_of_week or "").strip().lower())
+    if weekday is None or not time_slot or "-" not in time_slot:
+        return None
+    try:
+        start, end = (
+            "{:02d}{:02d}00".format(*map(int, part.strip().split(":")))
+            for part in time_slot.split("-")
+        )
+    except (TypeError, ValueError):
+        return None
+    return weekday[0], weekday[1], start, end
+
+
+def _event_lines(
+    student_id: int,
+    student_name: str | None,
+    row: Any,
+    window: tuple[date, date | None]
+) -> list[str]:
+    """VEVENT of one registration, or nothing if the class never meets within the window."""
+    slot = _weekly_slot(row.day_of_week, row.time_slot)
+    if slot is None:
+        return []
+    weekday, byday, start_time, end_time = slot
+    first_day, last_day = window
+
+    first = first_day + timedelta(days=(weekday - first_day.weekday()) % 7)
+    rrule = f"RRULE:FREQ=WEEKLY;BYDAY={byday}"
+    if last_day is not None:
+        last = last_day - timedelta(days=(last_day.weekday() - weekday) % 7)
+        if last < first:
+            return []
+        rrule += f";COUNT={(last - first).days // 7 + 1}"
+
+    # UTC times need no VTIMEZONE; other zones are given by IANA name, as calendar apps expect
+    if settings.CALENDAR_TIMEZONE == "UTC":
+        start, end = f":{first:%Y%m%d}T{start_time}Z", f":{first:%Y%m%d}T{end_time}Z"
+    else:
+        zone = f";TZID={settings.CALENDAR_TIMEZONE}"
+        start, end = f"{zone}:{first:%Y%m%d}T{start_time}", f"{zone}:{first:%Y%m%d}T{end_time}"
+
+    summary = row.name if student_name is None else f"{student_name}: {row.name}"
+    description = "\n".join(
+        f"{label}: {value}" for label, value in (("Subject", row.subject), ("Teacher", row.teacher_name)) if value
+    )
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:class-{row.id}-student-{student_id}@{UID_DOMAIN}",
+        # Derived from the data rather than the clock, so an unchanged schedule renders identical bytes
+        f"DTSTAMP:{first_day:%Y%m%d}T000000Z",
+        f"DTSTART{start}",
+        f"DTEND{end}",
+        rrule,
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def _render_feed(db: Session, kind: str, owner_id: int) -> tuple[bytes, frozenset[int], frozenset[int]]:
+    """
+    Render a feed in three or four queries.
+
+    Reads go to the primary: the result is cached until the next change,
+    so a lagging replica's copy must not be.
+
+    Returns:
+        Tuple of (iCalendar bytes, student IDs, class IDs)
+    """
+    primary = {"bind": engine}
+    owned = Student.id == owner_id if kind == STUDENT_FEED else Student.parent_id == owner_id
+
+    students = db.execute(
+        select(Student.id, User.name).join(User, User.id == Student.user_id).where(owned).order_by(Student.id),
+        bind_arguments=primary,
+    ).all()
+    if kind == STUDENT_FEED:
+        title = f"{students[0].name} classes" if students else "Classes"
+    else:
+        parent_name = db.execute(
+            select(User.name).join(Parent, Parent.user_id == User.id).where(Parent.id == owner_id),
+            bind_arguments=primary,
+        ).scalar_one_or_none()
+        title = f"{parent_name} family classes" if parent_name else "Family classes"
+
+    registrations = db.execute(
+        select(
+            ClassRegistration.student_id, ClassModel.id, ClassModel.name, ClassModel.subject,
+            ClassModel.teacher_name, ClassModel.day_of_week, ClassModel.time_slot,
+        )
+        .join(ClassModel, ClassModel.id == ClassRegistration.class_id)
+        .join(Student, Student.id == ClassRegistration.student_id)
+        .where(owned)
+        .order_by(ClassRegistration.student_id, ClassModel.id),
+        bind_arguments=primary,
+    ).all()
+
+    windows = {}
+    if registrations:
+        windows = {
+            row.student_id: (row.first_day, row.last_day) for row in db.execute(
+                select(
+                    Subscription.student_id,
+                    func.min(Subscription.start_date).label("first_day"),
+                    func.max(Subscription.end_date).label("last_day"),
+                )
+                .join(Student, Student.id == Subscription.student_id)
+                .where(owned)
+                .group_by(Subscription.student_id),
+                bind_arguments=primary,
+            )
+        }
+
+    names = {student.id: student.name for student in students}
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Mini LMS//Class schedule//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(title)}",
+        f"X-WR-TIMEZONE:{settings.CALENDAR_TIMEZONE}",
+    ]
+    for row in registrations:
+        window = windows.get(row.student_id)
+        if window is None or window[0] is None:
+            continue  # No subscription, so no scheduled sessions
+        # Family feeds say whose class each event is
+        student_name = names.get(row.student_id) if kind == PARENT_FEED else None
+        lines.extend(_event_lines(row.student_id, student_name, row, window))
+    lines.append("END:VCALENDAR")
+
+    body = "".join(_fold(line) + "\r\n" for line in lines).encode()
+    return body, frozenset(names), frozenset(row.id for row in registrations)
+
+
+def get_feed(db: Session, kind: str, token: str) -> RenderedFeed:
+    """
+    Get a feed by token, served from the process cache until its schedule changes.
+
+    Args:
+        db: Database session
+        kind: STUDENT_FEED or PARENT_FEED
+        token: Token from the feed URL
+
+    Returns:
+        The rendered feed with its ETag
+
+    Raises:
+        HTTPException: If the token does not belong to a feed of this kind
+    """
+    owner_id = _resolve_feed(db, kind, token)
+    key = (kind, owner_id)
+
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached.expires_at > now:
+            _cache.move_to_end(key)
+            metrics.CACHE_REQUESTS.labels("calendar", "hit").inc()
+            return cached
+        generation = _generation
+    metrics.CACHE_REQUESTS.labels("calendar", "miss").inc()
+
+    body, student_ids, class_ids = _render_feed(db, kind, owner_id)
+    feed = RenderedFeed(
+        body=body,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        student_ids=student_ids,
+        class_ids=class_ids,
+        expires_at=now + settings.CALENDAR_CACHE_TTL_SECONDS,
+    )
+    with _cache_lock:
+        if generation == _generation:
+            _cache[key] = feed
+            _cache.move_to_end(key)
+            while len(_cache) > settings.CALENDAR_CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return feed
+
+
+def _invalidate(stale: Callable[[tuple[str, int], RenderedFeed], bool]) -> None:
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        for key in [key for key, feed in _cache.items() if stale(key, feed)]:
+            del _cache[key]
+
+
+def invalidate_feeds(student_ids: Iterable[int] = (), parent_ids: Iterable[int] = ()) -> None:
+    """
+    Drop this process's cached feeds showing any of the students, or belonging to any of the parents.
+
+    For changes that are not class events, such as subscription dates
+    and parent links; call after committing.
+
+    Args:
+        student_ids: Students whose schedule changed
+        parent_ids: Parents whose set of children changed
+    """
+    students, parents = set(student_ids), set(parent_ids)
+    _invalidate(lambda key, feed: not students.isdisjoint(feed.student_ids)
+                or (key[0] == PARENT_FEED and key[1] in parents))
+
+
+def _on_class_event(item: dict[str, Any]) -> None:
+    if item.get("change") == "resync":
+        _invalidate(lambda key, feed: True)  # Events may have been missed
+        return
+    class_id, student_id = item.get("class_id"), item.get("student_id")
+    _invalidate(lambda key, feed: class_id in feed.class_ids or student_id in feed.student_ids)
+
+
+events.broker.add_listener(_on_class_event)
@@ -6,7 +6,7 @@ Handles business logic for class management and registration.
 
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_
+from sqlalchemy import and_, delete
 from fastapi import HTTPException, status
 
 from app.models.class_model import ClassModel
@@ -14,6 +14,13 @@ from app.models.student import Student
 from app.models.class_registration import ClassRegistration
 from app.models.subscription import Subscription
 from app.schemas.class_schema import ClassCreate, ClassUpdate
+from app.core.events import (
+    CLASS_DELETED,
+    CLASS_UPDATED,
+    REGISTRATION_ADDED,
+    REGISTRATION_REMOVED,
+    publish_class_changes,
+)
 
 
 def _validate_time_slot_format(time_slot: str) -> None:
@@ -293,6 +300,8 @@ def register_student_to_class(db: Session, class_id: int, student_id: int) -> Cl
             class_id=class_id
         )
         db.add(registration)
+        db.flush()
+        publish_class_changes(db, [class_id], REGISTRATION_ADDED, student_id)
         db.commit()
         db.refresh(registration)
         
@@ -346,12 +355,54 @@ def update_class(db: Session, class_id: int, class_data: "ClassUpdate") -> Class
     if class_data.max_students is not None:
         class_obj.max_students = class_data.max_students
     
+    db.flush()
+    publish_class_changes(db, [class_id], CLASS_UPDATED)
     db.commit()
     db.refresh(class_obj)
     
     return class_obj
 
 
+def delete_class(db: Session, class_id: int) -> None:
+    """
+    Delete a class.
+    
+    Args:
+        db: Database session
+        class_id: Class ID to delete
+        
+    Raises:
+        HTTPException: If class not found
+    """
+    if not delete_classes(db, [class_id]):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Class not found"
+        )
+
+
+def delete_classes(db: Session, class_ids: list[int]) -> int:
+    """
+    Delete classes in a single statement.
+    
+    The database removes their registrations (ON DELETE CASCADE) and
+    keeps recorded session usage, unlinked from the class (SET NULL).
+    
+    Args:
+        db: Database session
+        class_ids: Class IDs (unknown IDs are skipped)
+        
+    Returns:
+        Number of classes deleted
+    """
+    deleted = list(db.execute(
+        delete(ClassModel).where(ClassModel.id.in_(set(class_ids))).returning(ClassModel.id)
+    ).scalars())
+    publish_class_changes(db, deleted, CLASS_DELETED)
+    db.commit()
+    return len(deleted)
+
+
 def unregister_student_from_class(db: Session, class_id: int, student_id: int) -> None:
     """
     Remove a student's registration from a class.
@@ -376,4 +427,6 @@ def unregister_student_from_class(db: Session, class_id: int, student_id: int) -
         )
     
     db.delete(registration)
+    db.flush()
+    publish_class_changes(db, [class_id], REGISTRATION_REMOVED, student_id)
     db.commit()
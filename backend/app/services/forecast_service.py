@@ -0,0 +1,124 @@
+"""
+Service layer for subscription exhaustion forecasting.
+
+Loads every active subscription into NumPy arrays and projects when each
+package will run out of sessions in a single vectorized pass
+(see app.utils.forecasting).
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.class_registration import ClassRegistration
+from app.models.subscription import Subscription
+from app.utils.forecasting import forecast_exhaustion
+
+
+def get_subscription_forecast(
+    db: Session,
+    horizon_days: int,
+    at_risk_only: bool = True,
+    limit: int = 100,
+    offset: int = 0
+) -> dict[str, Any]:
+    """
+    Forecast exhaustion for all active subscriptions.
+
+    The forecast always covers every active subscription; limit and
+    offset only page through the returned rows (ordered by subscription ID).
+
+    Args:
+        db: Database session
+        horizon_days: Flag subscriptions running out within this many days
+        at_risk_only: Only return at-risk subscriptions
+        limit: Maximum number of rows to return
+        offset: Number of matching rows to skip
+
+    Returns:
+        Dictionary with population totals and one page of per-subscription forecasts
+    """
+    today = date.today()
+
+    rows = db.execute(
+        select(
+            Subscription.id,
+            Subscription.student_id,
+            Subscription.start_date,
+            Subscription.end_date,
+            Subscription.total_sessions,
+            Subscription.used_sessions,
+        ).where(Subscription.is_active == True).order_by(Subscription.id)
+    ).all()
+
+    registrations = db.execute(
+        select(ClassRegistration.student_id, func.count(ClassRegistration.id))
+        .group_by(ClassRegistration.student_id)
+    ).all()
+
+    count = len(rows)
+    columns = list(zip(*rows)) if rows else [()] * 6
+    subscription_ids = np.fromiter(columns[0], dtype=np.int64, count=count)
+    student_ids = np.fromiter(columns[1], dtype=np.int64, count=count)
+    start_days = np.fromiter(
+        (d.toordinal() if d else today.toordinal() for d in columns[2]), dtype=np.int64, count=count
+    )
+    end_days = np.fromiter(
+        (d.toordinal() if d else date.max.toordinal() for d in columns[3]), dtype=np.int64, count=count
+    )
+    total_sessions = np.fromiter(columns[4], dtype=np.int64, count=count)
+    used_sessions = np.fromiter(columns[5], dtype=np.int64, count=count)
+
+    # Weekly registrations per student, looked up by sorted student id
+    weekly_classes = np.zeros(count, dtype=np.float64)
+    if registrations and count:
+        reg_students = np.array([r[0] for r in registrations], dtype=np.int64)
+        reg_counts = np.array([r[1] for r in registrations], dtype=np.float64)
+        order = np.argsort(reg_students)
+        reg_students, reg_counts = reg_students[order], reg_counts[order]
+        positions = np.clip(np.searchsorted(reg_students, student_ids), 0, len(reg_students) - 1)
+        found = reg_students[positions] == student_ids
+        weekly_classes = np.where(found, reg_counts[positions], 0.0)
+
+    forecast = forecast_exhaustion(
+        start_days,
+        end_days,
+        total_sessions,
+        used_sessions,
+        weekly_classes,
+        today.toordinal(),
+        horizon_days,
+    )
+
+    at_risk = forecast["at_risk"]
+    selected = np.flatnonzero(at_risk) if at_risk_only else np.arange(count)
+    matching = len(selected)
+    selected = selected[offset:offset + limit]
+
+    forecasts = [
+        {
+            "subscription_id": int(subscription_ids[i]),
+            "student_id": int(student_ids[i]),
+            "remaining_sessions": max(int(total_sessions[i] - used_sessions[i]), 0),
+            "weekly_rate": round(float(forecast["weekly_rate"][i]), 2),
+            "projected_exhaustion_date": (
+                date.fromordinal(int(forecast["exhaustion_day"][i]))
+                if forecast["exhaustion_day"][i] > 0 else None
+            ),
+            "at_risk": bool(at_risk[i]),
+        }
+        for i in selected
+    ]
+
+    return {
+        "generated_at": datetime.now(timezone.utc),
+        "horizon_days": horizon_days,
+        "active_subscriptions": count,
+        "at_risk_subscriptions": int(at_risk.sum()),
+        "matching_rows": matching,
+        "offset": offset,
+        "rows": forecasts,
+    }
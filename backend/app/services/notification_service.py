@@ -0,0 +1,284 @@
+"""
+Service layer for parent notifications.
+
+Parents are told when a child's package runs low on sessions or is about
+to end. Notifications go through a transactional outbox: services insert
+OutboxMessage rows in the transaction that causes them, and
+dispatch_outbox() delivers them later in batches, one notification per
+parent covering all of that parent's pending messages. Failed deliveries
+are retried with exponential backoff up to OUTBOX_MAX_ATTEMPTS, so a
+sink outage delays notifications without losing them, and the request
+path never waits on delivery.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.notifications import Notification, create_sink
+from app.models.outbox_message import (
+    NOTIFICATION_ENDING_SOON,
+    NOTIFICATION_LOW_BALANCE,
+    OUTBOX_DISCARDED,
+    OUTBOX_FAILED,
+    OUTBOX_PENDING,
+    OUTBOX_SENT,
+    OutboxMessage,
+)
+from app.models.parent import Parent
+from app.models.student import Student
+from app.models.subscription import Subscription
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_ENQUEUED = metrics.Counter(
+    "outbox_messages_enqueued_total",
+    "Notification messages written to the outbox by kind",
+    ["kind"],
+)
+OUTBOX_DELIVERED = metrics.Counter(
+    "outbox_messages_delivered_total",
+    "Outbox messages delivered by kind",
+    ["kind"],
+)
+OUTBOX_ABANDONED = metrics.Counter(
+    "outbox_messages_abandoned_total",
+    "Outbox messages given up on by status (failed after all retries, or discarded)",
+    ["status"],
+)
+NOTIFICATIONS_SENT = metrics.Counter(
+    "notifications_sent_total",
+    "Notifications handed to the sink (one per parent and dispatch)",
+)
+NOTIFICATION_FAILURES = metrics.Counter(
+    "notification_delivery_failures_total",
+    "Notifications the sink failed to deliver",
+)
+OUTBOX_DELIVERY_LAG = metrics.Histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from writing an outbox message to delivering it",
+    buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 21600.0),
+)
+OUTBOX_PENDING_MESSAGES = metrics.Gauge(
+    "outbox_pending_messages",
+    "Undelivered outbox messages at the last dispatch",
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _message(kind: str, subscription: Subscription) -> OutboxMessage:
+    now = datetime.now(timezone.utc)
+    OUTBOX_ENQUEUED.labels(kind).inc()
+    return OutboxMessage(
+        kind=kind,
+        student_id=subscription.student_id,
+        subscription_id=subscription.id,
+        payload={
+            "package_name": subscription.package_name,
+            "remaining_sessions": subscription.remaining_sessions,
+            "end_date": str(subscription.end_date) if subscription.end_date else None,
+        },
+        available_at=now,
+        created_at=now,
+    )
+
+
+def notify_if_low_balance(db: Session, subscription: Subscription, previous_remaining: int) -> None:
+    """
+    Queue a low-balance notification if remaining sessions just dropped below the threshold.
+
+    Adds the message to the caller's transaction without committing, so it
+    is recorded exactly when the usage is.
+
+    Args:
+        db: Database session
+        subscription: Subscription with its updated session counts
+        previous_remaining: Remaining sessions before the change
+    """
+    threshold = settings.NOTIFY_LOW_BALANCE_BELOW
+    if threshold > 0 and subscription.remaining_sessions < threshold <= previous_remaining:
+        db.add(_message(NOTIFICATION_LOW_BALANCE, subscription))
+
+
+def enqueue_ending_soon(db: Session, today: date | None = None) -> int:
+    """
+    Queue a notification for each active subscription ending soon, once per subscription.
+
+    Args:
+        db: Database session
+        today: Reference date (defaults to the current date)
+
+    Returns:
+        Number of notifications queued
+    """
+    if settings.NOTIFY_ENDING_WITHIN_DAYS <= 0:
+        return 0
+
+    today = today or date.today()
+    already_notified = exists().where(
+        OutboxMessage.kind == NOTIFICATION_ENDING_SOON,
+        OutboxMessage.subscription_id == Subscription.id,
+    )
+    subscriptions = db.execute(
+        select(Subscription).where(
+            Subscription.is_active == True,
+            Subscription.end_date >= today,
+            Subscription.end_date <= today + timedelta(days=settings.NOTIFY_ENDING_WITHIN_DAYS),
+            ~already_notified,
+        )
+    ).scalars().all()
+
+    db.add_all(_message(NOTIFICATION_ENDING_SOON, subscription) for subscription in subscriptions)
+    db.commit()
+    return len(subscriptions)
+
+
+def _render(parent_name: str, messages: list[tuple[str, OutboxMessage]]) -> tuple[str, str]:
+    """Subject and body of one notification covering several (student name, message) pairs."""
+    lines = []
+    for student_name, message in messages:
+        payload = message.payload
+        if message.kind == NOTIFICATION_LOW_BALANCE:
+            lines.append(
+                f"- {student_name}: {payload['package_name']} has "
+                f"{payload['remaining_sessions']} session(s) left"
+            )
+        else:
+            lines.append(f"- {student_name}: {payload['package_name']} ends on {payload['end_date']}")
+
+    subject = "Subscription update" if len(lines) == 1 else f"{len(lines)} subscription updates"
+    body = "\n".join([f"Hello {parent_name},", "", *lines, "", "Please contact us to renew."])
+    return subject, body
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.OUTBOX_RETRY_MAX_SECONDS,
+    ))
+
+
+def dispatch_outbox(db: Session) -> int:
+    """
+    Deliver due outbox messages, coalesced into one notification per parent.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of messages delivered
+    """
+    now = datetime.now(timezone.utc)
+    messages = db.execute(
+        select(OutboxMessage)
+        .where(OutboxMessage.status == OUTBOX_PENDING, OutboxMessage.available_at <= now)
+        .order_by(OutboxMessage.id)
+        .limit(settings.OUTBOX_BATCH_SIZE)
+        # Lets several dispatchers share the outbox on PostgreSQL
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+
+    recipients = {}
+    if messages:
+        # One query resolves every student's parent (recipients may have changed since enqueueing)
+        student_user = aliased(User)
+        parent_user = aliased(User)
+        recipients = {
+            row.student_id: row for row in db.execute(
+                select(Student.id.label("student_id"), student_user.name.label("student_name"),
+                       Parent.id.label("parent_id"), parent_user.name.label("parent_name"), parent_user.email)
+                .join(student_user, student_user.id == Student.user_id)
+                .join(Parent, Parent.id == Student.parent_id)
+                .join(parent_user, parent_user.id == Parent.user_id)
+                .where(Student.id.in_({message.student_id for message in messages}))
+            )
+        }
+
+    by_parent: dict[int, list[OutboxMessage]] = defaultdict(list)
+    for message in messages:
+        recipient = recipients.get(message.student_id)
+        if recipient is None:
+            message.status = OUTBOX_DISCARDED
+            OUTBOX_ABANDONED.labels(OUTBOX_DISCARDED).inc()
+            continue
+        by_parent[recipient.parent_id].append(message)
+
+    sink = create_sink()
+    delivered = 0
+    for parent_messages in by_parent.values():
+        recipient = recipients[parent_messages[0].student_id]
+        subject, body = _render(
+            recipient.parent_name,
+            [(recipients[message.student_id].student_name, message) for message in parent_messages],
+        )
+        try:
+            sink.send(Notification(recipient=recipient.email, subject=subject, body=body))
+        except Exception as e:
+            NOTIFICATION_FAILURES.inc()
+            logger.warning("Notification to parent %s failed: %s", recipient.parent_id, e)
+            for message in parent_messages:
+                message.attempts += 1
+                message.last_error = str(e)[:1000]
+                if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    message.status = OUTBOX_FAILED
+                    OUTBOX_ABANDONED.labels(OUTBOX_FAILED).inc()
+                else:
+                    message.available_at = now + _retry_delay(message.attempts)
+            continue
+
+        NOTIFICATIONS_SENT.inc()
+        for message in parent_messages:
+            message.status = OUTBOX_SENT
+            message.sent_at = now
+            OUTBOX_DELIVERED.labels(message.kind).inc()
+            OUTBOX_DELIVERY_LAG.observe((now - _as_utc(message.created_at)).total_seconds())
+            delivered += 1
+
+    db.commit()
+
+    OUTBOX_PENDING_MESSAGES.set(db.execute(
+        select(func.count()).where(OutboxMessage.status == OUTBOX_PENDING)
+    ).scalar_one())
+    return delivered
+
+
+def purge_outbox(db: Session, today: date | None = None) -> int:
+    """
+    Delete delivered and abandoned messages older than OUTBOX_RETENTION_DAYS.
+
+    An "ending soon" message is also the record that its subscription was
+    notified, so it is kept until the subscription has ended; purging it
+    earlier would make enqueue_ending_soon() send the notice again.
+    Messages of subscriptions that no longer exist are purged normally.
+
+    Args:
+        db: Database session
+        today: Reference date (defaults to the current date)
+
+    Returns:
+        Number of messages deleted
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    subscription_running = exists().where(
+        Subscription.id == OutboxMessage.subscription_id,
+        Subscription.end_date >= (today or date.today()),
+    )
+    result = db.execute(
+        delete(OutboxMessage).where(
+            OutboxMessage.status != OUTBOX_PENDING,
+            OutboxMessage.created_at < cutoff,
+            ~((OutboxMessage.kind == NOTIFICATION_ENDING_SOON) & subscription_running),
+        )
+    )
+    db.commit()
+    return result.rowcount
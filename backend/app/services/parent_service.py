@@ -4,6 +4,7 @@ Service layer for parent operations.
 Handles business logic for parent management.
 """
 
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
@@ -11,7 +12,9 @@ from fastapi import HTTPException, status
 from app.models.parent import Parent
 from app.models.user import User, UserRole
 from app.schemas.parent import ParentCreate, ParentUpdate
+from app.core.revocation import revoke_users
 from app.core.security import get_password_hash
+from app.services.calendar_service import invalidate_feeds
 
 
 def create_parent(db: Session, parent_data: ParentCreate) -> Parent:
@@ -118,17 +121,40 @@ def delete_parent(db: Session, parent_id: int) -> None:
     Raises:
         HTTPException: If parent not found
     """
-    parent = db.query(Parent).filter(Parent.id == parent_id).first()
-    
-    if not parent:
+    if not delete_parents(db, [parent_id]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Parent not found"
         )
+
+
+def delete_parents(db: Session, parent_ids: list[int]) -> int:
+    """
+    Delete parents and their user accounts in a constant number of statements.
     
-    # Delete user (will cascade to parent due to foreign key)
-    db.query(User).filter(User.id == parent.user_id).delete()
+    Deleting the users cascades in the database to the parent profiles;
+    their children are kept and unlinked (parent_id set to NULL), without
+    loading them.
+    
+    Args:
+        db: Database session
+        parent_ids: Parent IDs (unknown IDs are skipped)
+        
+    Returns:
+        Number of parents deleted
+    """
+    user_ids = list(db.execute(
+        select(Parent.user_id).where(Parent.id.in_(set(parent_ids)))
+    ).scalars())
+    if not user_ids:
+        return 0
+    
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+
+    # Their access tokens stop working right away rather than at expiry
+    revoke_users(db, user_ids)
     db.commit()
+    return len(user_ids)
 
 
 def get_parent_by_user_id(db: Session, user_id: int) -> Parent:
@@ -190,6 +216,8 @@ def update_parent(db: Session, parent_id: int, parent_data: "ParentUpdate") -> P
             user.name = parent_data.name
     
     db.commit()
+    if parent_data.name is not None:
+        invalidate_feeds(parent_ids=[parent_id])  # Titles the family calendar feed
     db.refresh(parent)
     
     return parent
@@ -0,0 +1,256 @@
+"""
+Service layer for staff analytics reports.
+
+Reports are aggregated in the database by a background job and stored as
+snapshots. Endpoints read snapshots through a per-process cache that is
+kept until the next scheduled refresh.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, distinct
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.class_model import ClassModel
+from app.models.class_registration import ClassRegistration
+from app.models.report_snapshot import ReportSnapshot
+from app.models.session_usage import SessionUsage, USAGE_REASON_USE
+from app.models.subscription import Subscription
+
+CLASS_UTILIZATION = "class_utilization"
+SESSION_BURN = "session_burn"
+PACKAGE_ACTIVITY = "package_activity"
+TEACHER_LOAD = "teacher_load"
+
+# Per-process cache: report name -> (report dict, monotonic expiry)
+_cache: dict[str, tuple[dict[str, Any], float]] = {}
+_cache_lock = threading.Lock()
+
+
+def _compute_class_utilization(db: Session, previous: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    """Registrations vs. capacity per class."""
+    rows = (
+        db.query(
+            ClassModel.id,
+            ClassModel.name,
+            ClassModel.teacher_name,
+            ClassModel.day_of_week,
+            ClassModel.time_slot,
+            ClassModel.max_students,
+            func.count(ClassRegistration.id),
+        )
+        .outerjoin(ClassRegistration, ClassRegistration.class_id == ClassModel.id)
+        .group_by(ClassModel.id)
+        .order_by(ClassModel.id)
+        .all()
+    )
+
+    return [
+        {
+            "class_id": class_id,
+            "name": name,
+            "teacher_name": teacher_name,
+            "day_of_week": day_of_week,
+            "time_slot": time_slot,
+            "max_students": max_students,
+            "registrations": registrations,
+            "utilization": round(registrations / max_students, 4) if max_students else None,
+        }
+        for class_id, name, teacher_name, day_of_week, time_slot, max_students, registrations in rows
+    ]
+
+
+def _compute_session_burn(db: Session, previous: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    """
+    Sessions used per ISO week.
+
+    The usage ledger is append-only, so completed weeks never change:
+    only weeks from the newest previously reported week onwards are
+    recomputed and merged into the previous snapshot.
+    """
+    today = date.today()
+    oldest_week = today - timedelta(days=today.weekday(), weeks=settings.REPORT_SESSION_BURN_WEEKS - 1)
+
+    kept: dict[str, int] = {}
+    recompute_from = oldest_week
+    if previous:
+        latest_week = date.fromisoformat(max(row["week_start"] for row in previous))
+        recompute_from = max(latest_week, oldest_week)
+        kept = {
+            row["week_start"]: row["sessions"]
+            for row in previous
+            if oldest_week.isoformat() <= row["week_start"] < recompute_from.isoformat()
+        }
+
+    used_day = func.date(SessionUsage.used_at)
+    daily = (
+        db.query(used_day, func.sum(SessionUsage.sessions))
+        .filter(
+            SessionUsage.reason == USAGE_REASON_USE,
+            SessionUsage.used_at >= datetime.combine(recompute_from, datetime.min.time()),
+        )
+        .group_by(used_day)
+        .all()
+    )
+
+    weeks = dict(kept)
+    for day, sessions in daily:
+        day = day if isinstance(day, date) else date.fromisoformat(day)
+        week_start = (day - timedelta(days=day.weekday())).isoformat()
+        weeks[week_start] = weeks.get(week_start, 0) + int(sessions)
+
+    return [
+        {"week_start": week_start, "sessions": sessions}
+        for week_start, sessions in sorted(weeks.items())
+    ]
+
+
+def _compute_package_activity(db: Session, previous: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    """Active subscriptions and remaining sessions per package."""
+    rows = (
+        db.query(
+            Subscription.package_name,
+            func.count(Subscription.id),
+            func.sum(Subscription.total_sessions - Subscription.used_sessions),
+        )
+        .filter(Subscription.is_active == True)
+        .group_by(Subscription.package_name)
+        .order_by(Subscription.package_name)
+        .all()
+    )
+
+    return [
+        {
+            "package_name": package_name,
+            "active_subscriptions": active,
+            "remaining_sessions": int(remaining or 0),
+        }
+        for package_name, active, remaining in rows
+    ]
+
+
+def _compute_teacher_load(db: Session, previous: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    """Classes taught and students enrolled per teacher."""
+    rows = (
+        db.query(
+            ClassModel.teacher_name,
+            func.count(distinct(ClassModel.id)),
+            func.count(ClassRegistration.id),
+        )
+        .outerjoin(ClassRegistration, ClassRegistration.class_id == ClassModel.id)
+        .group_by(ClassModel.teacher_name)
+        .order_by(ClassModel.teacher_name)
+        .all()
+    )
+
+    return [
+        {"teacher_name": teacher_name, "classes": classes, "registrations": registrations}
+        for teacher_name, classes, registrations in rows
+    ]
+
+
+REPORTS: dict[str, Callable[[Session, list[dict[str, Any]] | None], list[dict[str, Any]]]] = {
+    CLASS_UTILIZATION: _compute_class_utilization,
+    SESSION_BURN: _compute_session_burn,
+    PACKAGE_ACTIVITY: _compute_package_activity,
+    TEACHER_LOAD: _compute_teacher_load,
+}
+
+
+def _refresh_report(db: Session, name: str) -> ReportSnapshot:
+    """Recompute one report and store its snapshot (caller commits)."""
+    snapshot = db.get(ReportSnapshot, name)
+    previous = snapshot.payload if snapshot else None
+    payload = REPORTS[name](db, previous)
+    refreshed_at = datetime.now(timezone.utc)
+
+    if snapshot is None:
+        snapshot = ReportSnapshot(name=name, payload=payload, refreshed_at=refreshed_at)
+        db.add(snapshot)
+    else:
+        snapshot.payload = payload
+        snapshot.refreshed_at = refreshed_at
+
+    return snapshot
+
+
+def refresh_reports(db: Session) -> int:
+    """
+    Recompute all report snapshots.
+
+    All snapshots are replaced in one transaction, so readers keep seeing
+    the previous data until the refresh commits.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of reports refreshed
+    """
+    for name in REPORTS:
+        _refresh_report(db, name)
+    db.commit()
+
+    return len(REPORTS)
+
+
+def get_report(db: Session, name: str) -> dict[str, Any]:
+    """
+    Get a report, served from the process cache until its next refresh.
+
+    Args:
+        db: Database session
+        name: Report name
+
+    Returns:
+        Dictionary with report name, rows and freshness timestamps
+
+    Raises:
+        HTTPException: If the report does not exist
+    """
+    if name not in REPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(name)
+    if cached and cached[1] > now:
+        metrics.CACHE_REQUESTS.labels("reports", "hit").inc()
+        return cached[0]
+    metrics.CACHE_REQUESTS.labels("reports", "miss").inc()
+
+    snapshot = db.get(ReportSnapshot, name)
+    if snapshot is None:
+        # First request before the background job ran
+        snapshot = _refresh_report(db, name)
+        db.commit()
+
+    interval = timedelta(seconds=settings.REPORT_REFRESH_INTERVAL_SECONDS)
+    refreshed_at = snapshot.refreshed_at
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+    next_refresh_at = refreshed_at + interval
+
+    report = {
+        "report": name,
+        "refreshed_at": refreshed_at,
+        "next_refresh_at": next_refresh_at,
+        "rows": snapshot.payload,
+    }
+
+    # Keep until the next refresh; if the job is late, re-check shortly
+    seconds_left = (next_refresh_at - datetime.now(timezone.utc)).total_seconds()
+    with _cache_lock:
+        _cache[name] = (report, now + max(seconds_left, 5.0))
+
+    return report
@@ -4,6 +4,7 @@ Service layer for student operations.
 Handles business logic for student management.
 """
 
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
@@ -14,7 +15,10 @@ from app.models.parent import Parent
 from app.models.class_model import ClassModel
 from app.models.class_registration import ClassRegistration
 from app.schemas.student import StudentCreate, StudentUpdate
+from app.core.events import REGISTRATION_REMOVED, publish_class_changes
+from app.core.revocation import revoke_users
 from app.core.security import get_password_hash
+from app.services.calendar_service import invalidate_feeds
 
 
 def create_student(db: Session, student_data: StudentCreate) -> Student:
@@ -163,26 +167,47 @@ def delete_student(db: Session, student_id: int) -> None:
     Raises:
         HTTPException: If student not found
     """
-    student = db.query(Student).filter(Student.id == student_id).first()
-    
-    if not student:
+    if not delete_students(db, [student_id]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
         )
+
+
+def delete_students(db: Session, student_ids: list[int]) -> int:
+    """
+    Delete students and their user accounts in a constant number of statements.
     
-    # Get the user_id before deleting student
-    user_id = student.user_id
+    Deleting the users cascades in the database to the student profiles
+    and their registrations, subscriptions and session usage, so no child
+    rows are loaded.
     
-    # Delete student (cascade will handle registrations and subscriptions)
-    db.delete(student)
+    Args:
+        db: Database session
+        student_ids: Student IDs (unknown IDs are skipped)
+        
+    Returns:
+        Number of students deleted
+    """
+    user_ids = list(db.execute(
+        select(Student.user_id).where(Student.id.in_(set(student_ids)))
+    ).scalars())
+    if not user_ids:
+        return 0
     
-    # Delete associated user account
-    user = db.query(User).filter(User.id == user_id).first()
-    if user:
-        db.delete(user)
+    # Seat counts of their classes change; tell live dashboards
+    class_ids = list(db.execute(
+        select(ClassRegistration.class_id).distinct().where(ClassRegistration.student_id.in_(set(student_ids)))
+    ).scalars())
+
+    db.execute(delete(User).where(User.id.in_(user_ids)))
+    publish_class_changes(db, class_ids, REGISTRATION_REMOVED)
+
+    # Their access tokens stop working right away rather than at expiry
+    revoke_users(db, user_ids)
     
     db.commit()
+    return len(user_ids)
 
 
 def get_student_by_user_id(db: Session, user_id: int) -> Student:
@@ -259,6 +284,9 @@ def update_student(db: Session, student_id: int, student_data: "StudentUpdate")
             user.name = student_data.name
     
     db.commit()
+    if student_data.parent_id is not None or student_data.name is not None:
+        # The student moves between family calendar feeds, or is named in them
+        invalidate_feeds(student_ids=[student_id], parent_ids=[student.parent_id])
     db.refresh(student)
     
     return student
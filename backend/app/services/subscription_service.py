@@ -4,14 +4,20 @@ Service layer for subscription operations.
 Handles business logic for subscription management.
 """
 
-from datetime import date
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import exists, func, or_, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 from app.models.subscription import Subscription
+from app.models.subscription_archive import ArchivedSubscription
 from app.models.student import Student
+from app.models.class_model import ClassModel
+from app.models.session_usage import SessionUsage, USAGE_REASON_USE, USAGE_REASON_ADJUSTMENT
 from app.schemas.subscription import SubscriptionCreate, SubscriptionUpdate
+from app.services.calendar_service import invalidate_feeds
+from app.services.notification_service import notify_if_low_balance
 
 
 def create_subscription(db: Session, subscription_data: SubscriptionCreate) -> Subscription:
@@ -62,6 +68,8 @@ def create_subscription(db: Session, subscription_data: SubscriptionCreate) -> S
         )
         db.add(subscription)
         db.commit()
+        # The subscription dates bound the student's calendar feed
+        invalidate_feeds(student_ids=[subscription.student_id])
         db.refresh(subscription)
         
         return subscription
@@ -74,19 +82,29 @@ def create_subscription(db: Session, subscription_data: SubscriptionCreate) -> S
         )
 
 
-def use_subscription_session(db: Session, subscription_id: int) -> Subscription:
+def use_subscription_session(
+    db: Session,
+    subscription_id: int,
+    actor_user_id: int | None = None,
+    class_id: int | None = None
+) -> Subscription:
     """
     Mark one session as used in a subscription.
     
+    Appends a usage entry to the session ledger and increments the
+    materialized used_sessions counter in the same transaction.
+    
     Args:
         db: Database session
         subscription_id: Subscription ID
+        actor_user_id: ID of the user recording the session
+        class_id: Optional class the session was consumed in
         
     Returns:
         Updated subscription object
         
     Raises:
-        HTTPException: If subscription not found, inactive, or no sessions left
+        HTTPException: If subscription/class not found, inactive, or no sessions left
     """
     subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
     
@@ -117,19 +135,60 @@ def use_subscription_session(db: Session, subscription_id: int) -> Subscription:
                 detail="Subscription has expired"
             )
     
+    if class_id is not None:
+        class_exists = db.query(ClassModel.id).filter(ClassModel.id == class_id).first()
+        if not class_exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Class not found"
+            )
+    
     try:
-        # Increment used_sessions
-        subscription.used_sessions += 1
+        # Increment used_sessions in SQL, guarded so that concurrent uses
+        # can neither be lost nor overdraw the package
+        result = db.execute(
+            update(Subscription)
+            .where(
+                Subscription.id == subscription_id,
+                Subscription.is_active == True,
+                Subscription.used_sessions < Subscription.total_sessions
+            )
+            .values(used_sessions=Subscription.used_sessions + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            # Another request used the last session (or deactivated the package) since the checks above
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No sessions remaining"
+            )
+        
+        # Record the usage event
+        db.add(SessionUsage(
+            subscription_id=subscription_id,
+            class_id=class_id,
+            actor_user_id=actor_user_id,
+            sessions=1,
+            reason=USAGE_REASON_USE
+        ))
+        db.flush()
+        db.refresh(subscription)
         
         # Deactivate if all sessions used
         if subscription.remaining_sessions == 0:
             subscription.is_active = False
         
+        # Committed with the usage, delivered later by the outbox dispatcher
+        notify_if_low_balance(db, subscription, subscription.remaining_sessions + 1)
+        
         db.commit()
         db.refresh(subscription)
         
         return subscription
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -198,31 +257,52 @@ def delete_subscription(db: Session, subscription_id: int) -> None:
     
     db.delete(subscription)
     db.commit()
+    invalidate_feeds(student_ids=[subscription.student_id])
 
 
-def get_subscriptions_by_student_id(db: Session, student_id: int) -> list[Subscription]:
+def get_subscriptions_by_student_id(
+    db: Session,
+    student_id: int,
+    include_archived: bool = False
+) -> list[Subscription | ArchivedSubscription]:
     """
     Get all subscriptions for a specific student.
     
     Args:
         db: Database session
         student_id: Student ID
+        include_archived: Also return subscriptions moved to the archive
         
     Returns:
-        List of subscriptions for the student
+        List of subscriptions for the student, archived ones last
     """
-    subscriptions = db.query(Subscription).filter(Subscription.student_id == student_id).all()
+    subscriptions: list[Subscription | ArchivedSubscription] = list(
+        db.query(Subscription).filter(Subscription.student_id == student_id).all()
+    )
+    if include_archived:
+        subscriptions.extend(
+            db.query(ArchivedSubscription).filter(ArchivedSubscription.student_id == student_id).all()
+        )
     return subscriptions
 
 
-def update_subscription(db: Session, subscription_id: int, subscription_data: "SubscriptionUpdate") -> Subscription:
+def update_subscription(
+    db: Session,
+    subscription_id: int,
+    subscription_data: "SubscriptionUpdate",
+    actor_user_id: int | None = None
+) -> Subscription:
     """
     Update subscription information.
     
+    Changes to used_sessions are recorded in the session ledger as an
+    adjustment entry, keeping the counter consistent with its history.
+    
     Args:
         db: Database session
         subscription_id: Subscription ID to update
         subscription_data: SubscriptionUpdate schema with updated fields
+        actor_user_id: ID of the user making the change
         
     Returns:
         Updated subscription object
@@ -238,6 +318,8 @@ def update_subscription(db: Session, subscription_id: int, subscription_data: "S
             detail="Subscription not found"
         )
     
+    previous_remaining = subscription.remaining_sessions
+    
     # Update fields
     if subscription_data.package_name is not None:
         subscription.package_name = subscription_data.package_name
@@ -248,7 +330,15 @@ def update_subscription(db: Session, subscription_id: int, subscription_data: "S
     if subscription_data.total_sessions is not None:
         subscription.total_sessions = subscription_data.total_sessions
     if subscription_data.used_sessions is not None:
-        subscription.used_sessions = subscription_data.used_sessions
+        delta = subscription_data.used_sessions - subscription.used_sessions
+        if delta != 0:
+            db.add(SessionUsage(
+                subscription_id=subscription_id,
+                actor_user_id=actor_user_id,
+                sessions=delta,
+                reason=USAGE_REASON_ADJUSTMENT
+            ))
+            subscription.used_sessions = subscription_data.used_sessions
     
     # Validate date range if both dates are set
     if subscription.end_date and subscription.start_date:
@@ -258,7 +348,111 @@ def update_subscription(db: Session, subscription_id: int, subscription_data: "S
                 detail="end_date must be after start_date"
             )
     
+    notify_if_low_balance(db, subscription, previous_remaining)
+    
     db.commit()
+    if subscription_data.start_date is not None or subscription_data.end_date is not None:
+        invalidate_feeds(student_ids=[subscription.student_id])
     db.refresh(subscription)
     
     return subscription
+
+
+def deactivate_lapsed_subscriptions(db: Session, today: date | None = None) -> int:
+    """
+    Deactivate all active subscriptions that have expired or run out of sessions.
+    
+    Runs as a single set-based UPDATE, driven by the partial index on active rows.
+    
+    Args:
+        db: Database session
+        today: Reference date for expiry (defaults to the current date)
+        
+    Returns:
+        Number of subscriptions deactivated
+    """
+    today = today or date.today()
+    
+    result = db.execute(
+        update(Subscription)
+        .where(
+            Subscription.is_active == True,
+            or_(
+                Subscription.end_date < today,
+                Subscription.used_sessions >= Subscription.total_sessions
+            )
+        )
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    
+    return result.rowcount
+
+
+def get_session_usage(
+    db: Session,
+    subscription_id: int,
+    start: date | None = None,
+    end: date | None = None
+) -> list[SessionUsage]:
+    """
+    Get the usage ledger of a subscription, optionally within a date range.
+    
+    Args:
+        db: Database session
+        subscription_id: Subscription ID
+        start: First day to include (inclusive)
+        end: Last day to include (inclusive)
+        
+    Returns:
+        Ledger entries ordered by time
+        
+    Raises:
+        HTTPException: If subscription not found
+    """
+    subscription_exists = db.query(Subscription.id).filter(Subscription.id == subscription_id).first()
+    if not subscription_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subscription not found"
+        )
+    
+    query = db.query(SessionUsage).filter(SessionUsage.subscription_id == subscription_id)
+    if start is not None:
+        query = query.filter(SessionUsage.used_at >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.filter(SessionUsage.used_at < datetime.combine(end + timedelta(days=1), time.min))
+    
+    return query.order_by(SessionUsage.used_at, SessionUsage.id).all()
+
+
+def reconcile_used_sessions(db: Session) -> int:
+    """
+    Rebuild used_sessions from the session ledger where they disagree.
+    
+    Subscriptions without any ledger entry are left alone: their balance
+    predates the ledger (see app.core.schema) rather than being zero.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Number of subscriptions corrected
+    """
+    ledger_total = (
+        select(func.coalesce(func.sum(SessionUsage.sessions), 0))
+        .where(SessionUsage.subscription_id == Subscription.id)
+        .scalar_subquery()
+    )
+    has_ledger = exists().where(SessionUsage.subscription_id == Subscription.id)
+    
+    result = db.execute(
+        update(Subscription)
+        .where(has_ledger, Subscription.used_sessions != ledger_total)
+        .values(used_sessions=ledger_total)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    
+    return result.rowcount
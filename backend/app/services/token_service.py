@@ -0,0 +1,209 @@
+"""
+Service layer for refresh tokens.
+
+Handles issuing, rotating and revoking refresh tokens, so clients can
+renew short-lived access tokens without repeating a (bcrypt) login.
+"""
+
+import hashlib
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_token(token: str) -> str:
+    """Digest stored instead of the token (tokens are random, so no salt or slow hash is needed)."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+    )
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: str | None = None) -> str:
+    """
+    Create a refresh token for a user (not committed).
+
+    Args:
+        db: Database session
+        user_id: Owner of the token
+        family_id: Family to continue when rotating; a new family otherwise
+
+    Returns:
+        The opaque token to hand to the client
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id or secrets.token_hex(16),
+        token_hash=_hash_token(token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[str, str]:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    The presented token is revoked. Presenting an already revoked token
+    revokes its whole family, which logs out a thief and the victim alike,
+    unless the token was rotated within REFRESH_TOKEN_REUSE_GRACE_SECONDS
+    and its family is still active: then another successor is issued, so
+    tabs refreshing the same stored token at once all stay logged in.
+
+    Args:
+        db: Database session
+        token: Refresh token presented by the client
+
+    Returns:
+        Tuple of (access token, new refresh token)
+
+    Raises:
+        HTTPException: If the token is unknown, expired or revoked
+    """
+    now = datetime.now(timezone.utc)
+    row = db.execute(
+        select(RefreshToken.id, RefreshToken.user_id, RefreshToken.family_id,
+               RefreshToken.expires_at, RefreshToken.revoked_at, User.role)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == _hash_token(token))
+    ).one_or_none()
+    if row is None or _as_utc(row.expires_at) <= now:
+        raise _invalid_token()
+
+    # Revoke only if still active, so of two concurrent refreshes only one rotates the token
+    rotated = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    ).rowcount
+    if not rotated and _rotated_moments_ago(db, row.id, row.family_id, now):
+        logger.info("Refresh token of user %s presented again within the grace period", row.user_id)
+    elif not rotated:
+        logger.warning("Refresh token reuse for user %s; revoking family %s", row.user_id, row.family_id)
+        revoke_family(db, row.family_id)
+        raise _invalid_token()
+
+    new_token = issue_refresh_token(db, row.user_id, row.family_id)
+    db.commit()
+
+    access_token = create_access_token(data={"sub": str(row.user_id), "role": row.role.value})
+    return access_token, new_token
+
+
+def _rotated_moments_ago(db: Session, token_id: int, family_id: str, now: datetime) -> bool:
+    """
+    Whether a revoked token was rotated within the reuse grace period.
+
+    A family with no active token was logged out or found stolen, so its
+    tokens never qualify.
+    """
+    grace = settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS
+    revoked_at = db.execute(
+        select(RefreshToken.revoked_at).where(RefreshToken.id == token_id)
+    ).scalar_one()
+    if grace <= 0 or revoked_at is None or _as_utc(revoked_at) < now - timedelta(seconds=grace):
+        return False
+    return db.execute(
+        select(exists().where(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        ))
+    ).scalar_one()
+
+
+def revoke_family(db: Session, family_id: str) -> int:
+    """
+    Revoke every active token of a family and commit.
+
+    Args:
+        db: Database session
+        family_id: Token family (one login)
+
+    Returns:
+        Number of tokens revoked
+    """
+    revoked = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    ).rowcount
+    db.commit()
+    return revoked
+
+
+def revoke_token_family(db: Session, token: str) -> None:
+    """
+    Revoke the family of a presented refresh token (logout).
+
+    Unknown tokens are ignored, so logging out is always safe to retry.
+
+    Args:
+        db: Database session
+        token: Refresh token presented by the client
+    """
+    family_id = db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == _hash_token(token))
+    ).scalar_one_or_none()
+    if family_id is not None:
+        revoke_family(db, family_id)
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> int:
+    """
+    Revoke all active refresh tokens of a user (log out everywhere) and commit.
+
+    Args:
+        db: Database session
+        user_id: User whose tokens are revoked
+
+    Returns:
+        Number of tokens revoked
+    """
+    revoked = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    ).rowcount
+    db.commit()
+    return revoked
+
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    """
+    Delete expired refresh tokens.
+
+    Revoked tokens are kept until they expire, so reuse is still detected.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of tokens deleted
+    """
+    result = db.execute(
+        delete(RefreshToken).where(RefreshToken.expires_at < datetime.now(timezone.utc))
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,75 @@
+"""
+Vectorized subscription exhaustion forecasting.
+
+Pure NumPy functions operating on whole populations of subscriptions at
+once, kept free of database and application imports so they can be
+benchmarked in isolation.
+"""
+
+from datetime import date
+
+import numpy as np
+
+DAYS_PER_WEEK = 7.0
+MAX_DAY = date.max.toordinal()
+
+
+def forecast_exhaustion(
+    start_days: np.ndarray,
+    end_days: np.ndarray,
+    total_sessions: np.ndarray,
+    used_sessions: np.ndarray,
+    weekly_classes: np.ndarray,
+    today: int,
+    horizon_days: int,
+) -> dict[str, np.ndarray]:
+    """
+    Project exhaustion dates for a population of subscriptions.
+
+    Dates are passed as day numbers (e.g. date.toordinal()). The burn rate
+    is the larger of the rate observed so far and the student's weekly
+    class schedule, so warnings err on the early side.
+
+    Args:
+        start_days: Start day of each subscription
+        end_days: End day of each subscription
+        total_sessions: Sessions included in each package
+        used_sessions: Sessions consumed so far
+        weekly_classes: Classes per week the student is registered for
+        today: Reference day number
+        horizon_days: Flag subscriptions running out within this many days
+
+    Returns:
+        Arrays of weekly burn rate, projected exhaustion day (-1 if the
+        package is not being consumed) and at-risk flags
+    """
+    remaining = np.maximum(total_sessions - used_sessions, 0).astype(np.float64)
+
+    elapsed_weeks = np.clip(np.minimum(today, end_days) - start_days, 0, None) / DAYS_PER_WEEK
+    observed_rate = np.divide(
+        used_sessions,
+        elapsed_weeks,
+        out=np.zeros_like(remaining),
+        where=elapsed_weeks >= 1.0,
+    )
+    weekly_rate = np.maximum(observed_rate, weekly_classes)
+
+    consuming = weekly_rate > 0
+    days_left = np.divide(
+        remaining * DAYS_PER_WEEK,
+        weekly_rate,
+        out=np.full_like(remaining, np.inf),
+        where=consuming,
+    )
+    exhaustion_day = np.where(
+        consuming, np.minimum(today + np.ceil(days_left), MAX_DAY), -1
+    ).astype(np.int64)
+
+    # At risk: sessions run out soon, before the package would expire anyway
+    at_risk = consuming & (exhaustion_day <= today + horizon_days) & (exhaustion_day <= end_days)
+
+    return {
+        "weekly_rate": weekly_rate,
+        "exhaustion_day": exhaustion_day,
+        "at_risk": at_risk,
+    }
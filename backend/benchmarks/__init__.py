@@ -0,0 +1,6 @@
+"""
+Benchmarks for Mini LMS Backend.
+
+Run individual benchmarks as modules from the backend directory,
+e.g. ``python -m benchmarks.forecast_benchmark``.
+"""
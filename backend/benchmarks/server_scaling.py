@@ -0,0 +1,160 @@
+"""
+Throughput scaling of the multi-worker server (app.server).
+
+Starts `python -m app.server` with an increasing number of workers and
+measures request throughput on a read endpoint with load generated from
+several client processes. With enough CPUs, throughput should grow about
+linearly with workers; the report shows speedup and efficiency relative
+to one worker.
+
+Clients run on the same machine, so give the benchmark at least twice
+as many CPUs as the largest worker count, or the clients themselves
+become the bottleneck.
+
+Usage:
+    python -m benchmarks.server_scaling --workers 1 2 4 8 --duration 15
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchmarks.load_test import BACKEND_DIR, PASSWORD, STAFF_EMAIL, git_revision
+
+
+def _client_process(base_url: str, path: str, token: str, concurrency: int, duration: float) -> list[float]:
+    """Closed-loop load from one process; returns request latencies in seconds."""
+
+    async def run() -> list[float]:
+        latencies: list[float] = []
+        headers = {"Authorization": f"Bearer {token}"}
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+            deadline = time.monotonic() + duration
+
+            async def loop() -> None:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    response = await client.get(path)
+                    if response.status_code == 200:
+                        latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(loop() for _ in range(concurrency)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def measure(workers: int, args: argparse.Namespace, env: dict[str, str]) -> dict[str, float]:
+    """Run the server with a worker count and measure throughput."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise RuntimeError(f"Server with {workers} workers did not start")
+            time.sleep(0.2)
+
+        token = httpx.post(
+            f"{base_url}/api/auth/login", json={"email": STAFF_EMAIL, "password": PASSWORD}
+        ).json()["access_token"]
+
+        client_processes = args.client_processes or workers * 2
+        job = (base_url, args.path, token, args.concurrency, args.duration)
+        with multiprocessing.get_context("spawn").Pool(client_processes) as pool:
+            pool.starmap(_client_process, [(base_url, args.path, token, args.concurrency, args.warmup)] * client_processes)
+            results = pool.starmap(_client_process, [job] * client_processes)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    latencies = np.array([value for result in results for value in result]) * 1000
+    return {
+        "workers": workers,
+        "client_processes": client_processes,
+        "requests": int(len(latencies)),
+        "throughput_rps": round(len(latencies) / args.duration, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--database-url", default=f"sqlite:///{Path(tempfile.gettempdir()) / 'mini_lms_scaling.db'}")
+    parser.add_argument("--path", default="/api/classes", help="Endpoint to request (as staff)")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=16, help="Connections per client process")
+    parser.add_argument("--client-processes", type=int, help="Client processes (default: 2 per worker)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", secrets.token_hex(32)),
+        "ENVIRONMENT": "production",
+        "SCHEDULER_ENABLED": "false",
+    }
+    os.environ.update(env)
+
+    from app.core.database import engine
+    from app.core.schema import reset_schema
+    from app.seed_data import seed_database
+
+    reset_schema(engine)
+    seed_database()
+    engine.dispose()
+
+    runs = []
+    for workers in args.workers:
+        run = measure(workers, args, env)
+        runs.append(run)
+        print(f"{workers:>3} workers: {run['throughput_rps']:>9.1f} req/s  "
+              f"p50 {run['p50_ms']:.1f} ms  p99 {run['p99_ms']:.1f} ms")
+
+    base = runs[0]["throughput_rps"] / runs[0]["workers"]
+    for run in runs:
+        run["speedup"] = round(run["throughput_rps"] / runs[0]["throughput_rps"], 2)
+        run["efficiency"] = round(run["throughput_rps"] / (base * run["workers"]), 2)
+
+    result = {
+        "benchmark": "server_scaling",
+        "git_revision": git_revision(),
+        "cpus": os.cpu_count(),
+        "path": args.path,
+        "duration_seconds": args.duration,
+        "runs": runs,
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
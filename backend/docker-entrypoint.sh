@@ -1,8 +1,9 @@
 #!/bin/bash
 # Docker Entrypoint Script
 # =========================
-# Runs migrations and seeds database before starting the application.
-# This ensures the database is always up-to-date and has test data.
+# Outside production, runs migrations and seeds the database before
+# starting the application so it is always up-to-date and has test data.
+# In production, migrations run once per deploy via `python -m app.migrate`.
 
 set -e  # Exit on error
 
@@ -17,16 +18,23 @@ done
 echo "✓ Database is ready"
 echo ""
 
-# Run database migrations (always run migrations)
-echo "📦 Running database migrations..."
-alembic upgrade head
-echo "✓ Migrations complete"
-echo ""
+if [ "$ENVIRONMENT" = "production" ]; then
+  # Schema changes are a one-shot deploy step, not part of every worker boot:
+  #   docker compose run --rm backend python -m app.migrate
+  # Workers only verify the schema revision at startup.
+  echo "⏭  Production mode - skipping migrations and seeding"
+  echo ""
+else
+  # Run database migrations
+  echo "📦 Running database migrations..."
+  python -m app.migrate
+  echo ""
 
-# Seed database with test data (idempotent - checks if data exists)
-echo "🌱 Seeding database..."
-python -m app.seed_data
-echo ""
+  # Seed database with test data (idempotent - checks if data exists)
+  echo "🌱 Seeding database..."
+  python -m app.seed_data
+  echo ""
+fi
 
 # Start the application
 echo "🎯 Starting FastAPI application..."
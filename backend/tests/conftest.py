@@ -0,0 +1,120 @@
+"""
+Shared test fixtures.
+
+Tests run against a throwaway SQLite database whose schema is recreated
+for every test, with background jobs disabled. The environment is set
+before the application is imported, as settings are read at import time.
+"""
+
+import os
+import tempfile
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+_DB_DIR = tempfile.mkdtemp(prefix="mini-lms-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["SECRET_KEY"] = "test-secret-key"
+os.environ["ENVIRONMENT"] = "development"
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import login_throttle, revocation
+from app.core.database import SessionLocal, engine
+from app.core.schema import reset_schema
+from app.core.security import create_access_token, get_password_hash
+from app.models.class_model import ClassModel
+from app.models.class_registration import ClassRegistration
+from app.models.parent import Parent
+from app.models.student import Student
+from app.models.subscription import Subscription
+from app.models.user import User, UserRole
+
+PASSWORD = "password123"
+_password_hash: str | None = None
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    """Recreate the schema and forget per-process state kept by the previous test."""
+    reset_schema(engine)
+    # Pooled SQLite connections can keep describing the dropped tables
+    engine.dispose()
+    revocation.revocation_list.__init__()
+    login_throttle.login_throttle.__init__()
+    from app.services import calendar_service, report_service
+    calendar_service._cache.clear()
+    report_service._cache.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def make_user(db, role: UserRole, name: str, email: str) -> User:
+    """Create a user whose password is PASSWORD (hashed once per test run)."""
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = get_password_hash(PASSWORD)
+    user = User(name=name, email=email, password_hash=_password_hash, role=role)
+    db.add(user)
+    db.flush()
+    return user
+
+
+def auth_headers(user: User) -> dict[str, str]:
+    token = create_access_token(data={"sub": str(user.id), "role": user.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def family(db):
+    """
+    A staff member, a parent with one child, and an unrelated student.
+
+    The child is registered for a Monday class and holds an active
+    10-session subscription; the unrelated student has no parent.
+    """
+    staff = make_user(db, UserRole.STAFF, "Staff", "staff@example.com")
+    parent_user = make_user(db, UserRole.PARENT, "Pat Parent", "pat@example.com")
+    parent = Parent(user_id=parent_user.id)
+    db.add(parent)
+    db.flush()
+
+    child_user = make_user(db, UserRole.STUDENT, "Charlie Child", "charlie@example.com")
+    child = Student(user_id=child_user.id, parent_id=parent.id)
+    other_user = make_user(db, UserRole.STUDENT, "Olga Other", "olga@example.com")
+    other = Student(user_id=other_user.id)
+    course = ClassModel(
+        name="Algebra", subject="Mathematics", day_of_week="Monday",
+        time_slot="09:00-10:30", teacher_name="Dr. Peterson", max_students=10,
+    )
+    db.add_all([child, other, course])
+    db.flush()
+
+    db.add(ClassRegistration(student_id=child.id, class_id=course.id))
+    subscription = Subscription(
+        student_id=child.id, package_name="Monthly", total_sessions=10, used_sessions=0,
+        start_date=date.today() - timedelta(days=30), end_date=date.today() + timedelta(days=60),
+        is_active=True,
+    )
+    db.add(subscription)
+    db.commit()
+
+    return SimpleNamespace(
+        staff=staff, parent=parent, parent_user=parent_user, child=child, child_user=child_user,
+        other=other, other_user=other_user, course=course, subscription=subscription,
+        staff_headers=auth_headers(staff), parent_headers=auth_headers(parent_user),
+        child_headers=auth_headers(child_user), other_headers=auth_headers(other_user),
+    )
@@ -0,0 +1,72 @@
+"""Tests for moving long-ended subscriptions to the archive."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.session_usage import SessionUsage
+from app.models.session_usage_archive import ArchivedSessionUsage
+from app.models.subscription import Subscription
+from app.models.subscription_archive import ArchivedSubscription
+from app.services.archive_service import archive_ended_subscriptions
+
+
+@pytest.fixture
+def ended(db, family, monkeypatch):
+    """Two packages of the family's child that ended two years ago, and one that ended last month."""
+    monkeypatch.setattr(settings, "SUBSCRIPTION_ARCHIVE_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "SUBSCRIPTION_ARCHIVE_BATCH_PAUSE_SECONDS", 0)
+    long_ago = date.today() - timedelta(days=730)
+    subscriptions = [
+        Subscription(
+            student_id=family.child.id, package_name=name, total_sessions=8, used_sessions=8,
+            start_date=end_date - timedelta(days=60), end_date=end_date, is_active=False,
+        )
+        for name, end_date in (("Old A", long_ago), ("Old B", long_ago), ("Recent", date.today() - timedelta(days=30)))
+    ]
+    db.add_all(subscriptions)
+    db.flush()
+    db.add_all(SessionUsage(subscription_id=subscription.id, sessions=8) for subscription in subscriptions)
+    db.commit()
+    return subscriptions
+
+
+def _count(db, column, value) -> int:
+    return db.execute(select(func.count()).where(column == value)).scalar_one()
+
+
+def test_only_long_ended_inactive_subscriptions_are_archived(db, family, ended):
+    old_a, old_b, recent = (subscription.id for subscription in ended)
+    current = family.subscription.id
+
+    assert archive_ended_subscriptions(db) == 2
+
+    remaining = set(db.execute(select(Subscription.id)).scalars())
+    assert remaining == {current, recent}
+    archived = db.execute(select(ArchivedSubscription).order_by(ArchivedSubscription.id)).scalars().all()
+    assert [(row.id, row.package_name, row.used_sessions) for row in archived] == [
+        (old_a, "Old A", 8), (old_b, "Old B", 8),
+    ]
+    # The ledger moves with its subscription
+    assert _count(db, SessionUsage.subscription_id, old_a) == 0
+    assert _count(db, ArchivedSessionUsage.subscription_id, old_a) == 1
+    assert _count(db, SessionUsage.subscription_id, recent) == 1
+
+    assert archive_ended_subscriptions(db) == 0
+
+
+def test_archived_subscriptions_are_listed_on_request(client, db, family, ended):
+    archive_ended_subscriptions(db)
+    path = f"/api/students/{family.child.id}/subscriptions"
+
+    current = client.get(path, headers=family.parent_headers).json()
+    everything = client.get(path, params={"include_archived": True}, headers=family.parent_headers).json()
+
+    assert {row["package_name"] for row in current} == {"Monthly", "Recent"}
+    assert [row["package_name"] for row in everything] == ["Monthly", "Recent", "Old A", "Old B"]
+    assert [row["archived_at"] is not None for row in everything] == [False, False, True, True]
+    own = client.get("/api/students/me/subscriptions", params={"include_archived": True},
+                     headers=family.child_headers).json()
+    assert len(own) == 4
@@ -0,0 +1,42 @@
+"""Tests for who may read a student or a parent."""
+
+import pytest
+
+
+def _student_paths(student_id: int) -> list[str]:
+    return [
+        f"/api/students/{student_id}",
+        f"/api/students/{student_id}/classes",
+        f"/api/students/{student_id}/subscriptions",
+    ]
+
+
+@pytest.mark.parametrize("caller", ["staff_headers", "parent_headers", "child_headers"])
+def test_staff_parent_and_the_student_may_read_a_student(client, family, caller):
+    for path in _student_paths(family.child.id):
+        assert client.get(path, headers=getattr(family, caller)).status_code == 200, path
+
+
+@pytest.mark.parametrize("caller", ["parent_headers", "child_headers"])
+def test_other_families_students_are_forbidden(client, family, caller):
+    for path in _student_paths(family.other.id):
+        assert client.get(path, headers=getattr(family, caller)).status_code == 403, path
+
+
+@pytest.mark.parametrize("caller", ["staff_headers", "parent_headers", "child_headers"])
+def test_missing_student_is_not_found(client, family, caller):
+    for path in _student_paths(999_999):
+        assert client.get(path, headers=getattr(family, caller)).status_code == 404, path
+
+
+def test_parent_record_is_readable_by_staff_and_the_parent_only(client, family):
+    path = f"/api/parents/{family.parent.id}"
+
+    assert client.get(path, headers=family.staff_headers).status_code == 200
+    assert client.get(path, headers=family.parent_headers).status_code == 200
+    assert client.get(path, headers=family.child_headers).status_code == 403
+    assert client.get("/api/parents/999999", headers=family.parent_headers).status_code == 404
+
+
+def test_unauthenticated_requests_are_rejected(client, family):
+    assert client.get(f"/api/students/{family.child.id}").status_code == 401
@@ -0,0 +1,186 @@
+"""Tests for deleting students, parents and classes in bulk."""
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import event, func, select
+
+from app.core import revocation
+from app.core.database import engine
+from app.core.security import decode_access_token
+from app.models.class_model import ClassModel
+from app.models.class_registration import ClassRegistration
+from app.models.parent import Parent
+from app.models.refresh_token import RefreshToken
+from app.models.session_usage import SessionUsage
+from app.models.student import Student
+from app.models.subscription import Subscription
+from app.models.token_revocation import TokenRevocation
+from app.models.user import User, UserRole
+from app.services import class_service, parent_service, student_service
+from tests.conftest import PASSWORD, make_user
+
+
+def _count(db, model, *criteria) -> int:
+    return db.scalar(select(func.count()).select_from(model).where(*criteria))
+
+
+@contextmanager
+def _statements():
+    """Collect the SQL statements executed inside the block."""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _add_students(db, course, count: int) -> list[int]:
+    """Students registered for the course, each with a subscription and one used session."""
+    ids = []
+    for n in range(count):
+        user = make_user(db, UserRole.STUDENT, f"Student {n}", f"student{n}@example.com")
+        student = Student(user_id=user.id)
+        db.add(student)
+        db.flush()
+        subscription = Subscription(
+            student_id=student.id, package_name="Monthly", total_sessions=10, used_sessions=1,
+            start_date=date.today(), end_date=date.today() + timedelta(days=30), is_active=True,
+        )
+        db.add_all([subscription, ClassRegistration(student_id=student.id, class_id=course.id)])
+        db.flush()
+        db.add(SessionUsage(subscription_id=subscription.id, class_id=course.id))
+        ids.append(student.id)
+    db.commit()
+    return ids
+
+
+def test_deleting_students_removes_their_accounts_and_records(client, db, family):
+    db.add(SessionUsage(subscription_id=family.subscription.id, class_id=family.course.id))
+    db.commit()
+    child_id, child_user_id, subscription_id = family.child.id, family.child_user.id, family.subscription.id
+
+    response = client.post("/api/students/bulk-delete", json={"ids": [child_id, 99999]},
+                           headers=family.staff_headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"deleted": 1}
+    db.expire_all()
+    assert db.get(User, child_user_id) is None
+    assert db.get(Student, child_id) is None
+    assert _count(db, ClassRegistration, ClassRegistration.student_id == child_id) == 0
+    assert _count(db, Subscription, Subscription.student_id == child_id) == 0
+    assert _count(db, SessionUsage, SessionUsage.subscription_id == subscription_id) == 0
+    # Everyone else is untouched
+    assert db.get(Student, family.other.id) is not None
+    assert db.get(ClassModel, family.course.id) is not None
+
+
+def test_deleting_parents_keeps_their_children_without_a_parent(client, db, family):
+    parent_id, parent_user_id = family.parent.id, family.parent_user.id
+
+    response = client.post("/api/parents/bulk-delete", json={"ids": [parent_id]}, headers=family.staff_headers)
+
+    assert response.json() == {"deleted": 1}
+    db.expire_all()
+    assert db.get(User, parent_user_id) is None
+    child = db.get(Student, family.child.id)
+    assert child is not None and child.parent_id is None
+    assert _count(db, Subscription, Subscription.student_id == child.id) == 1
+
+
+def test_deleting_classes_removes_registrations_and_keeps_usage(client, db, family):
+    db.add(SessionUsage(subscription_id=family.subscription.id, class_id=family.course.id))
+    db.commit()
+    course_id = family.course.id
+
+    response = client.post("/api/classes/bulk-delete", json={"ids": [course_id, 99999]},
+                           headers=family.staff_headers)
+
+    assert response.json() == {"deleted": 1}
+    db.expire_all()
+    assert db.get(ClassModel, course_id) is None
+    assert _count(db, ClassRegistration, ClassRegistration.class_id == course_id) == 0
+    usage = db.scalars(select(SessionUsage).where(SessionUsage.subscription_id == family.subscription.id)).one()
+    assert usage.class_id is None
+
+
+def test_unknown_ids_are_skipped(client, family):
+    for resource in ("students", "parents", "classes"):
+        response = client.post(f"/api/{resource}/bulk-delete", json={"ids": [99998, 99999]},
+                               headers=family.staff_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"deleted": 0}
+
+
+def test_bulk_delete_requires_staff(client, family):
+    for resource in ("students", "parents", "classes"):
+        response = client.post(f"/api/{resource}/bulk-delete", json={"ids": [family.other.id]},
+                               headers=family.parent_headers)
+
+        assert response.status_code == 403
+
+
+def test_tokens_of_deleted_users_are_revoked(client, db, family):
+    login = client.post("/api/auth/login", json={"email": "charlie@example.com", "password": PASSWORD}).json()
+    token = family.child_headers["Authorization"].removeprefix("Bearer ")
+    child_user_id, parent_user_id = family.child_user.id, family.parent_user.id
+
+    student_service.delete_students(db, [family.child.id])
+    parent_service.delete_parents(db, [family.parent.id])
+
+    revoked = set(db.scalars(select(TokenRevocation.user_id)))
+    assert revoked == {child_user_id, parent_user_id}
+    assert revocation.revocation_list.is_revoked(decode_access_token(token))
+    assert _count(db, RefreshToken, RefreshToken.user_id == child_user_id) == 0
+    assert client.post("/api/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
+
+
+def test_students_are_deleted_in_a_constant_number_of_statements(db, family):
+    few = _add_students(db, family.course, 1)
+    with _statements() as executed:
+        assert student_service.delete_students(db, few) == 1
+    statements_for_one = len(executed)
+
+    many = _add_students(db, family.course, 5)
+    with _statements() as executed:
+        assert student_service.delete_students(db, many) == 5
+
+    assert len(executed) == statements_for_one
+
+
+def test_parents_and_classes_are_deleted_in_a_constant_number_of_statements(db, family):
+    def add_parents(count: int) -> list[int]:
+        parents = [
+            Parent(user_id=make_user(db, UserRole.PARENT, f"Parent {n}", f"parent{n}-{count}@example.com").id)
+            for n in range(count)
+        ]
+        db.add_all(parents)
+        db.commit()
+        return [parent.id for parent in parents]
+
+    def add_classes(count: int) -> list[int]:
+        classes = [
+            ClassModel(name=f"Class {n}", subject="Art", day_of_week="Friday", time_slot="12:00-13:00",
+                       teacher_name="Ms. Lee", max_students=5)
+            for n in range(count)
+        ]
+        db.add_all(classes)
+        db.commit()
+        return [course.id for course in classes]
+
+    counts = []
+    for size in (1, 4):
+        parent_ids, class_ids = add_parents(size), add_classes(size)
+        with _statements() as executed:
+            assert parent_service.delete_parents(db, parent_ids) == size
+            assert class_service.delete_classes(db, class_ids) == size
+        counts.append(len(executed))
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,60 @@
+"""Tests for iCalendar feeds, their ETags and cache invalidation."""
+
+from app.models.class_model import ClassModel
+
+
+def _create_feed(client, family, kind: str = "students", owner_id: int | None = None, headers=None):
+    owner_id = owner_id or (family.child.id if kind == "students" else family.parent.id)
+    return client.post(f"/api/calendar/{kind}/{owner_id}/feed", headers=headers or family.parent_headers)
+
+
+def test_unchanged_feed_is_revalidated_with_304(client, family):
+    url = _create_feed(client, family).json()["url"]
+
+    first = client.get(url)
+
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("text/calendar")
+    assert "SUMMARY:Algebra" in first.text
+    etag = first.headers["ETag"]
+
+    revalidated = client.get(url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert client.get(url, headers={"If-None-Match": '"stale", ' + etag}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_registration_changes_the_feed_and_its_etag(client, db, family):
+    student_url = _create_feed(client, family).json()["url"]
+    parent_url = _create_feed(client, family, "parents").json()["url"]
+    etags = {url: client.get(url).headers["ETag"] for url in (student_url, parent_url)}
+    geometry = ClassModel(name="Geometry", subject="Mathematics", day_of_week="Wednesday",
+                          time_slot="14:00-15:30", teacher_name="Dr. Peterson", max_students=10)
+    db.add(geometry)
+    db.commit()
+
+    response = client.post(f"/api/classes/{geometry.id}/register", json={"student_id": family.child.id},
+                           headers=family.staff_headers)
+    assert response.status_code == 201
+
+    for url, etag in etags.items():
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200, url
+        assert changed.headers["ETag"] != etag
+        assert "Geometry" in changed.text
+
+
+def test_new_feed_url_replaces_the_old_one(client, family):
+    old_url = _create_feed(client, family).json()["url"]
+    new_url = _create_feed(client, family).json()["url"]
+
+    assert client.get(old_url).status_code == 404
+    assert client.get(new_url).status_code == 200
+    assert client.get("/api/calendar/students/not-a-token.ics").status_code == 404
+
+
+def test_feeds_can_only_be_created_for_readable_records(client, family):
+    assert _create_feed(client, family, owner_id=family.other.id).status_code == 403
+    assert _create_feed(client, family, "parents", headers=family.child_headers).status_code == 403
@@ -0,0 +1,147 @@
+"""Tests for per-route-class concurrency limits and load shedding."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core import concurrency
+from app.core.concurrency import ConcurrencyLimitMiddleware, Limiter, Rejected
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def _limits(monkeypatch):
+    monkeypatch.setattr(settings, "CONCURRENCY_QUEUE_SIZE", 1)
+    monkeypatch.setattr(settings, "CONCURRENCY_QUEUE_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "CONCURRENCY_LATENCY_TARGET_SECONDS", 0.5)
+    monkeypatch.setattr(settings, "CONCURRENCY_MIN_LIMIT", 2)
+    monkeypatch.setattr(settings, "CONCURRENCY_ADAPTIVE", True)
+
+
+def test_waiter_gets_the_slot_released_before_its_deadline():
+    async def scenario():
+        limiter = Limiter("test", 1)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert len(limiter.waiters) == 1
+
+        limiter.release(None)
+        await waiting
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    assert not limiter.waiters
+
+
+def test_queue_full_and_queue_timeout_are_rejected():
+    async def scenario():
+        limiter = Limiter("test", 1)
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(Rejected, match="queue_full"):
+            await limiter.acquire()
+        with pytest.raises(Rejected, match="queue_timeout"):
+            await waiting
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    assert not limiter.waiters
+
+
+def test_slot_handed_over_as_the_deadline_fires_is_kept(monkeypatch):
+    limiter = Limiter("test", 1)
+
+    async def deadline_after_handover(waiter, timeout):
+        # release() and the wait_for timeout run in the same loop iteration
+        limiter.release(None)
+        raise TimeoutError
+
+    async def scenario():
+        await limiter.acquire()
+        monkeypatch.setattr(concurrency.asyncio, "wait_for", deadline_after_handover)
+        await limiter.acquire()
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    limiter.release(None)
+    assert limiter.in_flight == 0
+
+
+def test_fast_requests_raise_a_saturated_limit():
+    limiter = Limiter("test", 10)
+    limiter.limit, limiter.in_flight = 5.0, 5
+
+    limiter.release(0.01)
+    assert limiter.limit == pytest.approx(5.2)
+
+    # Below the limit there is no evidence more concurrency helps
+    limiter.release(0.01)
+    assert limiter.limit == pytest.approx(5.2)
+
+    limiter.limit, limiter.in_flight = 9.95, 9
+    limiter.release(0.01)
+    assert limiter.limit == 10
+
+
+def test_slow_requests_lower_the_limit_once_per_interval():
+    limiter = Limiter("test", 10)
+    limiter.in_flight = 3
+
+    limiter.release(2.0)
+    assert limiter.limit == pytest.approx(9.0)
+    limiter.release(2.0)
+    assert limiter.limit == pytest.approx(9.0)
+
+    limiter.limit, limiter.last_decrease = 2.1, 0.0
+    limiter.release(2.0)
+    assert limiter.limit == 2
+
+
+async def _call(middleware, path: str, method: str = "POST") -> dict:
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+        else:
+            response["body"] = message.get("body", b"")
+
+    await middleware({"type": "http", "path": path, "method": method}, receive, send)
+    return response
+
+
+def test_middleware_sheds_with_503_and_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "CONCURRENCY_LIMIT_WRITES", 1)
+    monkeypatch.setattr(settings, "CONCURRENCY_QUEUE_TIMEOUT_SECONDS", 1.5)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = ConcurrencyLimitMiddleware(app)
+        running = asyncio.create_task(_call(middleware, "/api/classes"))
+        queued = asyncio.create_task(_call(middleware, "/api/students"))
+        await asyncio.sleep(0)
+        shed = await _call(middleware, "/api/subscriptions")
+        release.set()
+        return shed, await running, await queued
+
+    shed, running, queued = asyncio.run(scenario())
+    assert shed["status"] == 503
+    assert shed["headers"][b"retry-after"] == b"2"
+    assert json.loads(shed["body"])["detail"] == "Server is overloaded, please retry later"
+    assert running["status"] == queued["status"] == 201
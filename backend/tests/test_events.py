@@ -0,0 +1,116 @@
+"""Tests for class roster events and their Server-Sent Events stream."""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.events import (
+    CLASS_DELETED,
+    CLASS_UPDATED,
+    REGISTRATION_ADDED,
+    REGISTRATION_REMOVED,
+    RESYNC,
+    broker,
+    publish_class_changes,
+)
+from app.models.subscription import Subscription
+from app.routers.events import _stream
+
+
+@pytest.fixture
+def delivered():
+    """Events dispatched to this process during the test."""
+    received = []
+    broker.add_listener(received.append)
+    yield received
+    broker._listeners.remove(received.append)
+
+
+def test_events_are_delivered_after_commit_only(db, family, delivered):
+    publish_class_changes(db, [family.course.id], CLASS_UPDATED)
+    db.rollback()
+    assert delivered == []
+
+    publish_class_changes(db, [family.course.id], CLASS_UPDATED)
+    assert delivered == []
+    db.commit()
+
+    assert delivered == [
+        {"class_id": family.course.id, "change": CLASS_UPDATED, "registered": 1, "max_students": 10},
+    ]
+
+
+def test_roster_changes_carry_seat_counts(client, db, family, delivered):
+    db.add(Subscription(
+        student_id=family.other.id, package_name="Monthly", total_sessions=10, used_sessions=0,
+        start_date=date.today(), end_date=date.today() + timedelta(days=30), is_active=True,
+    ))
+    db.commit()
+    course = f"/api/classes/{family.course.id}"
+    headers = family.staff_headers
+
+    assert client.post(f"{course}/register", json={"student_id": family.other.id}, headers=headers).status_code == 201
+    assert client.delete(f"{course}/registrations/{family.other.id}", headers=headers).status_code == 204
+    assert client.patch(course, json={"max_students": 12}, headers=headers).status_code == 200
+    assert client.delete(course, headers=headers).status_code == 204
+
+    class_id = family.course.id
+    assert delivered == [
+        {"class_id": class_id, "change": REGISTRATION_ADDED, "registered": 2, "max_students": 10,
+         "student_id": family.other.id},
+        {"class_id": class_id, "change": REGISTRATION_REMOVED, "registered": 1, "max_students": 10,
+         "student_id": family.other.id},
+        {"class_id": class_id, "change": CLASS_UPDATED, "registered": 1, "max_students": 12},
+        {"class_id": class_id, "change": CLASS_DELETED, "registered": 0},
+    ]
+
+
+def test_slow_consumer_backlog_collapses_into_one_resync(monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_QUEUE_SIZE", 3)
+
+    async def scenario():
+        subscriber = broker.subscribe()
+        try:
+            for class_id in range(1, 6):
+                broker.dispatch({"class_id": class_id, "change": CLASS_UPDATED, "registered": 0})
+            await asyncio.sleep(0)
+            queued = []
+            while not subscriber.queue.empty():
+                queued.append(subscriber.queue.get_nowait())
+            return queued
+        finally:
+            broker.unsubscribe(subscriber)
+
+    queued = asyncio.run(scenario())
+    # Events 1-3 filled the queue; event 4 replaced them with a resync
+    assert queued == [RESYNC, {"class_id": 5, "change": CLASS_UPDATED, "registered": 0}]
+
+
+def test_stream_sends_events_in_sse_format_until_closed():
+    async def scenario():
+        subscriber = broker.subscribe()
+        subscriber.offer({"class_id": 3, "change": REGISTRATION_ADDED, "registered": 1})
+        subscriber.offer(RESYNC)
+        subscriber.offer(None)
+        chunks = [chunk async for chunk in _stream(subscriber)]
+        return chunks, len(broker)
+
+    chunks, open_streams = asyncio.run(scenario())
+    assert chunks == [
+        "retry: 3000\n\n",
+        'event: class\ndata: {"class_id":3,"change":"registration_added","registered":1}\n\n',
+        'event: resync\ndata: {"change":"resync"}\n\n',
+    ]
+    assert open_streams == 0
+
+
+def test_stream_is_refused_once_the_subscriber_cap_is_reached(client, family, monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_MAX_SUBSCRIBERS", 0)
+
+    response = client.get("/api/events/classes", headers=family.staff_headers)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert client.get("/api/events/classes", headers=family.parent_headers).status_code == 403
@@ -0,0 +1,108 @@
+"""Tests for the subscription exhaustion forecast and its endpoint."""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.models.subscription import Subscription
+from app.utils.forecasting import forecast_exhaustion
+
+
+def test_forecast_rows_are_paged(client, db, family):
+    db.add_all([
+        Subscription(
+            student_id=family.other.id, package_name=f"Package {n}", total_sessions=10, used_sessions=n,
+            start_date=date.today() - timedelta(days=10), end_date=date.today() + timedelta(days=90),
+            is_active=True,
+        )
+        for n in range(4)
+    ])
+    db.commit()
+
+    response = client.get(
+        "/api/reports/subscription-forecast",
+        params={"at_risk_only": "false", "limit": 2, "offset": 1},
+        headers=family.staff_headers,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["active_subscriptions"] == 5
+    assert body["matching_rows"] == 5
+    assert body["offset"] == 1
+    assert [row["subscription_id"] for row in body["rows"]] == [2, 3]
+
+
+def test_forecast_limit_is_bounded(client, family):
+    response = client.get(
+        "/api/reports/subscription-forecast", params={"limit": 5000}, headers=family.staff_headers
+    )
+
+    assert response.status_code == 422
+
+
+def _kernel(start, end, total, used, weekly, horizon_days=14, today=800_000):
+    forecast = forecast_exhaustion(
+        np.array([today + start]), np.array([today + end]), np.array([total]), np.array([used]),
+        np.array([weekly], dtype=np.float64), today, horizon_days,
+    )
+    day = int(forecast["exhaustion_day"][0])
+    return float(forecast["weekly_rate"][0]), (day - today if day >= 0 else None), bool(forecast["at_risk"][0])
+
+
+def test_observed_usage_sets_the_burn_rate():
+    # 8 sessions in 4 weeks, 2 left: gone in a week
+    assert _kernel(start=-28, end=60, total=10, used=8, weekly=1) == (2.0, 7, True)
+
+
+def test_class_schedule_sets_the_burn_rate_of_new_packages():
+    # Less than a week of history: the 3 weekly classes decide, 9 sessions last 3 weeks
+    assert _kernel(start=-3, end=60, total=10, used=1, weekly=3) == (3.0, 21, False)
+    assert _kernel(start=-3, end=60, total=10, used=1, weekly=3, horizon_days=21) == (3.0, 21, True)
+
+
+def test_unused_package_without_classes_never_runs_out():
+    assert _kernel(start=-28, end=60, total=10, used=0, weekly=0) == (0.0, None, False)
+
+
+def test_exhausted_package_runs_out_today():
+    assert _kernel(start=-28, end=60, total=8, used=8, weekly=1) == (2.0, 0, True)
+    assert _kernel(start=-28, end=60, total=8, used=10, weekly=1)[1:] == (0, True)
+
+
+def test_package_expiring_before_its_sessions_run_out_is_not_at_risk():
+    assert _kernel(start=-28, end=5, total=10, used=8, weekly=1) == (2.0, 7, False)
+
+
+def test_forecast_projects_from_the_usage_ledger(client, db, family):
+    today = date.today()
+    heavy = Subscription(
+        student_id=family.other.id, package_name="Heavy", total_sessions=10, used_sessions=0,
+        start_date=today - timedelta(days=28), end_date=today + timedelta(days=60), is_active=True,
+    )
+    idle = Subscription(
+        student_id=family.other.id, package_name="Idle", total_sessions=10, used_sessions=0,
+        start_date=today - timedelta(days=3), end_date=today + timedelta(days=60), is_active=True,
+    )
+    db.add_all([heavy, idle])
+    db.commit()
+    for _ in range(9):
+        assert client.patch(f"/api/subscriptions/{heavy.id}/use", headers=family.staff_headers).status_code == 200
+
+    at_risk = client.get("/api/reports/subscription-forecast", headers=family.staff_headers).json()
+    everything = client.get(
+        "/api/reports/subscription-forecast", params={"at_risk_only": "false"}, headers=family.staff_headers
+    ).json()
+
+    # 9 sessions in 4 weeks, 1 left: 7 / 2.25 = 3.1 days, rounded up
+    assert at_risk["at_risk_subscriptions"] == 1
+    assert at_risk["rows"] == [{
+        "subscription_id": heavy.id, "student_id": family.other.id, "remaining_sessions": 1,
+        "weekly_rate": 2.25, "projected_exhaustion_date": str(today + timedelta(days=4)), "at_risk": True,
+    }]
+    rows = {row["subscription_id"]: row for row in everything["rows"]}
+    # One weekly class, 10 sessions left: 70 days, after the package ends
+    assert rows[family.subscription.id]["projected_exhaustion_date"] == str(today + timedelta(days=70))
+    assert rows[family.subscription.id]["at_risk"] is False
+    assert rows[idle.id]["projected_exhaustion_date"] is None
+    assert rows[idle.id]["weekly_rate"] == 0
@@ -0,0 +1,70 @@
+"""Tests for Idempotency-Key replays on unsafe requests."""
+
+from sqlalchemy import func, select
+
+from app.models.session_usage import SessionUsage
+from app.models.user import UserRole
+from tests.conftest import auth_headers, make_user
+
+
+def _use(client, family, key: str, subscription_id: int | None = None, headers=None):
+    return client.patch(
+        f"/api/subscriptions/{subscription_id or family.subscription.id}/use",
+        headers={**(headers or family.staff_headers), "Idempotency-Key": key},
+    )
+
+
+def _ledger_rows(db, family) -> int:
+    return db.execute(
+        select(func.count()).where(SessionUsage.subscription_id == family.subscription.id)
+    ).scalar_one()
+
+
+def test_retry_with_the_same_key_replays_without_using_another_session(client, db, family):
+    first = _use(client, family, "use-1")
+    retry = _use(client, family, "use-1")
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.json()["used_sessions"] == 1
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert _ledger_rows(db, family) == 1
+
+
+def test_key_reused_for_a_different_request_is_rejected(client, db, family):
+    assert _use(client, family, "use-1").status_code == 200
+
+    response = client.patch(
+        f"/api/subscriptions/{family.subscription.id}/use",
+        params={"class_id": family.course.id},
+        headers={**family.staff_headers, "Idempotency-Key": "use-1"},
+    )
+
+    assert response.status_code == 422
+    assert _ledger_rows(db, family) == 1
+
+
+def test_keys_are_scoped_to_the_user(client, db, family):
+    other_staff = make_user(db, UserRole.STAFF, "Second Staff", "staff2@example.com")
+    db.commit()
+
+    assert _use(client, family, "use-1").status_code == 200
+    response = _use(client, family, "use-1", headers=auth_headers(other_staff))
+
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+    assert _ledger_rows(db, family) == 2
+
+
+def test_failed_request_releases_the_key(client, db, family):
+    family.subscription.used_sessions = family.subscription.total_sessions
+    db.commit()
+    assert _use(client, family, "use-1").status_code == 400
+
+    family.subscription.total_sessions += 1
+    db.commit()
+    response = _use(client, family, "use-1")
+
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
@@ -0,0 +1,76 @@
+"""Tests for the Prometheus metrics and the /metrics exposition."""
+
+import pytest
+
+from app.core import metrics
+
+
+def _scrape(client) -> list[str]:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return response.text.splitlines()
+
+
+def test_metric_subclasses_must_implement_children_and_samples():
+    class Incomplete(metrics.Metric):
+        type_name = "counter"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete_total", "Missing _new_child and samples", registry=None)
+
+
+def test_label_values_are_escaped():
+    registry = metrics.Registry()
+    counter = metrics.Counter("escaped_total", "Escaping", ["value"], registry=registry)
+    counter.labels('say "hi"\\\nbye').inc()
+
+    assert registry.render().splitlines() == [
+        "# HELP escaped_total Escaping",
+        "# TYPE escaped_total counter",
+        'escaped_total{value="say \\"hi\\"\\\\\\nbye"} 1',
+    ]
+
+
+def test_histograms_expose_cumulative_buckets_sum_and_count():
+    registry = metrics.Registry()
+    histogram = metrics.Histogram("latency_seconds", "Latency", ["route"], registry=registry, buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.labels("/x").observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 1',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 4.05',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_requests_are_labelled_with_the_route_template(client, family):
+    student_id = family.child.id
+    response = client.get(f"/api/students/{student_id}", headers=family.staff_headers)
+    assert response.status_code == 200
+
+    lines = _scrape(client)
+
+    route = 'route="/api/students/{student_id}"'
+    assert "# TYPE http_requests_total counter" in lines
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert any(
+        line.startswith(f'http_requests_total{{method="GET",{route},status="200"}} ') for line in lines
+    )
+    assert f'http_request_duration_seconds_bucket{{method="GET",{route},le="+Inf"}}' in " ".join(lines)
+    assert any(line.startswith(f'http_request_duration_seconds_sum{{method="GET",{route}}} ') for line in lines)
+    assert any(line.startswith(f'http_request_duration_seconds_count{{method="GET",{route}}} ') for line in lines)
+    assert not any(f"/api/students/{student_id}\"" in line for line in lines)
+
+
+def test_unmatched_paths_share_one_label(client):
+    client.get("/no/such/path/123")
+    client.get("/no/such/path/456")
+
+    lines = _scrape(client)
+
+    assert any(line.startswith('http_requests_total{method="GET",route="unmatched",status="404"} ') for line in lines)
+    assert not any("/no/such/path" in line for line in lines)
@@ -0,0 +1,115 @@
+"""Tests for the notification outbox: coalescing, retries and purging."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.models.outbox_message import OUTBOX_PENDING, OUTBOX_SENT, OutboxMessage
+from app.models.student import Student
+from app.models.subscription import Subscription
+from app.models.user import UserRole
+from app.services import notification_service
+from tests.conftest import make_user
+
+
+class RecordingSink:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+
+    def send(self, notification):
+        if self.fail:
+            raise ConnectionError("SMTP server unavailable")
+        self.sent.append(notification)
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    sink = RecordingSink()
+    monkeypatch.setattr(notification_service, "create_sink", lambda: sink)
+    return sink
+
+
+@pytest.fixture
+def ending_soon(db, family):
+    """The family's subscription and a second child's, both ending in three days."""
+    sibling_user = make_user(db, UserRole.STUDENT, "Sam Sibling", "sam@example.com")
+    sibling = Student(user_id=sibling_user.id, parent_id=family.parent.id)
+    db.add(sibling)
+    db.flush()
+    end_date = date.today() + timedelta(days=3)
+    sibling_subscription = Subscription(
+        student_id=sibling.id, package_name="Weekly", total_sessions=4, used_sessions=0,
+        start_date=date.today() - timedelta(days=25), end_date=end_date, is_active=True,
+    )
+    db.add(sibling_subscription)
+    family.subscription.end_date = end_date
+    db.commit()
+    return [family.subscription, sibling_subscription]
+
+
+def _messages(db) -> list[OutboxMessage]:
+    return list(db.execute(select(OutboxMessage).order_by(OutboxMessage.id)).scalars())
+
+
+def test_messages_for_one_parent_are_coalesced_into_one_notification(db, family, ending_soon, sink):
+    assert notification_service.enqueue_ending_soon(db) == 2
+
+    assert notification_service.dispatch_outbox(db) == 2
+
+    assert len(sink.sent) == 1
+    notification = sink.sent[0]
+    assert notification.recipient == "pat@example.com"
+    assert notification.subject == "2 subscription updates"
+    assert "Charlie Child: Monthly ends on" in notification.body
+    assert "Sam Sibling: Weekly ends on" in notification.body
+    assert {message.status for message in _messages(db)} == {OUTBOX_SENT}
+
+
+def test_failed_delivery_is_retried_later(db, family, ending_soon, sink):
+    notification_service.enqueue_ending_soon(db)
+    sink.fail = True
+
+    assert notification_service.dispatch_outbox(db) == 0
+
+    for message in _messages(db):
+        assert message.status == OUTBOX_PENDING
+        assert message.attempts == 1
+        assert message.last_error == "SMTP server unavailable"
+    # Not due again until the backoff has passed
+    sink.fail = False
+    assert notification_service.dispatch_outbox(db) == 0
+
+    db.execute(update(OutboxMessage).values(available_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.commit()
+    assert notification_service.dispatch_outbox(db) == 2
+    assert len(sink.sent) == 1
+
+
+def test_ending_soon_notice_is_not_repeated_after_the_purge(db, family, ending_soon, sink):
+    notification_service.enqueue_ending_soon(db)
+    notification_service.dispatch_outbox(db)
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    db.execute(update(OutboxMessage).values(created_at=old))
+    db.commit()
+
+    assert notification_service.purge_outbox(db) == 0
+    assert notification_service.enqueue_ending_soon(db) == 0
+
+    # Once the subscriptions have ended the notices are no longer needed
+    assert notification_service.purge_outbox(db, today=date.today() + timedelta(days=4)) == 2
+
+
+def test_messages_outlive_their_archived_subscription(db, family, ending_soon, sink):
+    notification_service.enqueue_ending_soon(db)
+    db.execute(delete(Subscription).where(Subscription.id == family.subscription.id))
+    db.commit()
+
+    assert notification_service.dispatch_outbox(db) == 2
+
+    messages = _messages(db)
+    assert [message.subscription_id for message in messages] == [None, ending_soon[1].id]
+    db.execute(update(OutboxMessage).values(created_at=datetime.now(timezone.utc) - timedelta(days=30)))
+    db.commit()
+    assert notification_service.purge_outbox(db) == 1
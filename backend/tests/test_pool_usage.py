@@ -0,0 +1,43 @@
+"""Tests that requests answered without data hold no database connection."""
+
+import pytest
+from sqlalchemy import event
+
+from app.core.database import engine
+
+
+@pytest.fixture
+def checkouts():
+    """Connections checked out of the primary's pool during the test."""
+    count = []
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        count.append(connection_record)
+
+    event.listen(engine, "checkout", on_checkout)
+    yield count
+    event.remove(engine, "checkout", on_checkout)
+
+
+def test_auth_failures_check_out_no_connection(client, family, checkouts):
+    assert client.get("/api/classes").status_code == 401
+    assert client.get("/api/classes", headers={"Authorization": "Bearer not-a-jwt"}).status_code == 401
+    assert client.get("/api/classes", headers=family.child_headers).status_code == 200
+
+    # Only the authorized request reached the database
+    assert len(checkouts) == 1
+
+
+def test_cached_report_and_304_check_out_no_connection(client, family, checkouts):
+    path = "/api/reports/class-utilization"
+    first = client.get(path, headers=family.staff_headers)
+    assert first.status_code == 200
+    checkouts.clear()
+
+    assert client.get(path, headers=family.staff_headers).status_code == 200
+    not_modified = client.get(
+        path, headers={**family.staff_headers, "If-Modified-Since": first.headers["Last-Modified"]}
+    )
+
+    assert not_modified.status_code == 304
+    assert checkouts == []
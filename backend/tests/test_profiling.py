@@ -0,0 +1,31 @@
+"""Tests for on-demand request profiling."""
+
+import asyncio
+
+from app.core import profiling
+from app.core.security import create_access_token
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _profiled_scope() -> dict:
+    token = create_access_token(data={"sub": "1", "role": "staff"})
+    return {
+        "type": "http", "method": "GET", "path": "/api/classes",
+        "headers": [(b"x-profile", b"1"), (b"authorization", f"Bearer {token}".encode())],
+    }
+
+
+def test_profiled_request_is_stored_and_identified():
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(profiling.ProfilingMiddleware(_ok_app)(_profiled_scope(), None, send))
+
+    profile_id = dict(sent[0]["headers"])[b"x-profile-id"].decode()
+    assert profiling.get_profile(profile_id).status_code == 200
@@ -0,0 +1,93 @@
+"""Tests for refresh token rotation and reuse detection."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.models.refresh_token import RefreshToken
+from tests.conftest import PASSWORD
+
+
+def _login(client, email: str = "pat@example.com") -> dict:
+    response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _refresh(client, token: str):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def _age_rotations(db, seconds: float = 60) -> None:
+    """Move every rotation out of the reuse grace period."""
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.revoked_at.is_not(None))
+        .values(revoked_at=datetime.now(timezone.utc) - timedelta(seconds=seconds))
+    )
+    db.commit()
+
+
+def test_refresh_rotates_the_token(client, family):
+    login = _login(client)
+
+    response = _refresh(client, login["refresh_token"])
+
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != login["refresh_token"]
+    assert client.get("/api/parents/me", headers={
+        "Authorization": f"Bearer {rotated['access_token']}"
+    }).status_code == 200
+    assert _refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_reusing_a_rotated_token_revokes_the_whole_login(client, db, family):
+    login = _login(client)
+    rotated = _refresh(client, login["refresh_token"]).json()
+    _age_rotations(db)
+
+    # An attacker replays the stolen, already rotated token
+    assert _refresh(client, login["refresh_token"]).status_code == 401
+
+    # The legitimate client's current token is revoked with it
+    assert _refresh(client, rotated["refresh_token"]).status_code == 401
+
+
+def test_reuse_leaves_other_logins_alone(client, db, family):
+    stolen = _login(client)
+    other_device = _login(client)
+    _refresh(client, stolen["refresh_token"])
+    _age_rotations(db)
+
+    assert _refresh(client, stolen["refresh_token"]).status_code == 401
+    assert _refresh(client, other_device["refresh_token"]).status_code == 200
+
+
+def test_tabs_refreshing_the_same_token_together_stay_logged_in(client, family):
+    login = _login(client)
+
+    first_tab = _refresh(client, login["refresh_token"])
+    second_tab = _refresh(client, login["refresh_token"])
+
+    assert first_tab.status_code == second_tab.status_code == 200
+    assert first_tab.json()["refresh_token"] != second_tab.json()["refresh_token"]
+    assert _refresh(client, first_tab.json()["refresh_token"]).status_code == 200
+    assert _refresh(client, second_tab.json()["refresh_token"]).status_code == 200
+
+
+def test_grace_period_does_not_outlive_a_logout(client, family):
+    login = _login(client)
+    rotated = _refresh(client, login["refresh_token"]).json()
+    client.post("/api/auth/logout", json={"refresh_token": rotated["refresh_token"]})
+
+    assert _refresh(client, login["refresh_token"]).status_code == 401
+
+
+def test_expired_and_unknown_tokens_are_rejected(client, db, family):
+    login = _login(client)
+    db.execute(update(RefreshToken).values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.commit()
+
+    assert _refresh(client, login["refresh_token"]).status_code == 401
+    assert _refresh(client, "not-a-token").status_code == 401
@@ -0,0 +1,107 @@
+"""Tests for sending reads to a replica and everything else to the primary."""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine, select, text, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core import replicas
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.replicas import ReplicaSet
+from app.core.request_context import RequestContextMiddleware
+from app.models.subscription import Subscription
+
+
+@pytest.fixture
+def replica_session():
+    replica = create_engine("sqlite://")
+    with SessionLocal() as session:
+        # As if the request had been given a reachable replica
+        session.info["replica"] = replica
+        session.info["replica_connected"] = True
+        yield session, replica
+    replica.dispose()
+
+
+def test_plain_selects_read_from_the_replica(replica_session):
+    session, replica = replica_session
+
+    assert session.get_bind(clause=select(Subscription)) is replica
+
+
+@pytest.mark.parametrize("statement", [
+    update(Subscription).values(used_sessions=0),
+    select(Subscription).with_for_update(),
+    text("UPDATE subscriptions SET used_sessions = 0"),
+    text("SELECT 1"),
+], ids=["update", "select-for-update", "text-update", "text-select"])
+def test_writes_locks_and_raw_sql_go_to_the_primary(replica_session, statement):
+    session, _ = replica_session
+
+    assert session.get_bind(clause=statement) is engine
+    # Later reads in the session see its own write
+    assert session.get_bind(clause=select(Subscription)) is engine
+
+
+def _asgi_get(app, cookie: str | None = None, method: str = "GET") -> dict:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["headers"] = message["headers"]
+
+    scope = {"type": "http", "method": method, "path": "/api/students", "headers": headers}
+    asyncio.run(app(scope, receive, send))
+    return response
+
+
+async def _respond(send, headers=()):
+    await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def test_writing_request_sets_the_sticky_cookie(monkeypatch):
+    monkeypatch.setattr(settings, "DB_REPLICA_STICKY_SECONDS", 5.0)
+
+    async def writes(scope, receive, send):
+        # Sessions commit in the threadpool, with a copy of the request context
+        await run_in_threadpool(replicas.mark_write)
+        await _respond(send)
+
+    async def reads(scope, receive, send):
+        await _respond(send)
+
+    headers = _asgi_get(replicas.ReadYourWritesMiddleware(writes), method="POST")["headers"]
+    cookie = dict(headers)[b"set-cookie"].decode()
+    name, _, rest = cookie.partition("=")
+    assert name == replicas.STICKY_COOKIE
+    assert float(rest.split(";")[0]) == pytest.approx(time.time() + 5.0, abs=1.0)
+    assert "Max-Age=5" in cookie and "HttpOnly" in cookie
+
+    assert b"set-cookie" not in dict(_asgi_get(replicas.ReadYourWritesMiddleware(reads))["headers"])
+
+
+@pytest.mark.parametrize("offset, sticky", [(3.0, True), (-1.0, False), (3600.0, False), (None, False)])
+def test_reads_after_a_write_go_to_the_primary_in_any_worker(monkeypatch, offset, sticky):
+    monkeypatch.setattr(settings, "DB_REPLICA_STICKY_SECONDS", 5.0)
+    replica = create_engine("sqlite://")
+    # A worker that never saw the write
+    other_worker = ReplicaSet([replica])
+    chosen = []
+
+    async def app(scope, receive, send):
+        chosen.append(other_worker.choose_for_request())
+        await _respond(send)
+
+    cookie = f"{replicas.STICKY_COOKIE}={'junk' if offset is None else time.time() + offset}; theme=dark"
+    _asgi_get(RequestContextMiddleware(app), cookie)
+
+    assert chosen == [None if sticky else replica]
+    replica.dispose()
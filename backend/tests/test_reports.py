@@ -0,0 +1,139 @@
+"""Tests for report snapshots and their per-process cache."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.class_model import ClassModel
+from app.models.class_registration import ClassRegistration
+from app.models.report_snapshot import ReportSnapshot
+from app.models.session_usage import SessionUsage, USAGE_REASON_ADJUSTMENT
+from app.services import report_service
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(report_service, "time", clock)
+    return clock
+
+
+def _use(db, subscription_id: int, days_ago: int, sessions: int = 1, reason: str | None = None) -> None:
+    usage = SessionUsage(
+        subscription_id=subscription_id, sessions=sessions,
+        used_at=datetime.now(timezone.utc) - timedelta(days=days_ago),
+    )
+    if reason:
+        usage.reason = reason
+    db.add(usage)
+
+
+def _snapshots(db) -> dict[str, list]:
+    db.expire_all()
+    return {name: db.get(ReportSnapshot, name).payload for name in report_service.REPORTS}
+
+
+def _full_recompute(db) -> dict[str, list]:
+    return {name: compute(db, None) for name, compute in report_service.REPORTS.items()}
+
+
+def test_refresh_matches_a_full_recompute_after_changes(db, family):
+    subscription_id = family.subscription.id
+    for days_ago in (0, 3, 10, 24, 60):
+        _use(db, subscription_id, days_ago)
+    _use(db, subscription_id, 10, sessions=-1, reason=USAGE_REASON_ADJUSTMENT)
+    db.commit()
+    report_service.refresh_reports(db)
+    assert _snapshots(db) == _full_recompute(db)
+
+    # More usage in the newest reported week, registrations and a new class
+    _use(db, subscription_id, 0, sessions=2)
+    course = ClassModel(name="Physics", subject="Science", day_of_week="Tuesday", time_slot="11:00-12:00",
+                        teacher_name="Dr. Peterson", max_students=4)
+    db.add(course)
+    db.flush()
+    db.add(ClassRegistration(student_id=family.other.id, class_id=course.id))
+    family.subscription.used_sessions = 4
+    db.commit()
+
+    assert report_service.refresh_reports(db) == len(report_service.REPORTS)
+
+    refreshed = _snapshots(db)
+    assert refreshed == _full_recompute(db)
+    assert sum(row["sessions"] for row in refreshed[report_service.SESSION_BURN]) == 7
+    assert [row["registrations"] for row in refreshed[report_service.CLASS_UTILIZATION]] == [1, 1]
+
+
+def test_session_burn_drops_weeks_that_left_the_window(db, family, monkeypatch):
+    _use(db, family.subscription.id, 0)
+    _use(db, family.subscription.id, 30)
+    db.commit()
+    report_service.refresh_reports(db)
+
+    monkeypatch.setattr(settings, "REPORT_SESSION_BURN_WEEKS", 2)
+    report_service.refresh_reports(db)
+
+    assert _snapshots(db)[report_service.SESSION_BURN] == _full_recompute(db)[report_service.SESSION_BURN]
+    assert [row["sessions"] for row in _snapshots(db)[report_service.SESSION_BURN]] == [1]
+
+
+def test_reports_are_cached_until_the_next_refresh(db, family, clock):
+    hits = metrics.CACHE_REQUESTS.labels("reports", "hit")
+    misses = metrics.CACHE_REQUESTS.labels("reports", "miss")
+    hits_before, misses_before = hits.value, misses.value
+
+    first = report_service.get_report(db, report_service.CLASS_UTILIZATION)
+    db.add(ClassRegistration(student_id=family.other.id, class_id=family.course.id))
+    db.commit()
+    report_service.refresh_reports(db)
+
+    # The background refresh lands in the database; this process keeps its copy
+    clock.now += settings.REPORT_REFRESH_INTERVAL_SECONDS - 1
+    assert report_service.get_report(db, report_service.CLASS_UTILIZATION) is first
+    assert first["rows"][0]["registrations"] == 1
+
+    clock.now += 2
+    expired = report_service.get_report(db, report_service.CLASS_UTILIZATION)
+    assert expired["rows"][0]["registrations"] == 2
+    assert expired["next_refresh_at"] - expired["refreshed_at"] == timedelta(
+        seconds=settings.REPORT_REFRESH_INTERVAL_SECONDS
+    )
+    assert (hits.value - hits_before, misses.value - misses_before) == (1, 2)
+
+
+def test_overdue_snapshots_are_rechecked_shortly(db, family, clock):
+    report_service.refresh_reports(db)
+    snapshot = db.get(ReportSnapshot, report_service.TEACHER_LOAD)
+    snapshot.refreshed_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+
+    report = report_service.get_report(db, report_service.TEACHER_LOAD)
+
+    assert report_service._cache[report_service.TEACHER_LOAD] == (report, clock.now + 5.0)
+
+
+def test_caches_are_per_report(db, family, clock):
+    utilization = report_service.get_report(db, report_service.CLASS_UTILIZATION)
+    load = report_service.get_report(db, report_service.TEACHER_LOAD)
+
+    assert utilization["report"] == report_service.CLASS_UTILIZATION
+    assert load["rows"] == [{"teacher_name": "Dr. Peterson", "classes": 1, "registrations": 1}]
+    assert set(report_service._cache) == {report_service.CLASS_UTILIZATION, report_service.TEACHER_LOAD}
+
+
+def test_unknown_reports_are_not_found(db):
+    with pytest.raises(HTTPException) as exc_info:
+        report_service.get_report(db, "nonexistent")
+
+    assert exc_info.value.status_code == 404
@@ -0,0 +1,57 @@
+"""Tests for revoking access tokens before they expire."""
+
+from app.core import revocation
+from app.core.revocation import RevocationList
+from tests.conftest import PASSWORD
+
+
+def _login(client, email: str) -> dict:
+    response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _bearer(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_revokes_the_access_and_refresh_tokens(client, family):
+    login = _login(client, "charlie@example.com")
+    assert client.get("/api/students/me", headers=_bearer(login["access_token"])).status_code == 200
+
+    response = client.post("/api/auth/logout", json={"refresh_token": login["refresh_token"]},
+                           headers=_bearer(login["access_token"]))
+
+    assert response.status_code == 204
+    assert client.get("/api/students/me", headers=_bearer(login["access_token"])).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": login["refresh_token"]}).status_code == 401
+
+
+def test_logout_all_revokes_every_session_of_the_user(client, family):
+    phone = _login(client, "charlie@example.com")
+    laptop = _login(client, "charlie@example.com")
+
+    assert client.post("/api/auth/logout-all", headers=_bearer(phone["access_token"])).status_code == 204
+
+    assert client.get("/api/students/me", headers=_bearer(laptop["access_token"])).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": laptop["refresh_token"]}).status_code == 401
+    # Other users are unaffected
+    assert client.get("/api/parents/me", headers=family.parent_headers).status_code == 200
+
+
+def test_deleted_student_token_stops_working(client, family):
+    assert client.delete(f"/api/students/{family.child.id}", headers=family.staff_headers).status_code == 204
+
+    assert client.get("/api/students/me", headers=family.child_headers).status_code == 401
+
+
+def test_other_processes_load_revocations_from_the_database(client, db, family):
+    client.post("/api/auth/logout-all", headers=family.child_headers)
+    other_process = RevocationList()
+    payload = {"sub": str(family.child_user.id), "iat": 0}
+
+    assert not other_process.is_revoked(payload)
+    other_process.refresh(db)
+
+    assert other_process.is_revoked(payload)
+    assert revocation.revocation_list.is_revoked(payload)
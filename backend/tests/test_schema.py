@@ -0,0 +1,30 @@
+"""Tests for schema creation and verification without Alembic revisions."""
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app.core.database import engine
+from app.core.schema import SchemaMismatchError, migrate, verify_schema
+
+
+def _subscription_indexes() -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes("subscriptions")}
+
+
+def test_migrate_adds_indexes_missing_from_existing_tables():
+    # A database created before the partial indexes were added to the model
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_subscriptions_active_student_id"))
+        connection.execute(text("DROP INDEX ix_subscriptions_active_end_date"))
+
+    with pytest.raises(SchemaMismatchError, match="ix_subscriptions_active_end_date"):
+        verify_schema(engine)
+
+    migrate(engine)
+
+    assert {"ix_subscriptions_active_student_id", "ix_subscriptions_active_end_date"} <= _subscription_indexes()
+    assert verify_schema(engine).endswith("tables present")
+
+
+def test_verify_schema_accepts_an_up_to_date_database():
+    assert verify_schema(engine).endswith("tables present")
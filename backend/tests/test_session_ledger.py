@@ -0,0 +1,77 @@
+"""Tests for the session usage ledger and the used_sessions reconcile job."""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal, engine
+from app.core.schema import create_schema
+from app.models.session_usage import SessionUsage, USAGE_REASON_ADJUSTMENT
+from app.models.subscription import Subscription
+from app.services.subscription_service import reconcile_used_sessions, use_subscription_session
+
+
+def _ledger(db, subscription_id: int) -> list[tuple[int, str]]:
+    return db.execute(
+        select(SessionUsage.sessions, SessionUsage.reason)
+        .where(SessionUsage.subscription_id == subscription_id)
+        .order_by(SessionUsage.id)
+    ).all()
+
+
+def test_reconcile_keeps_balances_of_subscriptions_without_ledger(db, family):
+    family.subscription.used_sessions = 4
+    db.commit()
+
+    assert reconcile_used_sessions(db) == 0
+
+    db.refresh(family.subscription)
+    assert family.subscription.used_sessions == 4
+
+
+def test_reconcile_rebuilds_used_sessions_from_the_ledger(db, family):
+    db.add_all([SessionUsage(subscription_id=family.subscription.id, sessions=1) for _ in range(3)])
+    family.subscription.used_sessions = 7
+    db.commit()
+
+    assert reconcile_used_sessions(db) == 1
+
+    db.refresh(family.subscription)
+    assert family.subscription.used_sessions == 3
+
+
+def test_schema_upgrade_opens_ledgers_of_existing_subscriptions(db, family):
+    family.subscription.used_sessions = 4
+    db.commit()
+
+    create_schema(engine)
+    create_schema(engine)  # Idempotent
+
+    assert _ledger(db, family.subscription.id) == [(4, USAGE_REASON_ADJUSTMENT)]
+    assert reconcile_used_sessions(db) == 0
+
+
+def test_use_appends_to_the_ledger(client, db, family):
+    response = client.patch(f"/api/subscriptions/{family.subscription.id}/use", headers=family.staff_headers)
+
+    assert response.status_code == 200
+    assert response.json()["used_sessions"] == 1
+    assert db.scalar(select(func.sum(SessionUsage.sessions))) == 1
+    db.refresh(family.subscription)
+    assert family.subscription.used_sessions == 1
+
+
+def test_use_cannot_overdraw_a_package_exhausted_concurrently(db, family):
+    assert family.subscription.remaining_sessions == 10  # Loaded before the concurrent request
+
+    # Another request uses the last session after this one checked the balance
+    with SessionLocal() as other:
+        other.get(Subscription, family.subscription.id).used_sessions = 10
+        other.commit()
+
+    with pytest.raises(HTTPException) as error:
+        use_subscription_session(db, family.subscription.id)
+
+    assert error.value.status_code == 400
+    assert db.scalar(select(Subscription.used_sessions)) == 10
+    assert _ledger(db, family.subscription.id) == []
@@ -0,0 +1,32 @@
+"""Tests for the slow-query log."""
+
+from sqlalchemy.engine import make_url
+
+from app.core import slow_query
+from app.core.config import settings
+
+
+def test_parameter_values_are_hidden_by_default():
+    logged = slow_query._format_parameters({"email_1": "pat@example.com", "token_hash_1": "abc123"})
+
+    assert logged == "['email_1', 'token_hash_1']"
+    assert slow_query._format_parameters(("pat@example.com", 3)) == "<2 values hidden>"
+
+
+def test_parameter_values_are_logged_on_request_except_passwords(monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_PARAMETERS", True)
+
+    logged = slow_query._format_parameters({"email_1": "pat@example.com", "password_hash": "$2b$12$x"})
+
+    assert "pat@example.com" in logged
+    assert "$2b$12$x" not in logged
+
+
+def test_plans_are_explained_on_the_database_the_statement_ran_on():
+    primary = slow_query._get_explain_engine(make_url("sqlite:////tmp/primary.db"))
+    replica = slow_query._get_explain_engine(make_url("sqlite:////tmp/replica.db"))
+
+    assert primary is not replica
+    assert primary.url.database == "/tmp/primary.db"
+    assert replica.url.database == "/tmp/replica.db"
+    assert slow_query._get_explain_engine(make_url("sqlite:////tmp/primary.db")) is primary
@@ -29,9 +29,9 @@ export default function Login(): React.JSX.Element {
       const credentials: LoginCredentials = { email, password };
       const response = await api.post<AuthResponse>('/auth/login', credentials);
       
-      const { access_token, user } = response.data;
+      const { access_token, refresh_token, user } = response.data;
       
-      login(access_token, user);
+      login(access_token, user, refresh_token);
       
       // Navigate based on user role
       if (user.role === 'staff') {
@@ -1,9 +1,13 @@
 import axios from 'axios';
+import type { InternalAxiosRequestConfig } from 'axios';
+import type { TokenResponse } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Cookies keep reads on the primary database right after a write (cross-origin in development)
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -23,12 +27,65 @@ api.interceptors.request.use(
   }
 );
 
+// Renew the access token with the refresh token. Concurrent 401s share one
+// refresh, and tabs take turns through a Web Lock, as they share the stored
+// token: a tab that waited uses the token another tab just stored.
+let refreshing: Promise<string> | null = null;
+
+const postRefresh = (refreshToken: string): Promise<string> =>
+  axios.post<TokenResponse>(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken })
+    .then((response) => {
+      localStorage.setItem('access_token', response.data.access_token);
+      localStorage.setItem('refresh_token', response.data.refresh_token);
+      return response.data.access_token;
+    });
+
+const refreshAcrossTabs = async (): Promise<string> => {
+  const staleToken = localStorage.getItem('refresh_token');
+  if (!staleToken) {
+    throw new Error('No refresh token');
+  }
+  if (!navigator.locks) {
+    // Insecure contexts have no Web Locks; the server tolerates tabs racing briefly
+    return postRefresh(staleToken);
+  }
+  return navigator.locks.request('mini-lms-token-refresh', () => {
+    const currentToken = localStorage.getItem('refresh_token');
+    const accessToken = localStorage.getItem('access_token');
+    if (currentToken && currentToken !== staleToken && accessToken) {
+      return accessToken; // Refreshed by another tab while this one waited
+    }
+    return currentToken ? postRefresh(currentToken) : Promise.reject(new Error('Logged out'));
+  });
+};
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!refreshing) {
+    refreshing = refreshAcrossTabs().finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
 // Response interceptor to handle errors
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const original = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+    if (error.response?.status === 401 && original && !original._retried && !original.url?.startsWith('/auth/')) {
+      original._retried = true;
+      try {
+        await refreshAccessToken();
+        // The request interceptor sends the renewed token
+        return api(original);
+      } catch {
+        // Fall through to the login redirect
+      }
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem('access_token');
+      localStorage.removeItem('refresh_token');
       window.location.href = '/login';
     }
     return Promise.reject(error);